@@ -0,0 +1,194 @@
+"""Best discard advice for Five-card Draw Poker."""
+
+import itertools
+import operator
+import random
+
+from deuces import Card as DCard, Deck as DDeck
+from showdown import evaluator as shared_evaluator, shared
+
+CANONICAL_SUITS = [DCard.CHAR_SUIT_TO_INT_SUIT[s] for s in 'shdc']
+
+
+def canonical(hand):
+    # type: (list) -> (tuple, dict)
+    """Map a hand onto the representative of its suit-isomorphic class.
+
+    Suits are relabelled in order of decreasing card count (ties broken by
+    the ranks they hold), so hands which only differ by a permutation of
+    suits share a representative.
+
+    Args:
+        hand: Cards in deuces integer form
+
+    Returns:
+        The sorted representative hand and a dictionary mapping each of its
+        cards back to the original card
+    """
+    suits = {}
+    for card in hand:
+        suit = DCard.get_suit_int(card)
+        suits[suit] = suits.get(suit, 0) | DCard.get_bitrank_int(card)
+    order = sorted(suits, key=lambda s: (-bin(suits[s]).count('1'),
+                                         -suits[s]))
+    relabel = dict(zip(order, CANONICAL_SUITS))
+
+    back = {}
+    for card in hand:
+        new = (card & ~0xF000) | (relabel[DCard.get_suit_int(card)] << 12)
+        back[new] = card
+    return tuple(sorted(back)), back
+
+
+class SwapAdvisor(object):
+    """Rank all 32 possible discards of a five card hand."""
+
+    def __init__(self, exhaustive=2, samples=400, threshold=None,
+                 cache_size=100000, evaluator=None):
+        # type: (int, int, int, int, Evaluator)
+        """Initiate a SwapAdvisor.
+
+        Args:
+            exhaustive: Discards of up to this many cards are evaluated over
+                every possible draw, larger ones are sampled
+            samples: Number of random draws per sampled discard
+            threshold: If given, discards are scored by the probability of
+                finishing with a rank at least this good instead of by the
+                expected final rank
+            cache_size: Number of hand classes remembered
+            evaluator: Evaluator to take the lookup tables from - the shared
+                one by default
+        """
+        if evaluator is None:
+            evaluator = shared_evaluator()
+        self.flush_lookup = evaluator.table.flush_lookup
+        self.unsuited_lookup = evaluator.table.unsuited_lookup
+
+        self.exhaustive = exhaustive
+        self.samples = samples
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self.cache = {}
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of this SwapAdvisor.
+
+        Returns:
+            Text representation of this SwapAdvisor
+        """
+        return "SwapAdvisor(exhaustive={}, samples={}, cached={})".format(
+            self.exhaustive, self.samples, len(self.cache))
+
+    def advise(self, hand):
+        # type: (list) -> (list, float)
+        """Find the best discard for a hand.
+
+        Args:
+            hand: Five cards in deuces integer form
+
+        Returns:
+            The cards to discard and their score - the expected final rank
+            (lower is better) or, with a threshold, the probability of
+            reaching it (higher is better)
+        """
+        return self.options(hand)[0]
+
+    def options(self, hand):
+        # type: (list) -> list
+        """Score every possible discard of a hand.
+
+        Args:
+            hand: Five cards in deuces integer form
+
+        Returns:
+            A (discard, score) tuple for each of the 32 discards, best first
+        """
+        key, back = canonical(hand)
+        options = self.cache.get(key)
+        if options is None:
+            options = self._options(key)
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[key] = options
+        return [([back[c] for c in discard], score)
+                for discard, score in options]
+
+    def _options(self, hand):
+        # type: (tuple) -> list
+        """Score every possible discard of a canonical hand.
+
+        Args:
+            hand: Sorted canonical hand
+
+        Returns:
+            A (discard, score) tuple for each of the 32 discards, best first
+        """
+        unseen = [c for c in DDeck.GetFullDeck() if c not in hand]
+        rng = random.Random(hash(hand))
+
+        options = []
+        for n in range(6):
+            for discard in itertools.combinations(hand, n):
+                kept = [c for c in hand if c not in discard]
+                if n <= self.exhaustive:
+                    draws = itertools.combinations(unseen, n)
+                else:
+                    draws = (rng.sample(unseen, n)
+                             for _ in xrange(self.samples))
+                options.append((discard, self._score(kept, draws)))
+
+        if self.threshold is None:
+            options.sort(key=operator.itemgetter(1))
+        else:
+            options.sort(key=operator.itemgetter(1), reverse=True)
+        return options
+
+    def _score(self, kept, draws):
+        # type: (list, iter) -> float
+        """Score keeping some cards over a set of possible draws.
+
+        Both lookups are keyed by the product of rank primes, so the product
+        of the kept cards is computed once and the draws only multiply in.
+
+        Args:
+            kept: Cards kept in deuces integer form
+            draws: Possible sets of replacement cards
+
+        Returns:
+            Expected final rank or probability of reaching the threshold
+        """
+        flush_lookup, unsuited_lookup = self.flush_lookup, self.unsuited_lookup
+        threshold = self.threshold
+        product, suit = 1, 0xF000
+        for c in kept:
+            product *= c & 0xFF
+            suit &= c
+
+        total = n = 0
+        for draw in draws:
+            p, s = product, suit
+            for c in draw:
+                p *= c & 0xFF
+                s &= c
+            if s:
+                rank = flush_lookup[p]
+            else:
+                rank = unsuited_lookup[p]
+
+            if threshold is None:
+                total += rank
+            elif rank <= threshold:
+                total += 1
+            n += 1
+        return float(total) / n
+
+
+def advisor():
+    # type: () -> SwapAdvisor
+    """Return a SwapAdvisor shared by the whole application.
+
+    Returns:
+        The shared SwapAdvisor
+    """
+    return shared(SwapAdvisor)
@@ -0,0 +1,254 @@
+"""Streaming showdown statistics over a hand history log."""
+
+import argparse
+import collections
+import itertools
+import multiprocessing
+
+from deuces import Card as DCard, Evaluator, WildEvaluator
+from history import HistoryReader
+from showdown import evaluator
+
+Showdown = collections.namedtuple('Showdown', ['hand', 'pid', 'cards', 'won',
+                                               'swapped', 'players'])
+
+
+def showdowns(hands):
+    # type: (iter) -> iter
+    """Split recorded hands into the final hands of individual players.
+
+    Args:
+        hands: Hands as streamed by HistoryReader
+
+    Yields:
+        One Showdown per player per finished hand
+    """
+    for hand in hands:
+        players = len(hand.showdown)
+        for pid, (cards, won) in hand.showdown.iteritems():
+            swapped = len(hand.swaps[pid][0]) if pid in hand.swaps else 0
+            yield Showdown(hand.number, pid, cards, won, swapped, players)
+
+
+def evaluate_batch(batch):
+    # type: (list) -> list
+    """Evaluate a batch of hands with Evaluator.evaluate_many().
+
+    Hands with jokers, e.g. from JokerPoker, are ranked by the shared
+    WildEvaluator and all others by the standard one, both in one call.
+    The ranks of both are on the same scale.
+
+    Args:
+        batch: Hands in deuces integer form
+
+    Returns:
+        A (rank, rank class) tuple for every hand in the batch
+    """
+    ranks = [None] * len(batch)
+    kinds = {}
+    for i, cards in enumerate(batch):
+        wild = any(DCard.is_joker(c) for c in cards)
+        kinds.setdefault(WildEvaluator if wild else Evaluator, []).append(i)
+    for kind, indices in kinds.iteritems():
+        for i, rank in itertools.izip(indices, evaluator(kind).evaluate_many(
+                [batch[i] for i in indices])):
+            ranks[i] = rank
+    rank_class = evaluator().get_rank_class
+    return [(rank, rank_class(rank)) for rank in ranks]
+
+
+def batches(iterable, size):
+    # type: (iter, int) -> iter
+    """Group a stream into lists of at most size elements.
+
+    Args:
+        iterable: Stream to be grouped
+        size: Maximum length of a batch
+
+    Yields:
+        Consecutive batches
+    """
+    it = iter(iterable)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def evaluated(rows, batch_size=512, processes=None):
+    # type: (iter, int, int) -> iter
+    """Attach the rank and rank class to every Showdown.
+
+    Batches are evaluated in a pool of worker processes when processes is
+    given. At most a few batches per worker are in flight at any time, so
+    memory does not grow with the size of the log.
+
+    Args:
+        rows: Stream of Showdowns
+        batch_size: Number of hands evaluated per call
+        processes: Number of worker processes - None evaluates in process
+
+    Yields:
+        A (Showdown, rank, rank class) tuple for every row
+    """
+    if not processes:
+        for batch in batches(rows, batch_size):
+            for row, (rank, rank_class) in itertools.izip(
+                    batch, evaluate_batch([r.cards for r in batch])):
+                yield row, rank, rank_class
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        pending = collections.deque()
+        for batch in batches(rows, batch_size):
+            pending.append((batch, pool.apply_async(
+                evaluate_batch, ([r.cards for r in batch],))))
+            if len(pending) > processes * 4:
+                for item in _finished(*pending.popleft()):
+                    yield item
+        while pending:
+            for item in _finished(*pending.popleft()):
+                yield item
+    finally:
+        pool.terminate()
+
+
+def _finished(batch, result):
+    # type: (list, multiprocessing.pool.AsyncResult) -> iter
+    """Wait for a batch evaluated in a worker process.
+
+    Args:
+        batch: Showdowns sent to the worker
+        result: Pending result of evaluate_batch()
+
+    Yields:
+        A (Showdown, rank, rank class) tuple for every row of the batch
+    """
+    for row, (rank, rank_class) in itertools.izip(batch, result.get()):
+        yield row, rank, rank_class
+
+
+class Stats(object):
+    """Running totals of showdown statistics."""
+
+    def __init__(self):
+        """Start with no hands counted."""
+        self.hands = 0
+        self.showdowns = 0
+        self.classes = collections.Counter()
+        self.class_wins = collections.Counter()
+        self.swaps = collections.Counter()
+        self.swap_wins = collections.Counter()
+        self.best = None
+        self._last_hand = None
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of these Stats.
+
+        Returns:
+            Text representation of these Stats
+        """
+        return "Stats(hands={}, showdowns={})".format(self.hands,
+                                                      self.showdowns)
+
+    def add(self, row, rank, rank_class):
+        # type: (Showdown, int, int)
+        """Count a single evaluated Showdown.
+
+        Args:
+            row: The Showdown
+            rank: Rank of the final hand
+            rank_class: Rank class of the final hand
+        """
+        if row.hand != self._last_hand:
+            self._last_hand = row.hand
+            self.hands += 1
+        self.showdowns += 1
+        self.classes[rank_class] += 1
+        self.swaps[row.swapped] += 1
+        if row.won:
+            self.class_wins[rank_class] += 1
+            self.swap_wins[row.swapped] += 1
+        if self.best is None or rank < self.best[0]:
+            self.best = (rank, row.hand, row.pid)
+
+    def frequencies(self):
+        # type: () -> dict
+        """Relative frequency of every rank class seen at showdown.
+
+        Returns:
+            Dictionary mapping class names to frequencies
+        """
+        e = evaluator()
+        return {e.class_to_string(c): float(n) / self.showdowns
+                for c, n in self.classes.iteritems()}
+
+    def win_rates(self):
+        # type: () -> dict
+        """Share of showdowns won for each number of swapped cards.
+
+        Returns:
+            Dictionary mapping the number of swapped cards to a win rate
+        """
+        return {s: float(self.swap_wins[s]) / n
+                for s, n in self.swaps.iteritems()}
+
+
+def aggregate(items, stats=None):
+    # type: (iter, Stats) -> Stats
+    """Consume evaluated Showdowns and total them up.
+
+    Args:
+        items: Stream of (Showdown, rank, rank class) tuples
+        stats: Totals to be updated - a new Stats object by default
+
+    Returns:
+        The updated totals
+    """
+    if stats is None:
+        stats = Stats()
+    add = stats.add
+    for row, rank, rank_class in items:
+        add(row, rank, rank_class)
+    return stats
+
+
+def analyze(path, batch_size=512, processes=None, start=0):
+    # type: (str, int, int, int) -> Stats
+    """Compute showdown statistics of a hand history log.
+
+    Args:
+        path: Location of the log
+        batch_size: Number of hands evaluated per call
+        processes: Number of worker processes - None evaluates in process
+        start: Number of the first hand to include
+
+    Returns:
+        Statistics of all finished hands from start onwards
+    """
+    reader = HistoryReader(path)
+    try:
+        return aggregate(evaluated(showdowns(reader.hands(start)),
+                                   batch_size, processes))
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('log', help="hand history log")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of worker processes")
+    parser.add_argument('-b', '--batch-size', type=int, default=512)
+    args = parser.parse_args()
+
+    result = analyze(args.log, args.batch_size, args.processes)
+    print "{} hands, {} showdowns".format(result.hands, result.showdowns)
+    for name, freq in sorted(result.frequencies().items(),
+                             key=lambda (k, v): -v):
+        print "{:>16}: {:.4f}".format(name, freq)
+    for swapped, rate in sorted(result.win_rates().items()):
+        print "Swapped {}: won {:.4f}".format(swapped, rate)
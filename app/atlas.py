@@ -0,0 +1,80 @@
+"""Texture atlas holding every card image.
+
+Run this module to (re)build data/cards.atlas from the images in data/.
+"""
+
+import json
+import os
+
+ATLAS = os.path.join('data', 'cards')
+SUITS = ['spades', 'hearts', 'diamonds', 'clubs']
+FACES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+EXTRA = [('backs', 'red'), ('backs', 'blue'), ('jokers', 'black'),
+         ('jokers', 'color'), ('jokers', 'other')]
+
+HAVE_ATLAS = os.path.exists(ATLAS + '.atlas')
+
+
+def images():
+    # type: () -> list
+    """List every image packed into the atlas.
+
+    Returns:
+        A (suit, face) tuple for every image
+    """
+    return [(s, f) for s in SUITS for f in FACES] + EXTRA
+
+
+def source(suit, face):
+    # type: (str, str) -> str
+    """Get the image source of a card.
+
+    Args:
+        suit: The suit of the card
+        face: The face of the card
+
+    Returns:
+        A region of the atlas if it has been built, the image file otherwise
+    """
+    if HAVE_ATLAS:
+        return "atlas://{}/{}_{}".format(ATLAS, suit, face)
+    return "data/{}/{}.png".format(suit, face)
+
+
+def build(size=(200, 279), columns=10):
+    # type: (tuple, int)
+    """Pack all card images into a single texture.
+
+    With the default size and number of columns the texture is 2000x1674,
+    which fits into the 2048x2048 limit of older devices.
+
+    Args:
+        size: Width and height of a card in the atlas
+        columns: Number of cards in a row of the atlas
+    """
+    from PIL import Image
+
+    w, h = size
+    names = images()
+    rows = (len(names) + columns - 1) // columns
+    texture = Image.new('RGBA', (w * columns, h * rows))
+    regions = {}
+
+    for i, (suit, face) in enumerate(names):
+        x, y = (i % columns) * w, (i // columns) * h
+        card = Image.open(os.path.join('data', suit, face + '.png'))
+        texture.paste(card.convert('RGBA').resize(size, Image.LANCZOS),
+                      (x, y))
+        # Kivy measures atlas regions from the bottom left corner
+        regions['{}_{}'.format(suit, face)] = [x, texture.size[1] - y - h,
+                                               w, h]
+
+    filename = os.path.basename(ATLAS) + '-0.png'
+    texture.save(os.path.join(os.path.dirname(ATLAS), filename),
+                 optimize=True)
+    with open(ATLAS + '.atlas', 'w') as f:
+        json.dump({filename: regions}, f, sort_keys=True)
+
+
+if __name__ == '__main__':
+    build()
@@ -74,7 +74,18 @@ class Bluetooth(object):
     @staticmethod
     def send(msg, conn):
         # type: (str, OutputStream)
-        """Send message to a device connected via Bluetooth.
+        """Send message to a device connected via Bluetooth in a new thread.
+
+        Args:
+            msg: The message to send
+            conn: The connection to send the message over
+        """
+        thread(Bluetooth.write, [msg, conn])
+
+    @staticmethod
+    def write(msg, conn):
+        # type: (str, OutputStream)
+        """Send message to a device connected via Bluetooth. Blocks.
 
         Args:
             msg: The message to send
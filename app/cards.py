@@ -13,6 +13,11 @@ class Card(object):
     SUITS = {"diamonds": 1, "clubs": 2, "hearts": 3, "spades": 4}
     FACES = dict({str(n): n for n in range(2, 11)},
                  **{"J": 11, "Q": 12, "K": 13, "A": 14})
+    JOKER_FACES = ["black", "color"]  # faces of the "jokers" suit
+
+    # sort order including jokers, which come last
+    SUIT_ORDER = dict(SUITS, jokers=5)
+    FACE_ORDER = dict(FACES, black=15, color=16)
 
     @staticmethod
     def from_dict(properties):
@@ -70,11 +75,11 @@ class Card(object):
         Returns:
             True if self < other, False otherwise
         """
-        if self.SUITS[self.suit] < self.SUITS[other.suit]:
+        if self.SUIT_ORDER[self.suit] < self.SUIT_ORDER[other.suit]:
             return True
-        if self.SUITS[self.suit] > self.SUITS[other.suit]:
+        if self.SUIT_ORDER[self.suit] > self.SUIT_ORDER[other.suit]:
             return False
-        if self.FACES[self.face] < self.FACES[other.face]:
+        if self.FACE_ORDER[self.face] < self.FACE_ORDER[other.face]:
             return True
         return False
 
@@ -88,8 +93,8 @@ class Card(object):
         Returns:
             True if self is equal to other, False otherwise
         """
-        return self.FACES[self.face] == self.FACES[other.face] \
-            and self.SUITS[self.suit] == self.SUITS[other.suit]
+        return self.FACE_ORDER[self.face] == self.FACE_ORDER[other.face] \
+            and self.SUIT_ORDER[self.suit] == self.SUIT_ORDER[other.suit]
 
     def __repr__(self):
         # type: () -> str
@@ -110,6 +115,8 @@ class Card(object):
         Returns:
             The DCard representation of this card
         """
+        if self.suit == "jokers":
+            return DCard.new("X" + self.face[0])
         if self.face == "10":
             face = "T"
         else:
@@ -120,11 +127,21 @@ class Card(object):
 class Deck(object):
     """Represent a deck of cards."""
 
-    def __init__(self):
-        """Create cards with all possible face suit combinations."""
+    def __init__(self, seed=None, jokers=0):
+        # type: (int, int)
+        """Create cards with all possible face suit combinations.
+
+        Args:
+            seed: Seed for shuffling the cards - random if not provided
+            jokers: Number of jokers (0 to 2) to be added to the deck
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
         self.cards = list(Card(s, f) for
                           s, f in itertools.product(Card.SUITS, Card.FACES))
-        random.shuffle(self.cards)
+        self.cards.extend(Card("jokers", f) for f in Card.JOKER_FACES[:jokers])
+        random.Random(seed).shuffle(self.cards)
 
     def __repr__(self):
         # type: () -> str
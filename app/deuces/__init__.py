@@ -1,3 +1,7 @@
 from card import Card 
 from deck import Deck 
 from evaluator import Evaluator 
+from handstate import HandState
+from variants import (OmahaEvaluator, ShortDeckEvaluator,
+                      AceToFiveEvaluator, DeuceToSevenEvaluator)
+from wild import WildEvaluator
@@ -0,0 +1,208 @@
+# cython: boundscheck=False, wraparound=False, language_level=2
+"""
+Compiled core of the evaluator. The lookup tables built by LookupTable are
+copied into flat C arrays:
+
+    flush[rankbits]      => rank of a flush with these five ranks
+    unique5[rankbits]    => rank of an unsuited hand with five distinct ranks
+    products (sorted)    => rank of any other unsuited hand, found by binary
+                            search on its prime product
+
+so a five card lookup is a handful of bit operations and at most a dozen
+comparisons, without any Python integer arithmetic. Ranks start at 1, so
+a lookup which fails returns 0 with a KeyError raised, which reaches the
+caller just like in the pure Python evaluator.
+"""
+
+from libc.stdlib cimport malloc, free
+
+# indices of the 5 card subsets of 6 and 7 cards, in itertools order
+cdef int SIX[6][5]
+cdef int SEVEN[21][5]
+
+
+cdef void _fill_combinations():
+    cdef int i, a, b, c, d, e, n
+    n = 0
+    for a in range(6):
+        for b in range(a + 1, 6):
+            for c in range(b + 1, 6):
+                for d in range(c + 1, 6):
+                    for e in range(d + 1, 6):
+                        SIX[n][0] = a; SIX[n][1] = b; SIX[n][2] = c
+                        SIX[n][3] = d; SIX[n][4] = e
+                        n += 1
+    n = 0
+    for a in range(7):
+        for b in range(a + 1, 7):
+            for c in range(b + 1, 7):
+                for d in range(c + 1, 7):
+                    for e in range(d + 1, 7):
+                        SEVEN[n][0] = a; SEVEN[n][1] = b; SEVEN[n][2] = c
+                        SEVEN[n][3] = d; SEVEN[n][4] = e
+                        n += 1
+
+_fill_combinations()
+
+cdef int PRIMES[13]
+for _i, _p in enumerate([2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]):
+    PRIMES[_i] = _p
+
+
+def prime_product_from_hand(card_ints):
+    """
+    Expects a list of cards in integer form.
+    """
+    cdef unsigned long long product = 1
+    if len(card_ints) > 11:
+        # could overflow 64 bits, let Python do it
+        result = 1
+        for c in card_ints:
+            result *= (c & 0xFF)
+        return result
+
+    for c in card_ints:
+        product *= (<unsigned long long> c) & 0xFF
+    return product
+
+
+cdef class CEvaluator:
+    """
+    Five, six and seven card evaluation over typed arrays. Returns exactly
+    the same ranks as the pure Python Evaluator it was built from.
+    """
+
+    cdef unsigned short flush[8192]
+    cdef unsigned short unique5[8192]
+    cdef unsigned int *products
+    cdef unsigned short *ranks
+    cdef int n_products
+
+    def __cinit__(self, flush_lookup, unsuited_lookup):
+        cdef int bits, i, n
+        cdef unsigned int product
+
+        for bits in range(8192):
+            self.flush[bits] = 0
+            self.unique5[bits] = 0
+            n = 0
+            product = 1
+            for i in range(13):
+                if bits & (1 << i):
+                    n += 1
+                    product *= PRIMES[i]
+            if n == 5:
+                self.flush[bits] = flush_lookup[product]
+                self.unique5[bits] = unsuited_lookup[product]
+
+        items = sorted(unsuited_lookup.items())
+        self.n_products = len(items)
+        self.products = <unsigned int *> malloc(
+            self.n_products * sizeof(unsigned int))
+        self.ranks = <unsigned short *> malloc(
+            self.n_products * sizeof(unsigned short))
+        if self.products == NULL or self.ranks == NULL:
+            raise MemoryError()
+        for i in range(self.n_products):
+            self.products[i] = items[i][0]
+            self.ranks[i] = items[i][1]
+
+    def __dealloc__(self):
+        free(self.products)
+        free(self.ranks)
+
+    cdef inline unsigned short _five(self, unsigned int c0, unsigned int c1,
+                                     unsigned int c2, unsigned int c3,
+                                     unsigned int c4) except 0:
+        cdef unsigned int bits = (c0 | c1 | c2 | c3 | c4) >> 16
+        cdef unsigned int product
+        cdef int lo, hi, mid
+
+        if c0 & c1 & c2 & c3 & c4 & 0xF000:
+            if self.flush[bits]:
+                return self.flush[bits]
+            raise KeyError(bits)
+        if self.unique5[bits]:
+            return self.unique5[bits]
+
+        product = (c0 & 0xFF) * (c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) \
+            * (c4 & 0xFF)
+        lo = 0
+        hi = self.n_products - 1
+        while lo <= hi:
+            mid = (lo + hi) >> 1
+            if self.products[mid] < product:
+                lo = mid + 1
+            elif self.products[mid] > product:
+                hi = mid - 1
+            else:
+                return self.ranks[mid]
+        raise KeyError(product)
+
+    cdef unsigned short _best(self, unsigned int *c, int (*combos)[5],
+                              int n) except 0:
+        cdef unsigned short best = 7462, rank
+        cdef int i
+        for i in range(n):
+            rank = self._five(c[combos[i][0]], c[combos[i][1]],
+                              c[combos[i][2]], c[combos[i][3]],
+                              c[combos[i][4]])
+            if rank < best:
+                best = rank
+        return best
+
+    def five(self, cards):
+        """
+        Rank of exactly 5 cards in integer form, in the range [1, 7462].
+        """
+        return self._five(cards[0], cards[1], cards[2], cards[3], cards[4])
+
+    def six(self, cards):
+        """
+        Best rank among the 6 subsets of 5 out of 6 cards.
+        """
+        cdef unsigned int c[6]
+        cdef int i
+        for i in range(6):
+            c[i] = cards[i]
+        return self._best(c, SIX, 6)
+
+    def seven(self, cards):
+        """
+        Best rank among the 21 subsets of 5 out of 7 cards.
+        """
+        cdef unsigned int c[7]
+        cdef int i
+        for i in range(7):
+            c[i] = cards[i]
+        return self._best(c, SEVEN, 21)
+
+    def many(self, hands, board=()):
+        """
+        Ranks of many hands in one call, each hand completed with the same
+        board cards to 5, 6 or 7 cards. Saves a call from Python per hand.
+        """
+        cdef unsigned int c[7]
+        cdef int i, k, n
+        k = len(board)
+        if k > 7:
+            raise KeyError(k)
+        for i in range(k):
+            c[i] = board[i]
+        ranks = [0] * len(hands)
+        for i, hand in enumerate(hands):
+            n = k
+            for card in hand:
+                if n == 7:
+                    raise KeyError(k + len(hand))
+                c[n] = card
+                n += 1
+            if n == 5:
+                ranks[i] = self._five(c[0], c[1], c[2], c[3], c[4])
+            elif n == 6:
+                ranks[i] = self._best(c, SIX, 6)
+            elif n == 7:
+                ranks[i] = self._best(c, SEVEN, 21)
+            else:
+                raise KeyError(n)
+        return ranks
@@ -1,3 +1,11 @@
+import array
+try:
+    ### for mac, linux: http://pypi.python.org/pypi/termcolor
+    ### can use for windows: http://pypi.python.org/pypi/colorama
+    from termcolor import colored
+except ImportError:
+    colored = None
+
 class Card ():
     """
     Static class that handles cards. We represent cards as 32-bit integers, so 
@@ -23,6 +31,10 @@ class Card ():
     - Detect straights
 
     and is also quite performant.
+
+    Jokers ('Xb' black, 'Xc' color) have no suit and no rank bits, the rank
+    13 or 14 and a prime of 1, so they never make a flush and leave prime
+    products unchanged. Only the WildEvaluator knows how to score them.
     """
 
     # the basics
@@ -40,6 +52,10 @@ class Card ():
     }
     INT_SUIT_TO_CHAR_SUIT = 'xshxdxxxc'
 
+    # jokers
+    JOKER_CHARS = 'bc'  # black, color
+    JOKER_RANK = 13
+
     # for pretty printing
     PRETTY_SUITS = {
         1 : u"\u2660".encode('utf-8'), # spades
@@ -61,6 +77,9 @@ class Card ():
 
         rank_char = string[0]
         suit_char = string[1]
+        if rank_char == 'X':
+            return (Card.JOKER_RANK + Card.JOKER_CHARS.index(suit_char)) << 8 | 1
+
         rank_int = Card.CHAR_RANK_TO_INT_RANK[rank_char]
         suit_int = Card.CHAR_SUIT_TO_INT_SUIT[suit_char]
         rank_prime = Card.PRIMES[rank_int]
@@ -73,10 +92,19 @@ class Card ():
 
     @staticmethod
     def int_to_str(card_int):
+        s = Card.INT_TO_STR.get(card_int)
+        if s is not None:
+            return s
         rank_int = Card.get_rank_int(card_int)
         suit_int = Card.get_suit_int(card_int)
+        if not suit_int:
+            return 'X' + Card.JOKER_CHARS[rank_int - Card.JOKER_RANK]
         return Card.STR_RANKS[rank_int] + Card.INT_SUIT_TO_CHAR_SUIT[suit_int]
 
+    @staticmethod
+    def is_joker(card_int):
+        return not card_int & 0xF000
+
     @staticmethod
     def get_rank_int(card_int):
         return (card_int >> 8) & 0xF
@@ -99,10 +127,40 @@ class Card ():
         Expects a list of cards as strings and returns a list
         of integers of same length corresponding to those strings. 
         """
-        bhand = []
-        for c in card_strs:
-            bhand.append(Card.new(c))
-        return bhand
+        lookup = Card.STR_TO_INT.get
+        return [lookup(c) or Card.new(c) for c in card_strs]
+
+    @staticmethod
+    def decode(compact):
+        """
+        Converts a compact string of cards like "AhKd7c" to a list of 
+        integers, two characters per card. Spaces are ignored, so "Ah Kd 
+        7c" works too. Raises KeyError on an invalid card.
+        """
+        compact = compact.replace(' ', '')
+        table = Card.STR_TO_INT
+        return [table[compact[i:i + 2]] for i in xrange(0, len(compact), 2)]
+
+    @staticmethod
+    def decode_array(compacts):
+        """
+        Converts many compact strings of cards, e.g. the lines of a hand 
+        file, into one flat array of 32 bit card integers. Hands of k 
+        cards each are rows of k consecutive entries.
+        """
+        cards = array.array('I')
+        for compact in compacts:
+            cards.extend(Card.decode(compact))
+        return cards
+
+    @staticmethod
+    def encode(card_ints):
+        """
+        Converts card integers to a compact string like "AhKd7c", the 
+        inverse of decode().
+        """
+        lookup = Card.INT_TO_STR.get
+        return "".join(lookup(c) or Card.int_to_str(c) for c in card_ints)
 
     @staticmethod
     def prime_product_from_hand(card_ints):
@@ -168,23 +226,26 @@ class Card ():
         """
         Prints a single card 
         """
-        
-        color = False
-        try:
-            from termcolor import colored
-            ### for mac, linux: http://pypi.python.org/pypi/termcolor
-            ### can use for windows: http://pypi.python.org/pypi/colorama
-            color = True
-        except ImportError: 
-            pass
+        pretty = Card.INT_TO_PRETTY.get(card_int)
+        if pretty is None:
+            pretty = Card._pretty(card_int)
+        return pretty
 
+    @staticmethod
+    def _pretty(card_int):
+        """
+        Builds the pretty string of a card, red suits colored if 
+        termcolor is installed. Cached in INT_TO_PRETTY for every card.
+        """
         # suit and rank
         suit_int = Card.get_suit_int(card_int)
         rank_int = Card.get_rank_int(card_int)
+        if not suit_int:
+            return " [ JK ] "
 
         # if we need to color red
         s = Card.PRETTY_SUITS[suit_int]
-        if color and suit_int in Card.PRETTY_REDS:
+        if colored is not None and suit_int in Card.PRETTY_REDS:
             s = colored(s, "red")
 
         r = Card.STR_RANKS[rank_int]
@@ -203,12 +264,20 @@ class Card ():
         """
         Expects a list of cards in integer form.
         """
-        output = " "
-        for i in range(len(card_ints)):
-            c = card_ints[i]
-            if i != len(card_ints) - 1:
-                output += Card.int_to_pretty_str(c) + ","
-            else:
-                output += Card.int_to_pretty_str(c) + " "
-    
-        print output
+        print " " + ",".join(map(Card.int_to_pretty_str, card_ints)) + " "
+
+
+Card.JOKERS = [Card.new('X' + c) for c in Card.JOKER_CHARS]
+
+# string <=> integer <=> pretty string of all 52 cards and the jokers
+Card.STR_TO_INT = dict((r + s, Card.new(r + s))
+                       for r in Card.STR_RANKS for s in 'shdc')
+Card.STR_TO_INT.update(('X' + c, j) for c, j in zip(Card.JOKER_CHARS,
+                                                    Card.JOKERS))
+Card.INT_TO_STR = dict((i, s) for s, i in Card.STR_TO_INT.iteritems())
+Card.INT_TO_PRETTY = dict((i, Card._pretty(i)) for i in Card.INT_TO_STR)
+
+from speedups import _cdeuces
+if _cdeuces is not None:
+    Card.prime_product_from_hand = staticmethod(
+        _cdeuces.prime_product_from_hand)
@@ -0,0 +1,81 @@
+import itertools
+
+class HandState(object):
+    """
+    Best rank of a growing set of cards, e.g. the hole cards of a player
+    and the board as it is dealt street by street.
+
+    Cards are added one at a time. Once there are five, the rank is kept
+    up to date: the best hand either stays the same or uses the new card,
+    so only the 5 card hands with the new card are evaluated - 5 when the
+    sixth card comes and 15 for the seventh, instead of 6 and 21. With
+    the compiled core a whole 6 or 7 card evaluation is a single call,
+    which beats several calls from Python, so it is used instead.
+
+    Works with the standard evaluation of natural cards, for evaluators
+    whose INCREMENTAL is True. Others (jokers, Omaha) need the whole hand
+    at once.
+    """
+
+    def __init__(self, evaluator, cards=()):
+        self.evaluator = evaluator
+        self.five = evaluator.hand_size_map[5]
+        self.cards = []
+        self.rank = None
+        for card in cards:
+            self.add(card)
+
+    def __repr__(self):
+        return "HandState(cards=%d, rank=%s)" % (len(self.cards), self.rank)
+
+    def add(self, card):
+        """
+        Adds a card and returns the best rank so far, None while there
+        are fewer than five cards.
+        """
+        previous = self.cards
+        self.cards = previous + [card]
+        n = len(self.cards)
+        if n == 5:
+            self.rank = self.five(self.cards)
+        elif n > 5:
+            if self.evaluator.core is not None and n <= 7:
+                self.rank = self.evaluator.hand_size_map[n](self.cards)
+            else:
+                five = self.five
+                for combo in itertools.combinations(previous, 4):
+                    rank = five(list(combo) + [card])
+                    if rank < self.rank:
+                        self.rank = rank
+        return self.rank
+
+    def copy(self):
+        """
+        An independent HandState with the same cards, e.g. to try out
+        several turn cards from the same flop.
+        """
+        other = HandState.__new__(HandState)
+        other.evaluator = self.evaluator
+        other.five = self.five
+        other.cards = self.cards
+        other.rank = self.rank
+        return other
+
+    def rank_class(self):
+        """
+        Class of the best hand so far, see Evaluator.get_rank_class().
+        """
+        return self.evaluator.get_rank_class(self.rank)
+
+    def class_string(self):
+        """
+        Name of the class of the best hand so far, e.g. 'Flush'.
+        """
+        return self.evaluator.class_to_string(self.rank_class())
+
+    def percentage(self):
+        """
+        Strength of the best hand so far scaled to [0.0, 1.0] as in
+        Evaluator.hand_summary(), higher is better.
+        """
+        return 1.0 - self.evaluator.get_five_card_rank_percentage(self.rank)
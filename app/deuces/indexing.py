@@ -0,0 +1,271 @@
+"""
+Dense combinatorial indices of sets of cards, for tables kept in flat arrays.
+
+    colex_index(cards)  maps a set of k cards to [0, C(52, k)) in colex order
+    iso_index(cards)    maps it to [0, iso_size(k)), equal for every set of
+                        cards which only differs by a permutation of suits
+
+and colex_cards() / iso_cards() map an index back to cards, the latter to
+the canonical member of its class. Both work for k from 1 to 7; there are
+169 classes of two cards, 134459 of five and 6009159 of seven.
+
+A card is numbered 4 * rank + suit (spades, hearts, diamonds, clubs), so
+sorted card numbers are sorted by rank. The colex index of the card numbers
+c1 < c2 < ... < ck is C(c1, 1) + C(c2, 2) + ... + C(ck, k).
+
+For the suit isomorphic index every suit is reduced to the colex index of
+its ranks among the 13. The sizes of the suits, largest first, pick a block
+of indices, and inside it suits of the same size form a multiset whose
+index C(v1, 1) + C(v2 + 1, 2) + ... (v1 <= v2 <= ...) is combined with the
+other sizes in mixed radix.
+
+colex_index_many() and colex_cards_many() do the same for a whole batch of
+hands at once with NumPy, or hand by hand if it is not installed.
+"""
+import bisect
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from card import Card
+
+MAX_CARDS = 7
+
+# card number => card int, and suit bits => suit number
+CARDS = [Card.new(r + s) for r in Card.STR_RANKS for s in 'shdc']
+SUIT_NUMBER = [-1, 0, 1, -1, 2, -1, -1, -1, 3, -1, -1, -1, -1, -1, -1, -1]
+
+# BINOMIAL[n][k] = C(n, k) for 0 <= n <= 52 and 0 <= k <= MAX_CARDS
+BINOMIAL = [[1] + [0] * MAX_CARDS]
+for _n in range(1, 53):
+    _prev = BINOMIAL[-1]
+    BINOMIAL.append([1] + [_prev[_k - 1] + _prev[_k]
+                           for _k in range(1, MAX_CARDS + 1)])
+
+
+def choose(n, k):
+    """
+    Binomial coefficient C(n, k), also for n beyond the table.
+    """
+    if k < 0 or k > n:
+        return 0
+    if n <= 52 and k <= MAX_CARDS:
+        return BINOMIAL[n][k]
+    total = 1
+    for i in range(k):
+        total = total * (n - i) // (i + 1)
+    return total
+
+
+def card_number(card):
+    """
+    Number of a card int in [0, 52), ordered by rank then suit. Raises
+    ValueError for jokers, which have no suit.
+    """
+    suit = SUIT_NUMBER[(card >> 12) & 0xF]
+    if suit < 0:
+        raise ValueError("Jokers can not be indexed")
+    return ((card >> 8) & 0xF) * 4 + suit
+
+
+def colex_size(k):
+    """
+    Number of sets of k cards.
+    """
+    return BINOMIAL[52][k]
+
+
+def colex_index(cards):
+    """
+    Index of a set of card ints in [0, colex_size(len(cards))).
+    """
+    index = 0
+    for i, number in enumerate(sorted(card_number(c) for c in cards)):
+        index += BINOMIAL[number][i + 1]
+    return index
+
+
+def _unrank(index, k, largest, binomial=choose):
+    """
+    Inverse of the colex sum: the values w_k > ... > w_1 with
+    sum C(w_i, i) == index, each w_i at most largest.
+    """
+    values = []
+    for i in range(k, 0, -1):
+        # the largest w with C(w, i) <= index
+        lo, hi = i - 1, largest
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if binomial(mid, i) <= index:
+                lo = mid
+            else:
+                hi = mid - 1
+        values.append(lo)
+        index -= binomial(lo, i)
+        largest = lo - 1
+    return values
+
+
+def colex_cards(index, k):
+    """
+    The k card ints whose colex_index() is index, highest first.
+    """
+    return [CARDS[n] for n in _unrank(index, k, 51)]
+
+
+# rank sets of a single suit: 13 bit mask <=> colex index among its size
+_MASK_INDEX = [0] * (1 << 13)
+_MASKS = [[] for _ in range(14)]
+for _mask in range(1 << 13):
+    _bits = [r for r in range(13) if _mask >> r & 1]
+    _MASK_INDEX[_mask] = sum(choose(r, i + 1) for i, r in enumerate(_bits))
+    _MASKS[len(_bits)].append(_mask)
+for _masks in _MASKS:
+    _masks.sort(key=lambda m: _MASK_INDEX[m])
+
+
+def _partitions(k, parts=4, most=13):
+    """
+    Suit sizes of sets of k cards, largest first.
+    """
+    if k == 0:
+        yield ()
+        return
+    if parts == 0:
+        return
+    for size in range(min(k, most), 0, -1):
+        for rest in _partitions(k - size, parts - 1, size):
+            yield (size,) + rest
+
+
+_iso_tables = {}
+
+
+def _iso_table(k):
+    """
+    Suit sizes of every block of iso indices for k cards, the first index
+    of each block, and the runs of equal sizes in it as (size, count,
+    radix) tuples.
+    """
+    if k not in _iso_tables:
+        sizes, offsets, runs = [], [], []
+        total = 0
+        for partition in _partitions(k):
+            block_runs = []
+            block = 1
+            for size in sorted(set(partition), reverse=True):
+                count = partition.count(size)
+                radix = choose(choose(13, size) + count - 1, count)
+                block_runs.append((size, count, radix))
+                block *= radix
+            sizes.append(partition)
+            offsets.append(total)
+            runs.append(block_runs)
+            total += block
+        _iso_tables[k] = (sizes, offsets, runs, total)
+    return _iso_tables[k]
+
+
+def iso_size(k):
+    """
+    Number of sets of k cards which differ by more than a permutation of
+    suits.
+    """
+    return _iso_table(k)[3]
+
+
+def iso_index(cards):
+    """
+    Index of a set of card ints in [0, iso_size(len(cards))), the same for
+    all sets which are equal up to a permutation of suits.
+    """
+    masks = [0, 0, 0, 0]
+    for card in cards:
+        masks[card_number(card) & 3] |= (card >> 16) & 0x1FFF
+    suits = sorted(((bin(m).count('1'), _MASK_INDEX[m]) for m in masks if m),
+                   reverse=True)
+
+    table_sizes, offsets, runs, _ = _iso_table(len(cards))
+    block = table_sizes.index(tuple(size for size, _ in suits))
+    index = 0
+    position = 0
+    for size, count, radix in runs[block]:
+        # multiset index of the suits of this size, smallest value first
+        values = [v for _, v in suits[position:position + count]]
+        values.reverse()
+        index = index * radix + sum(choose(v + i, i + 1)
+                                    for i, v in enumerate(values))
+        position += count
+    return offsets[block] + index
+
+
+def iso_cards(index, k):
+    """
+    The canonical set of k card ints whose iso_index() is index: the
+    largest suits are spades, then hearts, diamonds and clubs.
+    """
+    table_sizes, offsets, runs, _ = _iso_table(k)
+    block = bisect.bisect_right(offsets, index) - 1
+    index -= offsets[block]
+
+    digits = []
+    for size, count, radix in reversed(runs[block]):
+        index, digit = divmod(index, radix)
+        digits.append((size, count, digit))
+    digits.reverse()
+
+    cards = []
+    suit = 0
+    for size, count, digit in digits:
+        shifted = _unrank(digit, count, choose(13, size) + count - 2)
+        for i, w in enumerate(shifted):
+            # w = v + (count - 1 - i) for the values from largest down
+            mask = _MASKS[size][w - (count - 1 - i)]
+            cards.extend(CARDS[r * 4 + suit] for r in range(13)
+                         if mask >> r & 1)
+            suit += 1
+    return cards
+
+
+if np is not None:
+    _NP_BINOMIAL = np.array(BINOMIAL, dtype=np.int64)
+    _NP_CARDS = np.array(CARDS, dtype=np.int64)
+    _NP_SUIT_NUMBER = np.array(SUIT_NUMBER, dtype=np.int64)
+
+
+def colex_index_many(hands):
+    """
+    colex_index() of every row of an (n, k) array of card ints. Returns a
+    NumPy array, or a list if NumPy is not installed.
+    """
+    if np is None:
+        return [colex_index(hand) for hand in hands]
+    hands = np.asarray(hands, dtype=np.int64)
+    suits = _NP_SUIT_NUMBER[(hands >> 12) & 0xF]
+    if (suits < 0).any():
+        raise ValueError("Jokers can not be indexed")
+    numbers = ((hands >> 8) & 0xF) * 4 + suits
+    numbers.sort(axis=1)
+    index = np.zeros(len(hands), dtype=np.int64)
+    for i in range(numbers.shape[1]):
+        index += _NP_BINOMIAL[numbers[:, i], i + 1]
+    return index
+
+
+def colex_cards_many(indices, k):
+    """
+    colex_cards() of every index, as an (n, k) array of card ints, or a
+    list of lists if NumPy is not installed.
+    """
+    if np is None:
+        return [colex_cards(index, k) for index in indices]
+    rest = np.array(indices, dtype=np.int64)
+    numbers = np.empty((len(rest), k), dtype=np.int64)
+    for column, i in enumerate(range(k, 0, -1)):
+        # C(n, i) grows with n, so the largest n with C(n, i) <= rest
+        n = np.searchsorted(_NP_BINOMIAL[:, i], rest, side='right') - 1
+        numbers[:, column] = n
+        rest -= _NP_BINOMIAL[n, i]
+    return _NP_CARDS[numbers]
@@ -93,159 +93,95 @@ class LookupTable(object):
             4111 # int('0b1000000001111', 2) # 5 high
         ]
 
-        # now we'll dynamically generate all the other
-        # flushes (including straight flushes)
+        # now we'll generate all the other flushes (including straight
+        # flushes) from the best down, together with their prime products.
+        # Combinations of ranks in descending order come out in descending
+        # order of their bit patterns, so no sorting is needed
+        straight_set = set(straight_flushes)
+        bits_of = [1 << r for r in Card.INT_RANKS]
+        primes = Card.PRIMES
         flushes = []
-        gen = self.get_lexographically_next_bit_sequence(int('0b11111', 2))
-
-        # 1277 = number of high cards
-        # 1277 + len(str_flushes) is number of hands with all cards unique rank
-        for i in xrange(1277 + len(straight_flushes) - 1): # we also iterate over SFs
-            # pull the next flush pattern from our generator
-            f = next(gen)
-
-            # if this flush matches perfectly any
-            # straight flush, do not add it
-            notSF = True
-            for sf in straight_flushes:
-                # if f XOR sf == 0, then bit pattern 
-                # is same, and we should not add
-                if not f ^ sf:
-                    notSF = False
-
-            if notSF:
-                flushes.append(f)
-
-        # we started from the lowest straight pattern, now we want to start ranking from
-        # the most powerful hands, so we reverse
-        flushes.reverse()
+        for a, b, c, d, e in itertools.combinations(Card.INT_RANKS[::-1], 5):
+            bits = bits_of[a] | bits_of[b] | bits_of[c] | bits_of[d] \
+                | bits_of[e]
+            if bits not in straight_set:
+                flushes.append(
+                    primes[a] * primes[b] * primes[c] * primes[d] * primes[e])
 
         # now add to the lookup map:
         # start with straight flushes and the rank of 1
         # since theyit is the best hand in poker
         # rank 1 = Royal Flush!
-        rank = 1
-        for sf in straight_flushes:
-            prime_product = Card.prime_product_from_rankbits(sf)
-            self.flush_lookup[prime_product] = rank
-            rank += 1
+        straights = [Card.prime_product_from_rankbits(sf)
+                     for sf in straight_flushes]
+        self.flush_lookup.update(itertools.izip(straights, itertools.count(1)))
 
         # we start the counting for flushes on max full house, which
         # is the worst rank that a full house can have (2,2,2,3,3)
-        rank = LookupTable.MAX_FULL_HOUSE + 1
-        for f in flushes:
-            prime_product = Card.prime_product_from_rankbits(f)
-            self.flush_lookup[prime_product] = rank
-            rank += 1
+        self.flush_lookup.update(itertools.izip(
+            flushes, itertools.count(LookupTable.MAX_FULL_HOUSE + 1)))
 
-        # we can reuse these bit sequences for straights
+        # we can reuse these prime products for straights
         # and high cards since they are inherently related
         # and differ only by context 
-        self.straight_and_highcards(straight_flushes, flushes)
+        self.straight_and_highcards(straights, flushes)
 
     def straight_and_highcards(self, straights, highcards):
         """
         Unique five card sets. Straights and highcards. 
 
-        Reuses bit sequences from flush calculations.
+        Reuses the prime products from flush calculations.
         """
-        rank = LookupTable.MAX_FLUSH + 1
-
-        for s in straights:
-            prime_product = Card.prime_product_from_rankbits(s)
-            self.unsuited_lookup[prime_product] = rank
-            rank += 1
-
-        rank = LookupTable.MAX_PAIR + 1
-        for h in highcards:
-            prime_product = Card.prime_product_from_rankbits(h)
-            self.unsuited_lookup[prime_product] = rank
-            rank += 1
+        self.unsuited_lookup.update(itertools.izip(
+            straights, itertools.count(LookupTable.MAX_FLUSH + 1)))
+        self.unsuited_lookup.update(itertools.izip(
+            highcards, itertools.count(LookupTable.MAX_PAIR + 1)))
 
     def multiples(self):
         """
         Pair, Two Pair, Three of a Kind, Full House, and 4 of a Kind.
-        """
-        backwards_ranks = range(len(Card.INT_RANKS) - 1, -1, -1)
-
-        # 1) Four of a Kind
-        rank = LookupTable.MAX_STRAIGHT_FLUSH + 1
-
-        # for each choice of a set of four rank
-        for i in backwards_ranks:
-
-            # and for each possible kicker rank
-            kickers = backwards_ranks[:]
-            kickers.remove(i)
-            for k in kickers:
-                product = Card.PRIMES[i]**4 * Card.PRIMES[k]
-                self.unsuited_lookup[product] = rank
-                rank += 1
-        
-        # 2) Full House
-        rank = LookupTable.MAX_FOUR_OF_A_KIND + 1
-
-        # for each three of a kind
-        for i in backwards_ranks:
-
-            # and for each choice of pair rank
-            pairranks = backwards_ranks[:]
-            pairranks.remove(i)
-            for pr in pairranks:
-                product = Card.PRIMES[i]**3 * Card.PRIMES[pr]**2
-                self.unsuited_lookup[product] = rank
-                rank += 1
-
-        # 3) Three of a Kind
-        rank = LookupTable.MAX_STRAIGHT + 1
-
-        # pick three of one rank
-        for r in backwards_ranks:
-
-            kickers = backwards_ranks[:]
-            kickers.remove(r)
-            gen = itertools.combinations(kickers, 2)
 
-            for kickers in gen:
-
-                c1, c2 = kickers
-                product = Card.PRIMES[r]**3 * Card.PRIMES[c1] * Card.PRIMES[c2]
-                self.unsuited_lookup[product] = rank
-                rank += 1
-
-        # 4) Two Pair
-        rank = LookupTable.MAX_THREE_OF_A_KIND + 1
-
-        tpgen = itertools.combinations(backwards_ranks, 2)
-        for tp in tpgen:
-
-            pair1, pair2 = tp
-            kickers = backwards_ranks[:]
-            kickers.remove(pair1)
-            kickers.remove(pair2)
-            for kicker in kickers:
-
-                product = Card.PRIMES[pair1]**2 * Card.PRIMES[pair2]**2 * Card.PRIMES[kicker]
-                self.unsuited_lookup[product] = rank
-                rank += 1
-
-        # 5) Pair
-        rank = LookupTable.MAX_TWO_PAIR + 1
-
-        # choose a pair
-        for pairrank in backwards_ranks:
-
-            kickers = backwards_ranks[:]
-            kickers.remove(pairrank)
-            kgen = itertools.combinations(kickers, 3)
-
-            for kickers in kgen:
+        Each category is a list of prime products generated in rank order
+        from precomputed powers of the primes.
+        """
+        backwards_ranks = Card.INT_RANKS[::-1]
+        p = Card.PRIMES
+        p2 = [x ** 2 for x in p]
+        p3 = [x ** 3 for x in p]
+        p4 = [x ** 4 for x in p]
+        pairs = list(itertools.combinations(backwards_ranks, 2))
+        triples = list(itertools.combinations(backwards_ranks, 3))
+
+        categories = [
+            # 1) Four of a Kind: four of one rank and any kicker
+            (LookupTable.MAX_STRAIGHT_FLUSH,
+             [p4[i] * p[k] for i in backwards_ranks
+              for k in backwards_ranks if k != i]),
+
+            # 2) Full House: three of one rank and a pair of another
+            (LookupTable.MAX_FOUR_OF_A_KIND,
+             [p3[i] * p2[k] for i in backwards_ranks
+              for k in backwards_ranks if k != i]),
+
+            # 3) Three of a Kind: three of one rank and two kickers
+            (LookupTable.MAX_STRAIGHT,
+             [p3[r] * p[k1] * p[k2] for r in backwards_ranks
+              for k1, k2 in pairs if k1 != r and k2 != r]),
+
+            # 4) Two Pair: two pair ranks and a kicker
+            (LookupTable.MAX_THREE_OF_A_KIND,
+             [p2[r1] * p2[r2] * p[k] for r1, r2 in pairs
+              for k in backwards_ranks if k != r1 and k != r2]),
+
+            # 5) Pair: a pair and three kickers
+            (LookupTable.MAX_TWO_PAIR,
+             [p2[r] * p[k1] * p[k2] * p[k3] for r in backwards_ranks
+              for k1, k2, k3 in triples if r != k1 and r != k2 and r != k3]),
+        ]
 
-                k1, k2, k3 = kickers
-                product = Card.PRIMES[pairrank]**2 * Card.PRIMES[k1] \
-                        * Card.PRIMES[k2] * Card.PRIMES[k3]
-                self.unsuited_lookup[product] = rank
-                rank += 1
+        for previous_max, products in categories:
+            self.unsuited_lookup.update(itertools.izip(
+                products, itertools.count(previous_max + 1)))
 
     def write_table_to_disk(self, table, filepath):
         """
@@ -269,4 +205,26 @@ class LookupTable(object):
         while True:
             t = (next | (next - 1)) + 1 
             next = t | ((((t & -t) / (next & -next)) >> 1) - 1)
-            yield next
\ No newline at end of file
+            yield next
+
+def rank_to_class():
+    """
+    Lists the class of every hand rank, so that it can be found with a 
+    single index instead of comparing against each MAX_* bound.
+    Index 0 is not a real rank, it is given the best class.
+    """
+    classes = []
+    for max_rank, rank_class in sorted(LookupTable.MAX_TO_RANK_CLASS.items()):
+        classes.extend([rank_class] * (max_rank + 1 - len(classes)))
+    return classes
+
+LookupTable.RANK_TO_CLASS = rank_to_class()
+
+if __name__ == '__main__':
+    # building the tables is on the cold start path of every Evaluator
+    import timeit
+    runs = 20
+    seconds = timeit.timeit(LookupTable, number=runs) / runs
+    table = LookupTable()
+    print "%d flush, %d unsuited entries built in %.2f ms" % (
+        len(table.flush_lookup), len(table.unsuited_lookup), seconds * 1000)
@@ -0,0 +1,27 @@
+"""
+Locates the optional compiled core in _cdeuces.pyx.
+
+The core is built ahead of time, by "python setup.py build_ext --inplace"
+on the desktop and by the cdeuces recipe on Android, and is only imported
+here. Developers who edit the .pyx can set DEUCES_PYXIMPORT to have it
+compiled on the fly with pyximport instead. If the core is missing, or
+DEUCES_PURE is set in the environment, _cdeuces is None and the pure Python
+code is used. Both give identical results.
+"""
+import os
+
+_cdeuces = None
+
+if not os.environ.get('DEUCES_PURE'):
+    if os.environ.get('DEUCES_PYXIMPORT'):
+        import pyximport
+        importers = pyximport.install()
+        try:
+            import _cdeuces
+        finally:
+            pyximport.uninstall(*importers)
+    else:
+        try:
+            import _cdeuces
+        except ImportError:
+            _cdeuces = None
@@ -0,0 +1,294 @@
+"""
+Board texture, draws, outs and the nuts of hold'em boards, from the bitrank
+and suit bits of the cards.
+
+All straight questions go through tables indexed by a 13 bit mask of ranks,
+built by the first TextureAnalyzer and shared by all the later ones:
+
+    STRAIGHT_HIGH[mask]    highest straight in the mask, -1 if none
+    STRAIGHT_OUTS[mask]    ranks which would each make a better straight
+    REACH_HIGH[mask]       highest straight the mask can make by adding at
+                           most two ranks, -1 if none
+    REACH_NEEDED[mask]     ranks it needs for that straight
+
+and flushes through the number of cards of each suit, so analysing a board
+or a hand takes a fixed number of lookups whatever the cards are. The rank
+of a hand and of the nuts need one evaluation each.
+"""
+
+from card import Card
+from deck import Deck
+from evaluator import Evaluator
+from lookup import LookupTable
+
+SUITS = [1, 2, 4, 8]
+
+# best first, each a (rank of the high card, mask) tuple; the wheel last
+STRAIGHTS = [(high, 0x1F << (high - 4)) for high in range(12, 3, -1)]
+STRAIGHTS.append((3, 0x100F))
+
+
+# number of set bits of every 13 bit mask
+BIT_COUNT = [0] * 8192
+for _mask in range(1, 8192):
+    BIT_COUNT[_mask] = BIT_COUNT[_mask >> 1] + (_mask & 1)
+del _mask
+
+
+def bit_count(mask):
+    """
+    Number of set bits of a 13 bit mask.
+    """
+    return BIT_COUNT[mask]
+
+_tables = None
+
+
+def straight_tables():
+    """
+    The (STRAIGHT_HIGH, STRAIGHT_OUTS, REACH_HIGH, REACH_NEEDED) tables,
+    built on the first call.
+    """
+    global _tables
+    if _tables is None:
+        _tables = _straight_tables()
+    return _tables
+
+
+def _straight_tables():
+    high_table = [-1] * 8192
+    outs_table = [0] * 8192
+    reach_high = [-1] * 8192
+    reach_needed = [0] * 8192
+    for mask in range(8192):
+        for high, straight in STRAIGHTS:
+            missing = straight & ~mask
+            if not missing:
+                if high_table[mask] < 0:
+                    high_table[mask] = high
+            elif BIT_COUNT[missing] == 1 and high > high_table[mask]:
+                outs_table[mask] |= missing
+            if BIT_COUNT[missing] <= 2 and reach_high[mask] < 0:
+                reach_high[mask] = high
+                reach_needed[mask] = missing
+    return high_table, outs_table, reach_high, reach_needed
+
+# draw classes
+STRAIGHT_FLUSH_DRAW = "Straight Flush Draw"
+FLUSH_DRAW = "Flush Draw"
+BACKDOOR_FLUSH_DRAW = "Backdoor Flush Draw"
+OPEN_ENDED = "Open-Ended Straight Draw"
+DOUBLE_GUTSHOT = "Double Gutshot"
+GUTSHOT = "Gutshot"
+BACKDOOR_STRAIGHT_DRAW = "Backdoor Straight Draw"
+
+CARDS = dict(((r, s), Card.new(Card.STR_RANKS[r] +
+                                 Card.INT_SUIT_TO_CHAR_SUIT[s]))
+             for r in range(13) for s in SUITS)
+
+TONES = {1: 'monotone', 2: 'two-tone', 3: 'three-tone', 4: 'four-tone'}
+
+
+class TextureAnalyzer(object):
+    """
+    Describes boards and the draws of hands on them.
+
+    texture() tells how coordinated a board is and what the nuts are,
+    analyze() what a hand holds, what it draws to and its outs, and
+    analyze_many() does the latter for a whole range on one board,
+    working out the board only once.
+    """
+
+    def __init__(self, evaluator=None):
+        self.evaluator = evaluator or Evaluator()
+        (self.straight_high, self.straight_outs,
+         self.reach_high, self.reach_needed) = straight_tables()
+
+    @staticmethod
+    def _masks(cards):
+        """
+        Rank mask of all the cards and rank mask of every suit.
+        """
+        ranks = 0
+        suits = {1: 0, 2: 0, 4: 0, 8: 0}
+        for card in cards:
+            bits = (card >> 16) & 0x1FFF
+            ranks |= bits
+            suits[(card >> 12) & 0xF] |= bits
+        return ranks, suits
+
+    @staticmethod
+    def _card(rank, suit):
+        return CARDS[rank, suit]
+
+    def nuts(self, board):
+        """
+        The best hole cards on a board of 3 to 5 cards and their rank.
+        Returns a (rank, hole cards) tuple; other holdings may tie.
+        """
+        ranks, suits = self._masks(board)
+        counts = {}
+        for card in board:
+            rank = (card >> 8) & 0xF
+            counts[rank] = counts.get(rank, 0) + 1
+        known = set(board)
+
+        def fill(hole):
+            # completes the hole cards with the best cards still available
+            for card in reversed(Deck.GetFullDeck()):
+                if len(hole) == 2:
+                    break
+                if card not in known and card not in hole:
+                    hole.append(card)
+            return hole
+
+        candidates = []
+
+        # straight flushes
+        for suit in SUITS:
+            mask = suits[suit]
+            if bit_count(mask) >= 3 and self.reach_high[mask] >= 0:
+                needed = self.reach_needed[mask]
+                candidates.append(fill([self._card(r, suit) for r in range(13)
+                                        if needed >> r & 1]))
+
+        # quads of the highest rank paired on the board
+        paired = [r for r, n in counts.iteritems() if n >= 2]
+        if paired:
+            rank = max(paired)
+            candidates.append(fill([self._card(rank, s) for s in SUITS
+                                    if self._card(rank, s) not in known]))
+
+        # the highest flush
+        for suit in SUITS:
+            if bit_count(suits[suit]) >= 3:
+                candidates.append(fill(
+                    [self._card(r, suit) for r in range(12, -1, -1)
+                     if not suits[suit] >> r & 1][:2]))
+
+        # the highest straight
+        if self.reach_high[ranks] >= 0:
+            needed = self.reach_needed[ranks]
+            hole = []
+            for r in range(13):
+                if needed >> r & 1:
+                    hole.append(next(self._card(r, s) for s in SUITS
+                                     if self._card(r, s) not in known))
+            candidates.append(fill(hole))
+
+        # a set of the highest board card
+        top = max(counts)
+        candidates.append(fill([self._card(top, s) for s in SUITS
+                                if self._card(top, s) not in known][:2]))
+
+        evaluate = self.evaluator.evaluate
+        return min((evaluate(hole, list(board)), hole)
+                   for hole in candidates)
+
+    def texture(self, board):
+        """
+        Describes a board of 3 to 5 cards: the number of cards of the most
+        common suit and rank, 'rainbow' if all suits differ or else how
+        many suits there are ('monotone', 'two-tone', ...), whether
+        flushes and straights can be made with two hole cards, how
+        'connected' it is (the number of straights reachable with two hole
+        cards), and the nuts.
+        """
+        ranks, suits = self._masks(board)
+        suited = max(bit_count(m) for m in suits.itervalues())
+        colors = sum(1 for m in suits.itervalues() if m)
+        counts = {}
+        for card in board:
+            rank = (card >> 8) & 0xF
+            counts[rank] = counts.get(rank, 0) + 1
+        connected = sum(1 for high, straight in STRAIGHTS
+                        if bit_count(straight & ~ranks) <= 2)
+        rank, hole = self.nuts(board)
+        return {
+            'suited': suited,
+            'suits': 'rainbow' if colors == len(board) else
+                     TONES[colors],
+            'paired': max(counts.itervalues()),
+            'flush_possible': suited >= 3,
+            'straight_possible': self.reach_high[ranks] >= 0,
+            'connected': connected,
+            'nut_rank': rank,
+            'nut_class': self.evaluator.class_to_string(
+                self.evaluator.get_rank_class(rank)),
+            'nut_hole': hole,
+        }
+
+    def analyze(self, hole, board, nut_rank=None):
+        """
+        What two hole cards make on a board of 3 to 5 cards and what they
+        draw to: the 'rank' and 'class' of the hand, whether it is the
+        'nuts', its straight flush, flush and straight 'draws' and the
+        'outs' completing them. Outs are the cards which make a straight
+        flush better than the hand, or a flush or straight when the hand
+        is worse than one. nut_rank saves working out the nuts again.
+        """
+        if nut_rank is None:
+            nut_rank = self.nuts(board)[0]
+        cards = list(hole) + list(board)
+        ranks, suits = self._masks(cards)
+        rank = self.evaluator.evaluate(list(hole), list(board))
+        rank_class = self.evaluator.get_rank_class(rank)
+        known = set(cards)
+        draws = []
+        outs = set()
+
+        if len(board) < 5:
+            # straight flushes, also for a hand holding a flush or better
+            for suit in SUITS:
+                needed = self.straight_outs[suits[suit]]
+                if needed:
+                    draws.append(STRAIGHT_FLUSH_DRAW)
+                    outs.update(self._card(r, suit) for r in range(13)
+                                if needed >> r & 1)
+
+            # flushes
+            if rank > LookupTable.MAX_FLUSH:
+                for suit in SUITS:
+                    n = bit_count(suits[suit])
+                    if n == 4:
+                        draws.append(FLUSH_DRAW)
+                        outs.update(self._card(r, suit) for r in range(13)
+                                    if not suits[suit] >> r & 1)
+                    elif n == 3 and len(board) == 3:
+                        draws.append(BACKDOOR_FLUSH_DRAW)
+
+            # straights
+            if rank > LookupTable.MAX_STRAIGHT:
+                needed = self.straight_outs[ranks]
+                n = bit_count(needed)
+                if n >= 2:
+                    # four in a row are open ended, otherwise two gutshots
+                    run = any((ranks >> r) & 0xF == 0xF for r in range(10))
+                    draws.append(OPEN_ENDED if run else DOUBLE_GUTSHOT)
+                elif n == 1:
+                    draws.append(GUTSHOT)
+                elif len(board) == 3 and self.reach_high[ranks] >= 0:
+                    draws.append(BACKDOOR_STRAIGHT_DRAW)
+                for r in range(13):
+                    if needed >> r & 1:
+                        outs.update(self._card(r, s) for s in SUITS)
+
+        outs -= known
+        return {
+            'rank': rank,
+            'class': self.evaluator.class_to_string(rank_class),
+            'nuts': rank == nut_rank,
+            'draws': draws,
+            'outs': sorted(outs, reverse=True),
+        }
+
+    def analyze_many(self, holes, board):
+        """
+        analyze() of every hole cards of a range on the same board, the
+        nuts being worked out once. Holdings using a board card are
+        skipped. Returns a list of (hole cards, analysis) tuples.
+        """
+        nut_rank = self.nuts(board)[0]
+        on_board = set(board)
+        return [(hole, self.analyze(hole, board, nut_rank)) for hole in holes
+                if not on_board.intersection(hole)]
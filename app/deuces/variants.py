@@ -0,0 +1,402 @@
+"""
+Evaluators for poker variants other than hold'em and draw. All of them
+rank hands in the same way as the standard Evaluator: a lower rank is a
+better hand, starting from 1.
+
+Each variant has its own lookup tables keyed by prime products. For more
+than five cards, tables of the best five card rank of every multiset of
+ranks and of every set of suited ranks are built up front from the five
+card ones, so any hand is ranked with a couple of lookups.
+"""
+
+import collections
+import itertools
+from card import Card
+from deck import Deck
+from evaluator import Evaluator
+from lookup import LookupTable
+
+STRAIGHT_FLUSH = "Straight Flush"
+FOUR_OF_A_KIND = "Four of a Kind"
+FULL_HOUSE = "Full House"
+FLUSH = "Flush"
+STRAIGHT = "Straight"
+THREE_OF_A_KIND = "Three of a Kind"
+TWO_PAIR = "Two Pair"
+PAIR = "Pair"
+HIGH_CARD = "High Card"
+
+STANDARD_ORDER = [STRAIGHT_FLUSH, FOUR_OF_A_KIND, FULL_HOUSE, FLUSH,
+                  STRAIGHT, THREE_OF_A_KIND, TWO_PAIR, PAIR, HIGH_CARD]
+
+
+def classes_of(names):
+    """
+    Numbers the class names of consecutive ranks in order of appearance.
+    Returns a list of the class of every rank, index 0 being unused, and
+    the dictionary from class to name.
+    """
+    rank_to_class = [1]
+    rank_class_to_string = {}
+    numbers = {}
+    for name in names:
+        if name not in numbers:
+            numbers[name] = len(numbers) + 1
+            rank_class_to_string[numbers[name]] = name
+        rank_to_class.append(numbers[name])
+    return rank_to_class, rank_class_to_string
+
+
+def straights_of(ranks, wheel=True):
+    """
+    Lists the straights that can be made of the given int ranks, best
+    first. With wheel, the ace also plays below the lowest rank.
+    """
+    ranks = sorted(ranks, reverse=True)
+    straights = [tuple(ranks[i:i + 5]) for i in range(len(ranks) - 4)]
+    if wheel:
+        straights.append((ranks[0],) + tuple(ranks[-4:]))
+    return straights
+
+
+class HighTable(object):
+    """
+    Five card lookup tables of a variant where the highest hand wins,
+    generated in the same form as LookupTable:
+
+        flush_lookup:    prime product => rank of the flush (5 suits alike)
+        unsuited_lookup: prime product => rank of any other hand
+        ranks:           int ranks in the deck, highest first
+
+    The variant is given by the ranks in the deck, the straights that can
+    be made with them and the order of the hand classes. With all 13 ranks,
+    the wheel and STANDARD_ORDER the tables equal LookupTable's.
+    """
+
+    def __init__(self, ranks=Card.INT_RANKS, straights=None,
+                 order=STANDARD_ORDER):
+
+        ranks = sorted(ranks, reverse=True)
+        self.ranks = ranks
+        if straights is None:
+            straights = straights_of(ranks)
+        p = Card.PRIMES
+        product = lambda rs: reduce(lambda a, r: a * p[r], rs, 1)
+
+        straight_set = set(straights)
+        straight_products = [product(s) for s in straights]
+        high_cards = [product(c) for c in itertools.combinations(ranks, 5)
+                      if c not in straight_set]
+        pairs = list(itertools.combinations(ranks, 2))
+        triples = list(itertools.combinations(ranks, 3))
+
+        categories = {
+            STRAIGHT_FLUSH: (True, straight_products),
+            FOUR_OF_A_KIND: (False, [p[i] ** 4 * p[k] for i in ranks
+                                     for k in ranks if k != i]),
+            FULL_HOUSE: (False, [p[i] ** 3 * p[k] ** 2 for i in ranks
+                                 for k in ranks if k != i]),
+            FLUSH: (True, high_cards),
+            STRAIGHT: (False, straight_products),
+            THREE_OF_A_KIND: (False, [p[r] ** 3 * p[k1] * p[k2]
+                                      for r in ranks for k1, k2 in pairs
+                                      if r != k1 and r != k2]),
+            TWO_PAIR: (False, [p[r1] ** 2 * p[r2] ** 2 * p[k]
+                               for r1, r2 in pairs for k in ranks
+                               if k != r1 and k != r2]),
+            PAIR: (False, [p[r] ** 2 * p[k1] * p[k2] * p[k3]
+                           for r in ranks for k1, k2, k3 in triples
+                           if r != k1 and r != k2 and r != k3]),
+            HIGH_CARD: (False, high_cards),
+        }
+
+        self.flush_lookup = {}
+        self.unsuited_lookup = {}
+        self.names = [None]  # class name of every rank
+        for name in order:
+            suited, products = categories[name]
+            lookup = self.flush_lookup if suited else self.unsuited_lookup
+            for prime_product in products:
+                lookup[prime_product] = len(self.names)
+                self.names.append(name)
+        self.max_rank = len(self.names) - 1
+        self.rank_to_class, self.rank_class_to_string = classes_of(
+            self.names[1:])
+
+    def reversed(self):
+        """
+        Turns the ranking upside down, for lowball games where the worst
+        high hand wins.
+        """
+        last = self.max_rank + 1
+        for lookup in (self.flush_lookup, self.unsuited_lookup):
+            for prime_product, rank in lookup.iteritems():
+                lookup[prime_product] = last - rank
+        self.names = [None] + self.names[:0:-1]
+        self.rank_to_class, self.rank_class_to_string = classes_of(
+            self.names[1:])
+        return self
+
+
+class AceToFiveTable(object):
+    """
+    Five card lookup table of A-5 lowball (California lowball, razz): aces
+    are low, straights and flushes do not count, so a single table keyed
+    by prime product is enough. 5-4-3-2-A is the best hand with rank 1.
+
+    Hands with no pair come first, then one pair, two pair, three of a
+    kind, full house and four of a kind. Within a class the hand whose
+    highest group is lower wins, e.g. 6-4-3-2-A beats 6-5-3-2-A.
+    """
+
+    CLASSES = [HIGH_CARD, PAIR, TWO_PAIR, THREE_OF_A_KIND, FULL_HOUSE,
+               FOUR_OF_A_KIND]
+    SHAPES = [(1, 1, 1, 1, 1), (2, 1, 1, 1), (2, 2, 1), (3, 1, 1), (3, 2),
+              (4, 1)]
+
+    def __init__(self):
+
+        def key(ranks):
+            # the ace (int rank 12) is the lowest card
+            counts = collections.Counter((r + 1) % 13 for r in ranks)
+            groups = sorted(counts.items(), key=lambda (v, n): (-n, -v))
+            shape = tuple(n for v, n in groups)
+            return shape, [v for v, n in groups]
+
+        hands = [h for h in itertools.combinations_with_replacement(
+                    Card.INT_RANKS, 5) if max(collections.Counter(h)
+                                              .values()) <= 4]
+        hands.sort(key=key)
+
+        self.unsuited_lookup = {}
+        names = []
+        for rank, hand in enumerate(hands, 1):
+            prime_product = 1
+            for r in hand:
+                prime_product *= Card.PRIMES[r]
+            self.unsuited_lookup[prime_product] = rank
+            names.append(self.CLASSES[self.SHAPES.index(key(hand)[0])])
+
+        self.ranks = Card.INT_RANKS
+        self.flush_lookup = None
+        self.max_rank = len(hands)
+        self.rank_to_class, self.rank_class_to_string = classes_of(names)
+
+
+class VariantEvaluator(object):
+    """
+    Evaluates the best five out of 5 to max_cards cards with the tables of
+    a variant.
+
+    The best unsuited rank of every multiset of 6 or more ranks is looked
+    up by the prime product of all the cards, and if five or more cards
+    share a suit, the best flush by the rank bits of that suit, which is
+    enough when a flush beats every unsuited hand with the same ranks.
+    Both tables are built when the evaluator is created, each hand of n
+    cards taking the best rank of the hands of n - 1 cards it contains. In
+    lowball, where a flush is worse than the unsuited hand, hands with five
+    cards of a suit are evaluated subset by subset.
+    """
+
+    lowball = False
+
+    def __init__(self, table, max_cards=7):
+        self.table = table
+        self.max_cards = max_cards
+
+        # a fifth card of a rank can not be added
+        primes = [(Card.PRIMES[r], Card.PRIMES[r] ** 4) for r in table.ranks]
+        level = table.unsuited_lookup
+        self.best_unsuited = dict(level)
+        for _ in range(5, max_cards):
+            extended = {}
+            for product, rank in level.iteritems():
+                for prime, quads in primes:
+                    if product % quads:
+                        key = product * prime
+                        if rank < extended.get(key, rank + 1):
+                            extended[key] = rank
+            self.best_unsuited.update(extended)
+            level = extended
+
+        self.best_flush = {}
+        if table.flush_lookup is not None:
+            level = {}
+            for prime_product, rank in table.flush_lookup.iteritems():
+                bits = 0
+                for r in table.ranks:
+                    if prime_product % Card.PRIMES[r] == 0:
+                        bits |= 1 << r
+                level[bits] = rank
+            self.best_flush.update(level)
+            for _ in range(5, max_cards):
+                extended = {}
+                for bits, rank in level.iteritems():
+                    for r in table.ranks:
+                        key = bits | 1 << r
+                        if key != bits and rank < extended.get(key, rank + 1):
+                            extended[key] = rank
+                self.best_flush.update(extended)
+                level = extended
+
+    def evaluate(self, cards, board):
+        """
+        Returns the rank of the best five card hand made of cards and board.
+        """
+        all_cards = cards + board
+        if not 5 <= len(all_cards) <= self.max_cards:
+            raise ValueError("Evaluates hands of 5 to {} cards".format(
+                self.max_cards))
+        product = 1
+        for c in all_cards:
+            product *= c & 0xFF
+        best = self.best_unsuited[product]
+
+        if self.table.flush_lookup is not None:
+            for suit in (0x1000, 0x2000, 0x4000, 0x8000):
+                suited = [c for c in all_cards if c & suit]
+                if len(suited) < 5:
+                    continue
+                if self.lowball:
+                    return self._exact(all_cards)
+                bits = 0
+                for c in suited:
+                    bits |= c >> 16
+                best = min(best, self.best_flush[bits])
+        return best
+
+    def _exact(self, cards):
+        """
+        Checks every 5 card subset, flushes included.
+        """
+        flush_lookup = self.table.flush_lookup
+        unsuited_lookup = self.table.unsuited_lookup
+        best = self.table.max_rank
+        for combo in itertools.combinations(cards, 5):
+            prime = Card.prime_product_from_hand(combo)
+            if combo[0] & combo[1] & combo[2] & combo[3] & combo[4] & 0xF000:
+                rank = flush_lookup[prime]
+            else:
+                rank = unsuited_lookup[prime]
+            if rank < best:
+                best = rank
+        return best
+
+    def get_rank_class(self, hr):
+        """
+        Returns the class of hand given the hand rank returned from
+        evaluate.
+        """
+        if 0 <= hr <= self.table.max_rank:
+            return self.table.rank_to_class[hr]
+        raise Exception("Invalid hand rank, cannot return rank class")
+
+    def class_to_string(self, class_int):
+        """
+        Converts the integer class hand score into a human-readable string.
+        """
+        return self.table.rank_class_to_string[class_int]
+
+
+class ShortDeckEvaluator(VariantEvaluator):
+    """
+    Short deck (six plus) hold'em: the 2s to 5s are removed, a flush beats
+    a full house and A-6-7-8-9 is the lowest straight. 1404 distinct hands.
+    """
+
+    RANKS = Card.INT_RANKS[4:]
+    ORDER = [STRAIGHT_FLUSH, FOUR_OF_A_KIND, FLUSH, FULL_HOUSE, STRAIGHT,
+             THREE_OF_A_KIND, TWO_PAIR, PAIR, HIGH_CARD]
+
+    def __init__(self):
+        VariantEvaluator.__init__(self, HighTable(
+            self.RANKS, straights_of(self.RANKS), self.ORDER))
+
+    @staticmethod
+    def deck():
+        """
+        The 36 cards of the short deck in integer form.
+        """
+        return [c for c in Deck.GetFullDeck()
+                if Card.get_rank_int(c) in ShortDeckEvaluator.RANKS]
+
+
+class DeuceToSevenEvaluator(VariantEvaluator):
+    """
+    2-7 (Kansas City) lowball: aces are high only, straights and flushes
+    count against the hand, so the best hand is 7-5-4-3-2 unsuited with
+    rank 1 and a royal flush is the worst. This is the standard ranking
+    turned upside down, except that A-2-3-4-5 is just an ace high.
+    """
+
+    lowball = True
+
+    def __init__(self):
+        VariantEvaluator.__init__(self, HighTable(
+            straights=straights_of(Card.INT_RANKS, wheel=False)).reversed())
+
+
+class AceToFiveEvaluator(VariantEvaluator):
+    """
+    A-5 lowball, e.g. razz when given 7 cards: see AceToFiveTable.
+    """
+
+    lowball = True
+
+    def __init__(self):
+        VariantEvaluator.__init__(self, AceToFiveTable())
+
+
+class OmahaEvaluator(Evaluator):
+    """
+    Omaha: the hand is made of exactly 2 of the 4 (or more) hole cards
+    and exactly 3 of the board cards, ranked like hold'em.
+
+    The suit mask and prime product of every hole pair and board triple
+    are combined up front, so each of the 60 candidate hands on the river
+    is a multiplication and a single lookup in the standard tables. The
+    triples of the last board are kept, as every player at the table is
+    evaluated against the same board.
+    """
+
+    INCREMENTAL = False
+
+    def __init__(self):
+        Evaluator.__init__(self)
+        self._last_board = (None, None)
+
+    def evaluate(self, cards, board):
+        """
+        Returns the rank of the best Omaha hand of 4 or more hole cards on
+        a board of 3 to 5 cards.
+        """
+        if len(cards) < 4 or not 3 <= len(board) <= 5:
+            raise ValueError("Omaha hands have 4 or more hole cards and a "
+                             "board of 3 to 5 cards")
+        last_board, triples = self._last_board
+        if board != last_board:
+            triples = [(a & b & c & 0xF000,
+                        (a & 0xFF) * (b & 0xFF) * (c & 0xFF))
+                       for a, b, c in itertools.combinations(board, 3)]
+            self._last_board = (list(board), triples)
+
+        flush_lookup = self.table.flush_lookup
+        unsuited_lookup = self.table.unsuited_lookup
+        best = LookupTable.MAX_HIGH_CARD
+        for a, b in itertools.combinations(cards, 2):
+            pair_suit = a & b & 0xF000
+            pair_product = (a & 0xFF) * (b & 0xFF)
+            for triple_suit, triple_product in triples:
+                if pair_suit & triple_suit:
+                    rank = flush_lookup[pair_product * triple_product]
+                else:
+                    rank = unsuited_lookup[pair_product * triple_product]
+                if rank < best:
+                    best = rank
+        return best
+
+    def evaluate_many(self, hands, board=[]):
+        """
+        Ranks of many hands of hole cards on the same board.
+        """
+        return [self.evaluate(hand, board) for hand in hands]
@@ -0,0 +1,108 @@
+import itertools
+from card import Card
+from evaluator import Evaluator
+from lookup import LookupTable
+
+class WildEvaluator(Evaluator):
+    """
+    Evaluates hands with up to two jokers as wild cards.
+
+    A joker stands for any card which is not already in the hand. There is
+    no five of a kind, so hands with jokers are ranked on the standard
+    [1, 7462] scale and can be compared with hands without them.
+
+    Rather than trying every substitution for each joker, the best
+    completion of every set of natural cards is precomputed when the
+    evaluator is built, for one and for two jokers:
+
+        wild_unsuited[n]: prime product of the naturals => best rank
+        wild_flush[n]:    prime product of suited naturals => best flush
+
+    so a five card hand with jokers takes one or two lookups, like a hand
+    without them. Jokers have a prime of 1, so the product of all the cards
+    is the product of the naturals.
+    """
+
+    MAX_JOKERS = 2
+    INCREMENTAL = False
+
+    def __init__(self):
+        Evaluator.__init__(self)
+
+        self.wild_unsuited = [None] + [{} for _ in range(self.MAX_JOKERS)]
+        self.wild_flush = [None] + [{} for _ in range(self.MAX_JOKERS)]
+        for lookup, wild in ((self.table.unsuited_lookup, self.wild_unsuited),
+                             (self.table.flush_lookup, self.wild_flush)):
+            for product, rank in lookup.iteritems():
+                factors = self.factorize(product)
+                for n in range(1, self.MAX_JOKERS + 1):
+                    for replaced in set(itertools.combinations(factors, n)):
+                        naturals = product
+                        for prime in replaced:
+                            naturals //= prime
+                        best = wild[n].get(naturals)
+                        if best is None or rank < best:
+                            wild[n][naturals] = rank
+
+    @staticmethod
+    def factorize(product):
+        """
+        Splits a prime product back into the primes of its ranks.
+        """
+        factors = []
+        for prime in Card.PRIMES:
+            while not product % prime:
+                factors.append(prime)
+                product //= prime
+        return factors
+
+    def evaluate(self, cards, board):
+        """
+        Rank of the best hand of 5 to 7 cards, any of which may be jokers.
+        """
+        all_cards = cards + board
+        if all(c & 0xF000 for c in all_cards):
+            return self.hand_size_map[len(all_cards)](all_cards)
+        if len(all_cards) == 5:
+            return self._wild_five(all_cards)
+
+        five = self.hand_size_map[5]
+        best = LookupTable.MAX_HIGH_CARD
+        for combo in itertools.combinations(all_cards, 5):
+            if all(c & 0xF000 for c in combo):
+                rank = five(combo)
+            else:
+                rank = self._wild_five(combo)
+            if rank < best:
+                best = rank
+        return best
+
+    def evaluate_many(self, hands, board=[]):
+        """
+        Ranks of many hands, each completed with the same board cards.
+        """
+        return [self.evaluate(list(hand), board) for hand in hands]
+
+    def _wild_five(self, cards):
+        """
+        Looks up the best completion of 5 cards containing jokers.
+        """
+        jokers = 0
+        suits = 0xF000
+        product = 1
+        for c in cards:
+            if c & 0xF000:
+                suits &= c
+            else:
+                jokers += 1
+            product *= c & 0xFF
+
+        if jokers > self.MAX_JOKERS:
+            raise ValueError("At most %d jokers supported" % self.MAX_JOKERS)
+
+        rank = self.wild_unsuited[jokers][product]
+        if suits:
+            flush = self.wild_flush[jokers].get(product)
+            if flush is not None and flush < rank:
+                rank = flush
+        return rank
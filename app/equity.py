@@ -0,0 +1,720 @@
+"""Range against range equity of two-card hands on a community board."""
+
+import array
+import bisect
+import itertools
+import math
+import random
+import time
+from collections import namedtuple
+
+from deuces import Deck as DDeck
+from deuces.indexing import card_number, colex_size
+from showdown import evaluator, shared
+
+FULL_DECK = DDeck.GetFullDeck()
+
+
+def combo_index(combo):
+    # type: (tuple) -> int
+    """Map a two-card combination to a slot of a per-board rank array.
+
+    This is the colex index of deuces.indexing, inlined for speed.
+
+    Args:
+        combo: Two cards in deuces integer form, in any order
+
+    Returns:
+        Index in the range [0, 1326)
+    """
+    a, b = card_number(combo[0]), card_number(combo[1])
+    if a > b:
+        a, b = b, a
+    return a + b * (b - 1) // 2
+
+
+def all_combos(dead=()):
+    # type: (iter) -> dict
+    """Build a range holding every combination not using a dead card.
+
+    Args:
+        dead: Cards in deuces integer form which can not be held
+
+    Returns:
+        Weight 1 for every live combination of two cards
+    """
+    dead = set(dead)
+    return {combo: 1 for combo in itertools.combinations(FULL_DECK, 2)
+            if combo[0] not in dead and combo[1] not in dead}
+
+
+class RangeEquity(object):
+    """Equity of every combination of a range against another range.
+
+    On a river board every live combination is ranked once and the ranks are
+    cached per board. The equity of each combination against a range then
+    takes a few binary searches over the opponent's combinations sorted by
+    rank and prefix sums of their weights, instead of an evaluation for every
+    pair of combinations. Opponent combinations sharing a card with the hero
+    are removed by subtracting the same sums taken over the opponent
+    combinations holding each of the hero's two cards, adding back the one
+    holding both.
+
+    Flop and turn equities roll up every river run-out, whose rank arrays
+    stay in the cache for the next street.
+    """
+
+    def __init__(self, cache_size=2000, e=None):
+        # type: (int, Evaluator)
+        """Initiate a RangeEquity.
+
+        Args:
+            cache_size: Number of river boards whose ranks are remembered,
+                each taking about 2.6kB
+            e: Evaluator to be used - the shared one by default
+        """
+        self.evaluator = e or evaluator()
+        self.cache_size = cache_size
+        self.cache = {}
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of this RangeEquity.
+
+        Returns:
+            Text representation of this RangeEquity
+        """
+        return "RangeEquity(cached={})".format(len(self.cache))
+
+    def river_ranks(self, board):
+        # type: (list) -> array.array
+        """Rank every combination which does not use a board card.
+
+        Args:
+            board: Five community cards in deuces integer form
+
+        Returns:
+            Rank of every combination at its combo_index(), 0 if it is dead
+        """
+        key = tuple(sorted(board))
+        ranks = self.cache.get(key)
+        if ranks is None:
+            ranks = array.array('H', [0]) * colex_size(2)
+            seven = self.evaluator.hand_size_map[7]
+            board = list(key)
+            live = [c for c in FULL_DECK if c not in key]
+            for a, b in itertools.combinations(live, 2):
+                ranks[combo_index((a, b))] = seven([a, b] + board)
+
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[key] = ranks
+        return ranks
+
+    def river(self, hero, villain, board):
+        # type: (dict, dict, list) -> dict
+        """Weigh up every hero combination against a range on the river.
+
+        Args:
+            hero: Weight of every combination of the hero's range
+            villain: Weight of every combination of the opposing range
+            board: Five community cards in deuces integer form
+
+        Returns:
+            A (won, total) tuple for every live hero combination - the
+            weight of opposing combinations it beats plus half of those it
+            ties with, and the weight of all opposing combinations it can
+            face
+        """
+        ranks = self.river_ranks(board)
+        opponents = sorted((ranks[combo_index(c)], w, c)
+                           for c, w in villain.iteritems()
+                           if w and ranks[combo_index(c)])
+
+        # prefix sums over all opponents and over those holding each card
+        everyone = [], [0]
+        by_card = {}
+        pair_weight = {}
+        for rank, weight, combo in opponents:
+            for sorted_ranks, sums in [everyone] + [
+                    by_card.setdefault(c, ([], [0])) for c in combo]:
+                sorted_ranks.append(rank)
+                sums.append(sums[-1] + weight)
+            pair_weight[combo_index(combo)] = (rank, weight)
+
+        def count(sorted_ranks, sums, rank):
+            # weight beaten by rank, weight tied with it and total weight
+            lo = bisect.bisect_left(sorted_ranks, rank)
+            hi = bisect.bisect_right(sorted_ranks, rank)
+            return sums[-1] - sums[hi], sums[hi] - sums[lo], sums[-1]
+
+        empty = [], [0]
+        results = {}
+        for combo in hero:
+            index = combo_index(combo)
+            rank = ranks[index]
+            if not rank:
+                continue
+            won, tied, total = count(everyone[0], everyone[1], rank)
+            for card in combo:
+                sorted_ranks, sums = by_card.get(card, empty)
+                w, t, n = count(sorted_ranks, sums, rank)
+                won, tied, total = won - w, tied - t, total - n
+            if index in pair_weight:
+                # the same combination was subtracted for both cards
+                other, weight = pair_weight[index]
+                total += weight
+                if other == rank:
+                    tied += weight
+            results[combo] = (won + tied / 2.0, total)
+        return results
+
+    def combos(self, hero, villain, board):
+        # type: (dict, dict, list) -> dict
+        """Weigh up every hero combination against a range.
+
+        Boards of three or four cards are rolled up over every run-out.
+
+        Args:
+            hero: Weight of every combination of the hero's range
+            villain: Weight of every combination of the opposing range
+            board: Three to five community cards in deuces integer form
+
+        Returns:
+            A (won, total) tuple for every live hero combination, summed
+            over all run-outs
+        """
+        if len(board) == 5:
+            return self.river(hero, villain, board)
+
+        live = [c for c in FULL_DECK if c not in board]
+        results = {}
+        for runout in itertools.combinations(live, 5 - len(board)):
+            river = self.river(hero, villain, list(board) + list(runout))
+            for combo, (won, total) in river.iteritems():
+                w, t = results.get(combo, (0, 0))
+                results[combo] = (w + won, t + total)
+        return results
+
+    def equity(self, hero, villain, board):
+        # type: (dict, dict, list) -> (float, dict)
+        """Compute the equity of a range against another range.
+
+        Args:
+            hero: Weight of every combination of the hero's range
+            villain: Weight of every combination of the opposing range
+            board: Three to five community cards in deuces integer form
+
+        Returns:
+            The equity of the whole range and a dictionary of the equity of
+            every live combination in it, each between 0 and 1
+        """
+        won = total = 0.0
+        equities = {}
+        for combo, (w, t) in self.combos(hero, villain, board).iteritems():
+            if t:
+                equities[combo] = w / t
+                won += hero[combo] * w
+                total += hero[combo] * t
+        return (won / total if total else 0.0), equities
+
+
+def range_equity():
+    # type: () -> RangeEquity
+    """Return a RangeEquity shared by the whole application.
+
+    Returns:
+        The shared RangeEquity
+    """
+    return shared(RangeEquity)
+
+
+class Estimate(namedtuple('Estimate', ['samples', 'equities', 'errors',
+                                       'exact'])):
+    """Equity of every player estimated from a number of run-outs.
+
+    'equities' are the average shares of the pot won by each player and
+    'errors' their standard errors, 0 if the estimate is 'exact'.
+    """
+
+    def interval(self, player, z=1.96):
+        # type: (int, float) -> (float, float)
+        """Confidence interval of the equity of a player.
+
+        Args:
+            player: Index of the player
+            z: Number of standard errors on each side - 1.96 for 95%
+
+        Returns:
+            Lower and upper bound of the equity
+        """
+        equity, error = self.equities[player], self.errors[player]
+        return max(0.0, equity - z * error), min(1.0, equity + z * error)
+
+
+def combinations_count(n, k):
+    # type: (int, int) -> int
+    """Count the ways to choose k out of n items.
+
+    Args:
+        n: Number of items
+        k: Number of items chosen
+
+    Returns:
+        n choose k
+    """
+    if k < 0 or k > n:
+        return 0
+    total = 1
+    for i in xrange(k):
+        total = total * (n - i) // (i + 1)
+    return total
+
+
+def halton(index, base):
+    # type: (int, int) -> float
+    """Compute an element of the van der Corput sequence in some base.
+
+    Args:
+        index: Position in the sequence
+        base: A prime, different for every dimension of a Halton sequence
+
+    Returns:
+        A number in [0, 1)
+    """
+    result, f = 0.0, 1.0
+    while index:
+        f /= base
+        index, digit = divmod(index, base)
+        result += f * digit
+    return result
+
+
+class Moments(object):
+    """Running mean and variance of the shares of all players."""
+
+    def __init__(self, players):
+        # type: (int)
+        """Start with no samples.
+
+        Args:
+            players: Number of players
+        """
+        self.n = 0
+        self.sums = [0.0] * players
+        self.squares = [0.0] * players
+
+    def add(self, values):
+        # type: (list)
+        """Add a sample.
+
+        Args:
+            values: Share of the pot of every player
+        """
+        self.n += 1
+        for i, v in enumerate(values):
+            self.sums[i] += v
+            self.squares[i] += v * v
+
+    def means(self):
+        # type: () -> list
+        """Return the mean share of every player.
+
+        Returns:
+            Means of all players
+        """
+        return [s / self.n for s in self.sums]
+
+    def variances(self, default=0.25):
+        # type: (float) -> list
+        """Return the unbiased sample variance of every player.
+
+        Args:
+            default: Returned with fewer than 2 samples - the largest
+                possible variance of a share of the pot
+
+        Returns:
+            Variances of all players
+        """
+        if self.n < 2:
+            return [default] * len(self.sums)
+        return [max(0.0, (q - s * s / self.n) / (self.n - 1))
+                for s, q in zip(self.sums, self.squares)]
+
+
+class Sampler(object):
+    """Plain random run-outs, the base of the variance reduced samplers.
+
+    A sampler deals batches of run-outs through a share function and
+    estimates unbiased equities with their standard errors.
+    """
+
+    def __init__(self, stub, missing, players, rng):
+        # type: (list, int, int, random.Random)
+        """Initiate a Sampler.
+
+        Args:
+            stub: Cards which can be dealt, sorted by rank
+            missing: Number of cards to complete the board
+            players: Number of players
+            rng: Source of randomness
+        """
+        self.stub = stub
+        self.missing = missing
+        self.rng = rng
+        self.moments = Moments(players)
+        self.dealt = 0
+
+    def run(self, share, size):
+        # type: (function, int)
+        """Deal a batch of run-outs.
+
+        Args:
+            share: Returns the share of the pot of every player given a
+                run-out
+            size: Approximate number of run-outs to deal
+        """
+        for _ in xrange(size):
+            self.moments.add(share(self.rng.sample(self.stub, self.missing)))
+        self.dealt += size
+
+    def estimate(self):
+        # type: () -> (list, list)
+        """Estimate the equities from the run-outs dealt so far.
+
+        Returns:
+            The equities and their standard errors for all players
+        """
+        n = self.moments.n
+        return self.moments.means(), [math.sqrt(v / n) for v in
+                                      self.moments.variances()]
+
+
+class AntitheticSampler(Sampler):
+    """Run-outs in pairs, the second mirroring the first in rank order.
+
+    The card at position i of the rank sorted stub is replaced by the one
+    at position len(stub) - 1 - i, so a high board is paired with a low
+    one. Both run-outs are uniformly random, so the mean of a pair is
+    unbiased, and their negative correlation lowers its variance.
+    """
+
+    def run(self, share, size):
+        # type: (function, int)
+        """Deal a batch of pairs of run-outs.
+
+        Args:
+            share: Returns the share of the pot of every player given a
+                run-out
+            size: Approximate number of run-outs to deal
+        """
+        stub, last = self.stub, len(self.stub) - 1
+        for _ in xrange(max(1, size // 2)):
+            picks = self.rng.sample(xrange(len(stub)), self.missing)
+            first = share([stub[i] for i in picks])
+            second = share([stub[last - i] for i in picks])
+            self.moments.add([(a + b) / 2 for a, b in zip(first, second)])
+            self.dealt += 2
+
+
+class StratifiedSampler(Sampler):
+    """Run-outs stratified by the number of cards of each suit they hold.
+
+    Run-outs with the same suit counts are suit-isomorphic up to ranks and
+    suit counts decide flushes, so most of the variance is between the
+    strata. The probability of every stratum is exact, which keeps the
+    weighted mean of the strata unbiased. Each batch is split between the
+    strata in proportion to their probability, with at least 2 run-outs
+    each.
+    """
+
+    def __init__(self, stub, missing, players, rng):
+        # type: (list, int, int, random.Random)
+        """Initiate a StratifiedSampler.
+
+        Args:
+            stub: Cards which can be dealt, sorted by rank
+            missing: Number of cards to complete the board
+            players: Number of players
+            rng: Source of randomness
+        """
+        super(StratifiedSampler, self).__init__(stub, missing, players, rng)
+        suits = {}
+        for card in stub:
+            suits.setdefault(card & 0xF000, []).append(card)
+        self.suits = suits.values()
+
+        total = combinations_count(len(stub), missing)
+        self.strata = []
+        for counts in itertools.product(range(missing + 1),
+                                        repeat=len(self.suits)):
+            if sum(counts) != missing:
+                continue
+            ways = 1
+            for suit, k in zip(self.suits, counts):
+                ways *= combinations_count(len(suit), k)
+            if ways:
+                self.strata.append((counts, float(ways) / total,
+                                    Moments(players)))
+
+    def run(self, share, size):
+        # type: (function, int)
+        """Deal a batch of run-outs from every stratum.
+
+        Args:
+            share: Returns the share of the pot of every player given a
+                run-out
+            size: Approximate number of run-outs to deal
+        """
+        sample = self.rng.sample
+        for counts, p, moments in self.strata:
+            for _ in xrange(max(2, int(round(p * size)))):
+                runout = []
+                for suit, k in zip(self.suits, counts):
+                    runout.extend(sample(suit, k))
+                moments.add(share(runout))
+                self.dealt += 1
+
+    def estimate(self):
+        # type: () -> (list, list)
+        """Weigh the strata by their probability.
+
+        Small strata often hold only a couple of equal shares, which would
+        claim no variance at all, so the variance within the strata is
+        pooled over all of them.
+
+        Returns:
+            The equities and their standard errors for all players
+        """
+        players = len(self.moments.sums)
+        equities = [0.0] * players
+        pooled = [0.0] * players
+        weight = 0.0
+        freedom = 0
+        for counts, p, moments in self.strata:
+            for i, (m, v) in enumerate(zip(moments.means(),
+                                           moments.variances())):
+                equities[i] += p * m
+                pooled[i] += (moments.n - 1) * v
+            weight += p * p / moments.n
+            freedom += moments.n - 1
+        return equities, [math.sqrt(v / freedom * weight) for v in pooled]
+
+
+class QuasiRandomSampler(Sampler):
+    """Run-outs from a Halton sequence under several random shifts.
+
+    Each point of the low-discrepancy sequence picks the cards one by one
+    from those left, so the run-outs cover the stub more evenly than random
+    ones. Shifting the whole sequence by a random vector (modulo 1) gives
+    an unbiased estimate, and the spread between independent shifts gives
+    the standard error. That error is itself an estimate from SHIFTS values,
+    so there have to be enough of them for it to be trusted when deciding
+    to stop.
+    """
+
+    PRIMES = [2, 3, 5, 7, 11]
+    SHIFTS = 32
+
+    def __init__(self, stub, missing, players, rng):
+        # type: (list, int, int, random.Random)
+        """Initiate a QuasiRandomSampler.
+
+        Args:
+            stub: Cards which can be dealt, sorted by rank
+            missing: Number of cards to complete the board
+            players: Number of players
+            rng: Source of randomness
+        """
+        super(QuasiRandomSampler, self).__init__(stub, missing, players, rng)
+        self.shifts = [([rng.random() for _ in xrange(missing)],
+                        Moments(players)) for _ in xrange(self.SHIFTS)]
+        self.index = 1
+
+    def run(self, share, size):
+        # type: (function, int)
+        """Deal the next points of the sequence under every shift.
+
+        Args:
+            share: Returns the share of the pot of every player given a
+                run-out
+            size: Approximate number of run-outs to deal
+        """
+        points = max(1, size // self.SHIFTS)
+        for index in xrange(self.index, self.index + points):
+            point = [halton(index, b) for b in self.PRIMES[:self.missing]]
+            for shift, moments in self.shifts:
+                left = list(self.stub)
+                runout = []
+                for u, s in zip(point, shift):
+                    runout.append(left.pop(int((u + s) % 1.0 * len(left))))
+                moments.add(share(runout))
+        self.index += points
+        self.dealt += points * self.SHIFTS
+
+    def estimate(self):
+        # type: () -> (list, list)
+        """Average the estimates of the shifts.
+
+        Returns:
+            The equities and their standard errors for all players
+        """
+        combined = Moments(len(self.moments.sums))
+        for shift, moments in self.shifts:
+            combined.add(moments.means())
+        return combined.means(), [math.sqrt(v / combined.n)
+                                  for v in combined.variances()]
+
+
+SAMPLERS = {
+    'random': Sampler,
+    'antithetic': AntitheticSampler,
+    'stratified': StratifiedSampler,
+    'quasi': QuasiRandomSampler,
+}
+
+
+def runouts(hands, board=(), dead=(), batch=256, exact_limit=1081,
+            mode='random', rng=random, e=None):
+    # type: (list, list, list, int, int, str, random.Random, Evaluator) -> iter
+    """Estimate the equities of several hands, refining them forever.
+
+    If there are at most exact_limit ways to complete the board, all of
+    them are dealt and a single exact Estimate is yielded. Otherwise an
+    Estimate is yielded after every batch of run-outs, so that the caller
+    decides when it is precise enough.
+
+    Args:
+        hands: Two or more hands in deuces integer form
+        board: Community cards dealt so far
+        dead: Other cards which can not be dealt
+        batch: Number of run-outs between estimates
+        exact_limit: Largest number of run-outs which are all dealt
+        mode: How run-outs are sampled, one of SAMPLERS
+        rng: Source of randomness
+        e: Evaluator to be used - the shared one by default
+
+    Yields:
+        Estimates based on more and more run-outs
+    """
+    evaluate = (e or evaluator()).evaluate
+    board = list(board)
+    missing = 5 - len(board)
+    known = set(board) | set(dead)
+    for hand in hands:
+        known.update(hand)
+    stub = sorted(c for c in FULL_DECK if c not in known)
+    hands = [list(hand) for hand in hands]
+    players = range(len(hands))
+
+    def share(runout):
+        # share of the pot every player wins with this run-out
+        full = board + list(runout)
+        ranks = [evaluate(hand, full) for hand in hands]
+        best = min(ranks)
+        winners = ranks.count(best)
+        return [1.0 / winners if ranks[i] == best else 0.0 for i in players]
+
+    total = combinations_count(len(stub), missing)
+    if total <= exact_limit:
+        moments = Moments(len(hands))
+        for runout in itertools.combinations(stub, missing):
+            moments.add(share(runout))
+        yield Estimate(total, moments.means(), [0.0] * len(hands), True)
+        return
+
+    sampler = SAMPLERS[mode](stub, missing, len(hands), rng)
+    while True:
+        sampler.run(share, batch)
+        equities, errors = sampler.estimate()
+        yield Estimate(sampler.dealt, equities, errors, False)
+
+
+def anytime_equity(hands, board=(), dead=(), budget=0.25, target=0.005,
+                   callback=None, **kwargs):
+    # type: (list, list, list, float, float, function, dict) -> Estimate
+    """Estimate equities until they are precise enough or time runs out.
+
+    Args:
+        hands: Two or more hands in deuces integer form
+        board: Community cards dealt so far
+        dead: Other cards which can not be dealt
+        budget: Seconds to spend at most
+        target: Stop once every standard error is at most this
+        callback: Called with every partial Estimate - optional
+        **kwargs: Passed on to runouts()
+
+    Returns:
+        The last Estimate
+    """
+    deadline = time.time() + budget
+    for estimate in runouts(hands, board, dead, **kwargs):
+        if callback is not None:
+            callback(estimate)
+        if estimate.exact or max(estimate.errors) <= target \
+                or time.time() >= deadline:
+            return estimate
+
+
+def benchmark(hands, board=(), target=0.005, modes=None, seed=1, runs=10):
+    # type: (list, list, float, list, int, int) -> list
+    """Compare the sampling modes by the run-outs they need for a precision.
+
+    Every mode estimates the equities in several runs with different seeds.
+    The standard errors a mode reports can only be trusted if its estimates
+    spread about as much from run to run, so that spread is measured too.
+
+    Args:
+        hands: Two or more hands in deuces integer form
+        board: Community cards dealt so far
+        target: Standard error every mode has to reach
+        modes: Sampling modes to compare - all of them by default
+        seed: Seed of the random number generator of the first run
+        runs: Number of runs of every mode
+
+    Returns:
+        A (mode, mean run-outs dealt, mean seconds, spread) tuple for every
+        mode, the spread being the largest standard deviation of the
+        equity of a player between the runs
+    """
+    results = []
+    for mode in modes or sorted(SAMPLERS):
+        dealt = 0
+        moments = Moments(len(hands))
+        start = time.time()
+        for run in xrange(runs):
+            estimate = anytime_equity(hands, board, budget=float('inf'),
+                                      target=target, mode=mode,
+                                      exact_limit=0,
+                                      rng=random.Random(seed + run))
+            dealt += estimate.samples
+            moments.add(estimate.equities)
+        spread = math.sqrt(max(moments.variances(default=0.0)))
+        results.append((mode, float(dealt) / runs,
+                        (time.time() - start) / runs, spread))
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+    from deuces import Card as DCard
+
+    parser = argparse.ArgumentParser(
+        description="Compare the equity sampling modes.")
+    parser.add_argument('hands', nargs='+',
+                        help="at least two hands, e.g. AsKd QcQh")
+    parser.add_argument('-b', '--board', default='',
+                        help="community cards, e.g. 2c7d9h")
+    parser.add_argument('-t', '--target', type=float, default=0.005,
+                        help="standard error to reach")
+    parser.add_argument('-r', '--runs', type=int, default=10,
+                        help="runs of every mode")
+    args = parser.parse_args()
+
+    results = benchmark(map(DCard.decode, args.hands),
+                        DCard.decode(args.board), args.target,
+                        runs=args.runs)
+    naive = dict((mode, n) for mode, n, _, _ in results)['random']
+    for mode, n, seconds, spread in results:
+        print "{:>10}: {:8.0f} run-outs, {:4.2f}x fewer, {:.2f}s, " \
+            "spread {:.4f}".format(mode, n, naive / n, seconds, spread)
@@ -1,6 +1,8 @@
 """Front-end representation of a Poker Game."""
 
-from kivy.clock import mainthread
+import threading
+
+from kivy.clock import Clock
 from kivy.lang import Builder
 from kivy.properties import StringProperty
 from kivy.uix.boxlayout import BoxLayout
@@ -8,9 +10,13 @@ from kivy.uix.label import Label
 from kivy.uix.screenmanager import Screen
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.image import Image
+from atlas import source
 
 Builder.load_file('game.kv')
 
+# Properties of the back of a card
+BACK = {'suit': 'backs', 'face': 'red', 'selected': False}
+
 
 class Card(ButtonBehavior, Image):
     """A graphical representation of a playing card."""
@@ -31,7 +37,7 @@ class Card(ButtonBehavior, Image):
         self.selected = False
         super(Card, self).__init__(**kwargs)
         self.selected = properties['selected']
-        self.source = "data/{}/{}.png".format(self.suit, self.face)
+        self.source = source(self.suit, self.face)
 
     def __repr__(self):
         # type: () -> str
@@ -57,6 +63,20 @@ class Card(ButtonBehavior, Image):
             'selected': self.selected
         }
 
+    def set(self, properties):
+        # type: (dict)
+        """Show a different card in this widget, de-selecting it.
+
+        Args:
+            properties: Information about the new card, as in __init__()
+        """
+        if self.selected:
+            self.on_release()
+        if properties['suit'] != self.suit or properties['face'] != self.face:
+            self.suit = properties['suit']
+            self.face = properties['face']
+            self.source = source(self.suit, self.face)
+
     def on_release(self):
         """Select or de-select Card depending on current state."""
         self.selected = not self.selected
@@ -83,8 +103,39 @@ class Game(Screen):
         self.ca = cards_app
         self.show_score = False
         self.hands = {}
+        self.pool = []
+
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.trigger_update = Clock.create_trigger(self.apply_updates)
+
+    def set_cards(self, hand, cards):
+        # type: (BoxLayout, list)
+        """Show cards in a hand, reusing its Card widgets.
+
+        Widgets which are no longer needed are kept for later use.
+
+        Args:
+            hand: Layout holding the Card widgets of a player
+            cards: Properties of the cards to be shown
+        """
+        widgets = hand.children[::-1]
+        for widget, card in zip(widgets, cards):
+            widget.set(card)
+
+        for widget in widgets[len(cards):]:
+            hand.remove_widget(widget)
+            self.pool.append(widget)
+
+        for card in cards[len(widgets):]:
+            if self.pool:
+                widget = self.pool.pop()
+                widget.set(card)
+            else:
+                widget = Card(card)
+                widget.selected = False
+            hand.add_widget(widget)
 
-    @mainthread
     def update_hand(self, cards, pid):
         # type: (list, int)
         """Replace the hand of a user with the one provided.
@@ -93,43 +144,17 @@ class Game(Screen):
             cards: New hand
             pid: Player whose hand should be updated
         """
-        hand = self.hands[pid][1]
-        hand.clear_widgets()
-        for card in cards:
-            card = Card(card)
-            card.selected = False
-            hand.add_widget(card)
-
-    @mainthread
-    def update_opponents(self, hs=None, won=None):
-        # type: (list, list)
-        """
-        Display opponents cards.
+        self.set_cards(self.hands[pid][1], cards)
 
-        Args:
-            hs: Hands of all players - if None displays backs of cards
-            won: Who won the last hand
-        """
-        if hs is None:
-            for k, v in self.hands.items():
-                if k != self.ca.client_id:
-                    v[1].clear_widgets()
-                    for i in range(5):
-                        card = Card({'suit': 'backs',
-                                     'face': 'red',
-                                     'selected': False})
-                        v[1].add_widget(card)
-        else:
-            for pid, score, cards in hs:
-                win = ""
-                if pid in won:
-                    win = " WON"
+    def update_opponents(self):
+        """Display the backs of the opponents cards.
 
-                self.hands[pid][0].text = "Player " + str(pid) + ": " \
-                                          + str(score) + win
-                self.update_hand(cards, pid)
+        Their hands and scores at a showdown are applied by received().
+        """
+        for k, v in self.hands.items():
+            if k != self.ca.client_id:
+                self.set_cards(v[1], [BACK] * 5)
 
-    @mainthread
     def set_show_score(self, show_score):
         # type: (bool)
         """Modify the button text and hide opponents cards if appropriate.
@@ -153,10 +178,12 @@ class Game(Screen):
             self.send({'action': 'swap',
                        'hand': self.hands[self.ca.client_id][1].children})
 
-    @mainthread
     def received(self, msg):
         # type: (dict)
-        """Run whenever a message is received.
+        """Run whenever a message is received. May be called from any thread.
+
+        The message is merged into the pending changes, which are applied
+        once in the next frame no matter how many messages arrive before it.
 
         Args:
             msg: Message from game server. May have the following components:
@@ -166,9 +193,52 @@ class Game(Screen):
                 - 'won' - List of winners of the last hand.
                 - 'swapped' - The card swap was successful.
         """
-        if 'init' in msg:
+        with self.pending_lock:
+            p = self.pending
+            hands = p.setdefault('hands', {})
+
+            if 'init' in msg:
+                p['init'] = msg['init']
+
+            if 'hand' in msg:
+                p['show_score'] = False
+                for pid in hands.keys():
+                    if pid != self.ca.client_id:
+                        del hands[pid]
+                hands[self.ca.client_id] = msg['hand']
+
+            if 'hs' in msg:
+                p['show_score'] = True
+                labels = p.setdefault('labels', {})
+                for pid, score, cards in msg['hs']:
+                    win = ""
+                    if pid in msg['won']:
+                        win = " WON"
+                    labels[pid] = "Player " + str(pid) + ": " \
+                                  + str(score) + win
+                    hands[pid] = cards
+                p['enable'] = True
+
+            if 'swapped' in msg:
+                p['swapped'] = msg['swapped']
+            elif 'hand' in msg or 'hs' in msg:
+                p.pop('swapped', None)
+
+        self.trigger_update()
+
+    def apply_updates(self, *args):
+        # type: (tuple)
+        """Apply all pending changes at once. Runs on the main thread.
+
+        Args:
+            *args: Passed by the Clock
+        """
+        with self.pending_lock:
+            p, self.pending = self.pending, {}
+
+        if 'init' in p:
             self.ids.b_button.disabled = False
-            for pid, score in msg['init']:
+            for pid, score in p['init']:
                 player = BoxLayout(orientation='vertical', padding=(10, 0))
 
                 if pid == self.ca.client_id:
@@ -184,25 +254,23 @@ class Game(Screen):
                 player.add_widget(hand)
 
                 self.hands[pid] = (score, hand)
+                self.set_cards(hand, [BACK] * 5)
+
+        if 'show_score' in p:
+            self.set_show_score(p['show_score'])
 
-                for i in range(5):
-                    card = Card({'suit': 'backs',
-                                 'face': 'red',
-                                 'selected': False})
-                    hand.add_widget(card)
+        for pid, cards in p.get('hands', {}).items():
+            self.update_hand(cards, pid)
 
-        if 'hand' in msg:
-            self.set_show_score(False)
-            self.update_hand(msg['hand'], self.ca.client_id)
+        for pid, text in p.get('labels', {}).items():
+            self.hands[pid][0].text = text
 
-        if 'hs' in msg:
-            self.set_show_score(True)
-            self.update_opponents(msg['hs'], msg['won'])
+        if p.get('enable'):
             self.ids.b_button.disabled = False
 
-        if 'swapped' in msg:
+        if 'swapped' in p:
             self.ids.b_button.text = "Wait for others"
-            self.ids.b_button.disabled = msg['swapped']
+            self.ids.b_button.disabled = p['swapped']
 
     def send(self, msg):
         # type: (object) -> object
@@ -0,0 +1,407 @@
+"""Append-only binary log of dealt hands, swaps and showdowns."""
+
+import os
+import struct
+import threading
+import time
+
+from collections import namedtuple
+from deuces import Card as DCard
+
+# Every log file starts with this magic string, the last byte being the
+# version of the format.
+MAGIC = b'CHH\x02'
+
+# Record types.
+START, DEAL, SWAP, SHOWDOWN, END = range(5)
+
+# Record layouts (little-endian). Cards follow the headers, one byte each.
+START_RECORD = struct.Struct('<BII')  # type, hand number, deck seed
+PLAYER_RECORD = struct.Struct('<BHB')  # type, player id, number of cards
+SWAP_RECORD = struct.Struct('<BHBB')  # type, player id, discarded, drawn
+SHOWDOWN_RECORD = struct.Struct('<BHBB')  # type, player id, won, cards
+OFFSET = struct.Struct('<Q')
+
+SUIT_CHARS = 'shdc'
+
+Hand = namedtuple('Hand', ['number', 'seed', 'deals', 'swaps', 'showdown'])
+
+BYTE_TO_CARD = [DCard.new(r + s) for r in DCard.STR_RANKS
+                for s in SUIT_CHARS] + DCard.JOKERS
+
+
+def card_to_byte(card):
+    # type: (int) -> int
+    """Pack a deuces card integer into a single byte.
+
+    Args:
+        card: Card in deuces integer form
+
+    Returns:
+        Index of the card in the range [0, 52), jokers are 52 and 53
+    """
+    if DCard.is_joker(card):
+        return 52 + DCard.JOKERS.index(card)
+    suit = DCard.get_suit_int(card)
+    return DCard.get_rank_int(card) * 4 + SUIT_CHARS.index(
+        DCard.INT_SUIT_TO_CHAR_SUIT[suit])
+
+
+def byte_to_card(byte):
+    # type: (int) -> int
+    """Unpack a byte written by card_to_byte().
+
+    Args:
+        byte: Index of the card in the range [0, 54)
+
+    Returns:
+        Card in deuces integer form
+    """
+    return BYTE_TO_CARD[byte]
+
+
+class HandHistory(object):
+    """Buffered writer appending hands to a log and its offset index.
+
+    A hand is added to the index once it is finished, so hands interrupted
+    by a crash or a restart stay in the log but are never numbered.
+    """
+
+    def __init__(self, path, sync_every=32, sync_interval=5.0):
+        # type: (str, int, float)
+        """Open (or create) a hand history log for appending.
+
+        Args:
+            path: Location of the log - the index is stored next to it
+            sync_every: Number of finished hands between calls to fsync
+            sync_interval: Maximum number of seconds between calls to fsync
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as log:
+                if log.read(len(MAGIC)) != MAGIC:
+                    raise ValueError("Not a hand history log: " + path)
+
+        self._lock = threading.Lock()
+        self._log = open(path, 'ab')
+        self._index = open(path + '.idx', 'ab')
+        if self._log.tell() == 0:
+            self._log.write(MAGIC)
+
+        self.hands = self._index.tell() // OFFSET.size
+        self._start = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of this HandHistory.
+
+        Returns:
+            Text representation of this HandHistory
+        """
+        return "HandHistory('{}', hands={})".format(self.path, self.hands)
+
+    def start_hand(self, seed):
+        # type: (int)
+        """Begin a new hand.
+
+        Args:
+            seed: Seed the deck of this hand was shuffled with
+        """
+        with self._lock:
+            self._start = self._log.tell()
+            self._log.write(START_RECORD.pack(START, self.hands, seed))
+
+    def deal(self, pid, cards):
+        # type: (int, list)
+        """Record the cards dealt to a player.
+
+        Args:
+            pid: Id of the player
+            cards: Dealt cards in deuces integer form
+        """
+        with self._lock:
+            self._log.write(PLAYER_RECORD.pack(DEAL, pid, len(cards)) +
+                            self._pack(cards))
+
+    def swap(self, pid, discarded, drawn):
+        # type: (int, list, list)
+        """Record a player swapping cards.
+
+        Args:
+            pid: Id of the player
+            discarded: Cards given away in deuces integer form
+            drawn: Cards received in their place in deuces integer form
+        """
+        with self._lock:
+            self._log.write(SWAP_RECORD.pack(SWAP, pid, len(discarded),
+                                             len(drawn)) +
+                            self._pack(discarded) + self._pack(drawn))
+
+    def showdown(self, pid, cards, won):
+        # type: (int, list, bool)
+        """Record the final hand of a player.
+
+        Args:
+            pid: Id of the player
+            cards: Final hand in deuces integer form
+            won: Did the player win this hand
+        """
+        with self._lock:
+            self._log.write(SHOWDOWN_RECORD.pack(SHOWDOWN, pid, bool(won),
+                                                 len(cards)) +
+                            self._pack(cards))
+
+    def end_hand(self):
+        """Finish the current hand and index it.
+
+        Synchronise to disk when it is due.
+        """
+        with self._lock:
+            self._log.write(struct.pack('<B', END))
+            self._index.write(OFFSET.pack(self._start))
+            self.hands += 1
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or \
+                    time.time() - self._last_sync >= self.sync_interval:
+                self._sync()
+
+    def close(self):
+        """Flush all buffered records and close the log."""
+        with self._lock:
+            if not self._log.closed:
+                self._sync()
+                self._log.close()
+                self._index.close()
+
+    def _sync(self):
+        """Flush buffers and fsync both files. Caller holds the lock."""
+        for f in (self._log, self._index):
+            f.flush()
+            os.fsync(f.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    @staticmethod
+    def _pack(cards):
+        # type: (list) -> bytes
+        """Encode cards one byte each.
+
+        Args:
+            cards: Cards in deuces integer form
+
+        Returns:
+            Packed cards
+        """
+        return bytes(bytearray(card_to_byte(c) for c in cards))
+
+
+class HistoryReader(object):
+    """Stream hands back from a log written by HandHistory."""
+
+    def __init__(self, path):
+        # type: (str)
+        """Open a hand history log for reading.
+
+        The offset index is rebuilt if it is missing.
+
+        Args:
+            path: Location of the log
+        """
+        self.path = path
+        self._log = open(path, 'rb')
+        if self._log.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a hand history log: " + path)
+
+        index_path = path + '.idx'
+        if not os.path.exists(index_path):
+            self.rebuild_index()
+        self._index = open(index_path, 'rb')
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of this HistoryReader.
+
+        Returns:
+            Text representation of this HistoryReader
+        """
+        return "HistoryReader('{}', hands={})".format(self.path, len(self))
+
+    def __len__(self):
+        # type: () -> int
+        """Return the number of indexed hands.
+
+        Only finished hands are indexed.
+
+        Returns:
+            Number of hands in the log
+        """
+        return os.path.getsize(self.path + '.idx') // OFFSET.size
+
+    def __getitem__(self, number):
+        # type: (int) -> Hand
+        """Read a single hand using the index.
+
+        IndexError is raised for hands which are out of range and ValueError
+        if the log ends before the indexed hand does.
+
+        Args:
+            number: Number of the hand
+
+        Returns:
+            The requested hand
+        """
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("Hand number out of range")
+
+        self._index.seek(number * OFFSET.size)
+        self._log.seek(OFFSET.unpack(self._index.read(OFFSET.size))[0])
+        hand = self._read_hand()
+        if hand is None:
+            raise ValueError("Hand {} is truncated".format(number))
+        return hand
+
+    def __iter__(self):
+        # type: () -> iter
+        """Stream all hands in the log.
+
+        Returns:
+            Generator of hands
+        """
+        return self.hands()
+
+    def hands(self, start=0):
+        # type: (int) -> iter
+        """Stream hands using the index without loading the whole log.
+
+        Hands which were interrupted before they finished are skipped.
+
+        Args:
+            start: Number of the first hand to read
+
+        Yields:
+            Hands in the order they were played
+        """
+        with open(self.path, 'rb') as log, \
+                open(self.path + '.idx', 'rb') as index:
+            index.seek(start * OFFSET.size)
+            while True:
+                chunk = index.read(OFFSET.size * 512)
+                if not chunk:
+                    break
+                for i in xrange(0, len(chunk), OFFSET.size):
+                    position = OFFSET.unpack_from(chunk, i)[0]
+                    if log.tell() != position:
+                        log.seek(position)
+                    hand = self._read_hand(log)
+                    if hand is not None:
+                        yield hand
+
+    def rebuild_index(self):
+        """Scan the log and write a fresh offset index."""
+        with open(self.path, 'rb') as log, \
+                open(self.path + '.idx', 'wb') as index:
+            log.seek(len(MAGIC))
+            while True:
+                position = log.tell()
+                if self._read_hand(log) is not None:
+                    index.write(OFFSET.pack(position))
+                elif not log.read(1):
+                    break
+                else:
+                    log.seek(-1, os.SEEK_CUR)
+
+    def close(self):
+        """Close the log and index."""
+        self._log.close()
+        self._index.close()
+
+    def _read_hand(self, log=None):
+        # type: (file) -> Hand
+        """Parse the hand starting at the current position of a log.
+
+        Args:
+            log: File to read from - defaults to the reader's own handle
+
+        Returns:
+            The parsed hand or None at the end of the log
+        """
+        if log is None:
+            log = self._log
+
+        header = log.read(START_RECORD.size)
+        if len(header) < START_RECORD.size:
+            return None
+        kind, number, seed = START_RECORD.unpack(header)
+        if kind != START:
+            raise ValueError("Corrupt hand history at " + str(log.tell()))
+
+        deals, swaps, showdown = {}, {}, {}
+        while True:
+            kind = log.read(1)
+            if not kind:
+                return None
+            kind = ord(kind)
+            if kind == START:
+                # The previous hand was never finished
+                log.seek(-1, os.SEEK_CUR)
+                return None
+
+            try:
+                if kind == END:
+                    return Hand(number, seed, deals, swaps, showdown)
+                elif kind == DEAL:
+                    pid, n = self._read(log, PLAYER_RECORD)
+                    deals[pid] = self._cards(log, n)
+                elif kind == SWAP:
+                    pid, n, drawn = self._read(log, SWAP_RECORD)
+                    swaps[pid] = (self._cards(log, n),
+                                  self._cards(log, drawn))
+                elif kind == SHOWDOWN:
+                    pid, won, n = self._read(log, SHOWDOWN_RECORD)
+                    showdown[pid] = (self._cards(log, n), bool(won))
+                else:
+                    raise ValueError("Corrupt hand history at " +
+                                     str(log.tell()))
+            except EOFError:
+                return None
+
+    @staticmethod
+    def _read(log, record):
+        # type: (file, struct.Struct) -> tuple
+        """Read the remainder of a record whose type byte was consumed.
+
+        Args:
+            log: File to read from
+            record: Layout of the record
+
+        Returns:
+            Fields of the record following the type
+        """
+        data = log.read(record.size - 1)
+        if len(data) < record.size - 1:
+            raise EOFError
+        return record.unpack(b'\0' + data)[1:]
+
+    @staticmethod
+    def _cards(log, n):
+        # type: (file, int) -> list
+        """Read n packed cards.
+
+        Args:
+            log: File to read from
+            n: Number of cards
+
+        Returns:
+            Cards in deuces integer form
+        """
+        data = bytearray(log.read(n))
+        if len(data) < n:
+            raise EOFError
+        return [BYTE_TO_CARD[b] for b in data]
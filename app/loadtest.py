@@ -0,0 +1,244 @@
+"""Headless load generator simulating many Web Socket players.
+
+Connect the clients to a running server, then press "Start" on the server
+so that Poker deals to them. Every client swaps a random selection of cards
+as soon as it is dealt a hand and the first client deals a new hand after
+every showdown.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+
+from websocket import (create_connection, WebSocketException,
+                       WebSocketTimeoutException, socket)
+
+
+class Stats(object):
+    """Latency and throughput measurements shared by all clients."""
+
+    def __init__(self):
+        """Start with no measurements."""
+        self.lock = threading.Lock()
+        self.connect_times = []
+        self.latencies = []
+        self.received = 0
+        self.sent = 0
+        self.hands = 0
+        self.errors = 0
+        self.start = time.time()
+        self.end = None
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of these Stats.
+
+        Returns:
+            Text representation of these Stats
+        """
+        return "Stats(sent={}, received={}, hands={}, errors={})".format(
+            self.sent, self.received, self.hands, self.errors)
+
+    def add(self, name, value=1):
+        # type: (str, object)
+        """Record a measurement.
+
+        Args:
+            name: Counter to increment or list to append to
+            value: Increment or value to be appended
+        """
+        with self.lock:
+            attr = getattr(self, name)
+            if isinstance(attr, list):
+                attr.append(value)
+            else:
+                setattr(self, name, attr + value)
+
+    @staticmethod
+    def percentiles(values, points=(50, 90, 99, 100)):
+        # type: (list, tuple) -> list
+        """Compute percentiles of a list of values.
+
+        Args:
+            values: Measured values
+            points: Percentiles to compute
+
+        Returns:
+            A (percentile, value) tuple for every point
+        """
+        if not values:
+            return [(p, float('nan')) for p in points]
+        values = sorted(values)
+        return [(p, values[min(len(values) - 1, len(values) * p // 100)])
+                for p in points]
+
+    def report(self):
+        # type: () -> str
+        """Summarise the measurements.
+
+        Returns:
+            Human readable summary
+        """
+        elapsed = (self.end or time.time()) - self.start
+        lines = [
+            "{} clients connected, {} errors".format(len(self.connect_times),
+                                                     self.errors),
+            "{} messages sent, {} received in {:.1f}s".format(
+                self.sent, self.received, elapsed),
+            "{:.1f} messages/s received, {:.1f} hands/s".format(
+                self.received / elapsed, self.hands / elapsed),
+        ]
+        for name, values in (("connect", self.connect_times),
+                             ("round trip", self.latencies)):
+            lines.append("{} ms: ".format(name) + ", ".join(
+                "p{}={:.2f}".format(p, v * 1000)
+                for p, v in self.percentiles(values)))
+        return "\n".join(lines)
+
+
+class LoadClient(threading.Thread):
+    """A simulated player speaking the protocol of the front-end Game.
+
+    The round trip of an action is timed until the message answering it,
+    other messages (e.g. hands dealt by another client) do not end it.
+    """
+
+    # tells whether a message answers an action: a swap is answered by the
+    # swapped hand or by the showdown if it was the last one, a deal by the
+    # new hand
+    REPLIES = {
+        'swap': lambda msg: msg.get('swapped') or 'hs' in msg,
+        'deal': lambda msg: 'hand' in msg and not msg.get('swapped'),
+    }
+
+    def __init__(self, address, stats, stop, deals=False):
+        # type: (str, Stats, threading.Event, bool)
+        """Initiate a LoadClient.
+
+        Args:
+            address: Host and port of the server
+            stats: Where measurements are recorded
+            stop: Set when the client should disconnect
+            deals: If True deal a new hand after every showdown
+        """
+        super(LoadClient, self).__init__()
+        self.daemon = True
+        self.address = address
+        self.stats = stats
+        self.stop = stop
+        self.deals = deals
+        self.id = None
+        self.ws = None
+        self.waiting = None
+
+    def run(self):
+        """Connect and play until asked to stop."""
+        start = time.time()
+        try:
+            self.ws = create_connection('ws://' + self.address)
+        except (socket.error, WebSocketException):
+            self.stats.add('errors')
+            return
+        self.stats.add('connect_times', time.time() - start)
+        self.ws.settimeout(1)
+
+        try:
+            while not self.stop.is_set():
+                try:
+                    msg = self.ws.recv()
+                except WebSocketTimeoutException:
+                    continue
+                now = time.time()
+                self.stats.add('received')
+                msg = json.loads(msg)
+                if self.waiting is not None:
+                    action, sent_at = self.waiting
+                    if self.REPLIES[action](msg):
+                        self.stats.add('latencies', now - sent_at)
+                        self.waiting = None
+                self.received(msg)
+        except (socket.error, WebSocketException):
+            if not self.stop.is_set():
+                self.stats.add('errors')
+        finally:
+            self.ws.close()
+
+    def received(self, msg):
+        # type: (dict)
+        """Answer a message from the game server.
+
+        Args:
+            msg: Message from the game server
+        """
+        if '_new_id_' in msg:
+            self.id = msg['_new_id_']
+        elif 'hs' in msg:
+            if self.deals:
+                self.stats.add('hands')
+                self.send({'action': 'deal'})
+        elif 'hand' in msg and not msg.get('swapped'):
+            for card in msg['hand']:
+                card['selected'] = random.random() < 0.5
+            self.send({'action': 'swap', 'hand': msg['hand']})
+
+    def send(self, msg):
+        # type: (dict)
+        """Send a message to the game server and start timing the reply.
+
+        Args:
+            msg: Message to be sent, its action one of REPLIES
+        """
+        msg['senderId'] = self.id
+        self.waiting = (msg['action'], time.time())
+        self.ws.send(json.dumps(msg))
+        self.stats.add('sent')
+
+
+def run(address="localhost:8000", clients=10, duration=30.0, ramp=0.0):
+    # type: (str, int, float, float) -> Stats
+    """Connect clients to a server and measure them for a while.
+
+    Args:
+        address: Host and port of the server
+        clients: Number of simulated players
+        duration: Seconds to measure for after all clients connected
+        ramp: Seconds over which the connections are spread out
+
+    Returns:
+        The measurements
+    """
+    stats = Stats()
+    stop = threading.Event()
+    threads = []
+    for i in xrange(clients):
+        threads.append(LoadClient(address, stats, stop, deals=i == 0))
+        threads[-1].start()
+        if ramp:
+            time.sleep(float(ramp) / clients)
+
+    try:
+        time.sleep(duration)
+    except KeyboardInterrupt:
+        pass
+    stats.end = time.time()
+    stop.set()
+    for t in threads:
+        t.join(2)
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('address', nargs='?', default="localhost:8000",
+                        help="host and port of the server")
+    parser.add_argument('-n', '--clients', type=int, default=10)
+    parser.add_argument('-d', '--duration', type=float, default=30.0,
+                        help="seconds to measure for")
+    parser.add_argument('-r', '--ramp', type=float, default=0.0,
+                        help="seconds over which connections are opened")
+    args = parser.parse_args()
+
+    print run(args.address, args.clients, args.duration, args.ramp).report()
@@ -1,15 +1,24 @@
 """The main menu and communication between components."""
 
+import binascii
+import os
+import threading
+import time
+
 from kivy.clock import mainthread
 from kivy.lang import Builder
-from kivy.properties import StringProperty, NumericProperty
+from kivy.properties import (StringProperty, NumericProperty,
+                             BooleanProperty)
 from kivy.uix.button import Button
 from kivy.uix.screenmanager import Screen, ScreenManager
 from kivy.garden.qrcode import QRCodeWidget
 from kivy.utils import platform
 from kivy.logger import Logger
 from kivy.core.window import Window
-from poker import Poker
+from poker import Poker, JokerPoker
+from history import HandHistory
+from bots import Bot, random_swap
+from registry import ConnectionRegistry
 from websockets import WebSockets
 from utils import thread, popup
 import jsonpickle
@@ -131,6 +140,13 @@ class CardsApp(App):
     BT_SET = 0x124
     BT_SRV = 0x125
 
+    # Seconds a seat is kept for a disconnected player, and for which a
+    # client keeps trying to reconnect to its server.
+    GRACE = 30
+
+    # Play JokerPoker instead of Poker - toggled on the server screen.
+    jokers = BooleanProperty(False)
+
     def __init__(self, headless=False, **kwargs):
         # type: (bool, dict)
         """Initiate CardsApp class. Create all the Screens and variables.
@@ -158,9 +174,11 @@ class CardsApp(App):
         self.is_server = False
         self.ws = WebSockets(self)
         self.backend = None
+        self.history = None
 
         self.client_id = 0
-        self.connections = {}  # server always id=0
+        self.connections = ConnectionRegistry()  # server always id=0
+        self.reset_sessions()
 
     def build(self):
         # type: () -> ScreenManager
@@ -182,40 +200,124 @@ class CardsApp(App):
             conn: Connection to client
         """
         Logger.info("Connected to " + str(conn))
-        for clientId in xrange(1000):
-            if clientId not in self.connections:
-                self.connections[clientId] = {
-                    'function': fun,
-                    'connection': conn
-                }
+        client_id = self.connections.add(fun, conn)
 
-                self.sm.get_screen('server').num_connected \
-                    = len(self.connections) - 2 if not self.headless \
-                    else len(self.connections) - 1
+        self.sm.get_screen('server').num_connected \
+            = len(self.connections) - 2 if not self.headless \
+            else len(self.connections) - 1
 
-                if self.is_server:
-                    self.send({'_new_id_': clientId}, clientId)
-                break
+        if self.is_server:
+            token = binascii.hexlify(os.urandom(16))
+            self.sessions[token] = client_id
+            self.tokens[client_id] = token
+            self.send({'_new_id_': client_id, '_token_': token}, client_id)
 
     def remove_conn(self, conn):
         # type: (object)
         """End game when a client disconnects.
 
+        A player of a running game keeps their seat for GRACE seconds, and a
+        client tries to reconnect to its server for as long, before the game
+        is ended.
+
         Args:
             conn: A connection to a client
         """
         Logger.info("Disconnected from " + str(conn))
-        for i, data in self.connections.iteritems():
-            if data['connection'] == conn:
-                if i == 0:
-                    popup("Disconnected from server", callback=self.go_home)
-                else:
-                    popup("Disconnected from player " + str(i),
-                          callback=self.go_home)
+        if self.is_server and self.backend is not None:
+            i = self.connections.id_of(conn)
+            if i in self.backend.players:
+                self.connections.detach(conn)
+                timer = threading.Timer(self.GRACE, self.expire_seat, [i])
+                timer.daemon = True
+                self.grace_timers[i] = timer
+                timer.start()
+                return
+
+        i = self.connections.remove(conn)
+        self.forget_session(i)
+        if i == 0 and self.token is not None and \
+                self.reconnect_to is not None:
+            thread(self.reconnect)
+        elif i == 0:
+            popup("Disconnected from server", callback=self.go_home)
+        elif i is not None:
+            popup("Disconnected from player " + str(i), callback=self.go_home)
+
+    def forget_session(self, client_id):
+        # type: (int)
+        """Invalidate the session token of a client.
+
+        Args:
+            client_id: Id of the client
+        """
+        self.sessions.pop(self.tokens.pop(client_id, None), None)
+
+    def expire_seat(self, client_id):
+        # type: (int)
+        """End the game if a player did not come back in time.
+
+        Args:
+            client_id: Id of the disconnected player
+        """
+        self.grace_timers.pop(client_id, None)
+        if self.connections.detached(client_id):
+            self.connections.release(client_id)
+            self.forget_session(client_id)
+            popup("Disconnected from player " + str(client_id),
+                  callback=self.go_home)
+
+    def resume_session(self, token, client_id):
+        # type: (str, int)
+        """Give a reconnected client back its seat and replay the game state.
 
-                del self.connections[i]
+        Args:
+            token: Session token the client was given when it first connected
+            client_id: Id assigned to the new connection of the client
+        """
+        seat = self.sessions.get(token)
+        if seat is None or not self.connections.detached(seat):
+            self.send({'_resume_failed_': True}, client_id)
+            return
+
+        timer = self.grace_timers.pop(seat, None)
+        if timer is not None:
+            timer.cancel()
+        self.forget_session(client_id)
+        self.connections.move(self.connections[client_id]['connection'], seat)
+        Logger.info("Player %s resumed their session", seat)
+
+        self.send({'_new_id_': seat, '_token_': token, '_resumed_': True},
+                  seat)
+        self.backend.resume(seat)
+
+    def reconnect(self):
+        """Try to reconnect to the server and resume the session."""
+        self.resuming = True
+        deadline = time.time() + self.GRACE
+        delay = .5
+        while time.time() < deadline:
+            if self.reconnect_to() is not False:
+                return
+            time.sleep(delay)
+            delay = min(delay * 2, 5)
+
+        self.resuming = False
+        popup("Disconnected from server", callback=self.go_home)
+
+    def add_bot(self, policy=random_swap):
+        # type: (function)
+        """Seat a computer controlled player at the table.
+
+        The bot is connected like any other client. On a headless server the
+        first bot also deals new hands.
 
-                break
+        Args:
+            policy: Chooses which cards the bot swaps
+        """
+        bot = Bot(policy, deals=self.headless and len(self.connections) == 1,
+                  send=self.receive)
+        self.add_conn(lambda msg, conn: thread(bot.deliver, [msg, conn]), bot)
 
     def my_key_handler(self, window, key_code, *args):
         # type: (object, int, tuple)
@@ -260,6 +362,7 @@ class CardsApp(App):
             address: Server address to connect to
         """
         self.is_server = False
+        self.reconnect_to = lambda: self.ws.client(address, True)
         thread(self.ws.client, [address])
         self.start()
 
@@ -294,7 +397,11 @@ class CardsApp(App):
         self.go('game')
 
         if self.is_server:
-            self.backend = Poker(self)
+            if self.history is None:
+                self.history = HandHistory(
+                    os.path.join(self.user_data_dir, 'hands.chh'))
+            game = JokerPoker if self.jokers else Poker
+            self.backend = game(self, self.history)
             self.backend.run()
 
             if self.headless:
@@ -312,19 +419,38 @@ class CardsApp(App):
         """
         msg = jsonpickle.dumps(msg, unpicklable=False)
         Logger.debug('Sending message to %s: %s', destination_id, msg)
-        conn = self.connections[destination_id]
-        thread(conn['function'], [msg, conn['connection']])
+        self.deliver(msg, destination_id)
 
     def send_all(self, msg):
         # type: (dict)
         """Send message to all clients.
 
+        The message is serialized once and the same string is handed to
+        every connection.
+
         Args:
             msg: Message to be sent
         """
+        msg = jsonpickle.dumps(msg, unpicklable=False)
+        Logger.debug('Sending message to all: %s', msg)
         for c in self.connections:
             if c != 0:
-                thread(self.send, [msg, c])
+                self.deliver(msg, c)
+
+    def deliver(self, data, destination_id):
+        # type: (str, int)
+        """Pass a serialized message to the connection of a client.
+
+        Send functions of connections return without blocking - they write
+        through the Twisted reactor or start a thread for blocking sockets.
+
+        Args:
+            data: Serialized message
+            destination_id: Id of destination
+        """
+        conn = self.connections[destination_id]
+        self.connections.sent(destination_id, len(data))
+        conn['function'](data, conn['connection'])
 
     def update_ip(self, port):
         # type: (int)
@@ -411,17 +537,30 @@ class CardsApp(App):
             to_client: If True send message to client not server
         """
         Logger.debug("Received: " + str(msg))
+        size = len(msg)
         try:
             msg = jsonpickle.loads(msg)
         except ValueError:
             Logger.error("Not valid JSON: " + msg)
 
         if '_new_id_' in msg:
-            self.client_id = msg['_new_id_']
+            if self.resuming and '_resumed_' not in msg:
+                self.send({'_resume_': self.token,
+                           'senderId': msg['_new_id_']})
+            else:
+                self.resuming = False
+                self.client_id = msg['_new_id_']
+                self.token = msg.get('_token_')
+        elif '_resume_' in msg and self.is_server:
+            self.resume_session(msg['_resume_'], msg['senderId'])
+        elif '_resume_failed_' in msg:
+            self.resuming = False
+            popup("Disconnected from server", callback=self.go_home)
         else:
             if not self.is_server or to_client:
                 thread(self.sm.get_screen('game').received, [msg])
             else:
+                self.connections.received(msg.get('senderId'), size)
                 thread(self.backend.received, [msg])
 
     @staticmethod
@@ -477,10 +616,36 @@ class CardsApp(App):
                 self.bt = None
                 self.is_server = False
                 self.ws = WebSockets(self)
-                self.backend = None
+                self.stop_backend()
+                self.close_history()
 
                 self.client_id = 0
-                self.connections = {}  # server always id=0
+                self.connections = ConnectionRegistry()  # server always id=0
+                self.reset_sessions()
+
+    def reset_sessions(self):
+        """Forget all session tokens and stop waiting for reconnections."""
+        for timer in getattr(self, 'grace_timers', {}).values():
+            timer.cancel()
+        self.grace_timers = {}
+        self.sessions = {}  # token -> client id
+        self.tokens = {}  # client id -> token
+
+        self.token = None
+        self.resuming = False
+        self.reconnect_to = None
+
+    def stop_backend(self):
+        """Stop the game run by this server, including its turn timers."""
+        if self.backend is not None:
+            self.backend.stop()
+            self.backend = None
+
+    def close_history(self):
+        """Flush and close the hand history log if one is open."""
+        if self.history is not None:
+            self.history.close()
+            self.history = None
 
     def go_home(self, *args):
         # type: (tuple)
@@ -491,6 +656,11 @@ class CardsApp(App):
         """
         self.go_back(True)
 
+    def on_stop(self):
+        """Run when the app is closing."""
+        self.stop_backend()
+        self.close_history()
+
     def on_pause(self):
         # type: () -> bool
         """Prevent the app from stopping when paused.
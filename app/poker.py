@@ -1,11 +1,78 @@
 """Back-end game implementation -- Five-card Draw Poker."""
 
+import threading
+
 from cards import Game, Card, Player, Deck
-from deuces import Evaluator
+from deuces import Evaluator, WildEvaluator
+from showdown import evaluate_all, evaluator, tie_groups
+
+
+def start_timer(delay, callback, *args):
+    # type: (float, function, tuple) -> threading.Timer
+    """Default scheduler of Poker - calls back from a daemon thread.
+
+    Args:
+        delay: Seconds to wait
+        callback: Called once the time is up
+        *args: Passed on to callback
+
+    Returns:
+        The timer, whose cancel() stops it
+    """
+    timer = threading.Timer(delay, callback, args)
+    timer.daemon = True
+    timer.start()
+    return timer
 
 
 class Poker(Game):
-    """Represents a Game of Five-card Draw Poker."""
+    """Represents a Game of Five-card Draw Poker.
+
+    Every hand goes through three phases: DEALING while the cards are dealt
+    and recorded, SWAPPING until every player has swapped or the turn timer
+    runs out, and SHOWDOWN until somebody deals the next hand. Messages
+    which do not fit the current phase are ignored, so a late or repeated
+    swap can not score a hand twice and two deals can not overlap.
+
+    A counter of the players yet to swap tells when the swapping is over
+    without looking at every player. When SWAP_TIME seconds pass first,
+    everyone who has not swapped stands pat, so an idle player holds up
+    the table for SWAP_TIME at most. With DEAL_TIME set, the next hand is
+    also dealt automatically that long after a showdown. Once stop() is
+    called the game is STOPPED: its timer is cancelled and messages and
+    late timer callbacks are ignored.
+    """
+
+    JOKERS = 0
+    EVALUATOR = Evaluator
+
+    DEALING, SWAPPING, SHOWDOWN = 'dealing', 'swapping', 'showdown'
+    STOPPED = 'stopped'
+    SWAP_TIME = 60.0
+    DEAL_TIME = None
+
+    def __init__(self, cards_app, history=None, scheduler=start_timer):
+        # type: (CardsApp, HandHistory, function)
+        """Initialize a Poker game.
+
+        Args:
+            cards_app: The main class of this application
+            history: Log recording every hand played - optional
+            scheduler: Called with a delay, a callback and its arguments to
+                start a turn timer, returns an object with a cancel()
+                method - None for no timers
+        """
+        super(Poker, self).__init__(cards_app)
+        if self.JOKERS:
+            self.deck = Deck(jokers=self.JOKERS)
+        self.history = history
+        self.scheduler = scheduler
+        self.result = None
+        self.phase = self.DEALING
+        self.pending = 0
+        self.hand_number = 0
+        self.timer = None
+        self.lock = threading.RLock()
 
     def __repr__(self):
         # type: () -> str
@@ -14,19 +81,23 @@ class Poker(Game):
         Returns:
             Representation of this Card
         """
-        return "Poker Game. Players: {}. {}".format(self.players, self.deck)
+        return "Poker Game ({}). Players: {}. {}".format(
+            self.phase, self.players, self.deck)
 
     def run(self):
         """Called when the game is started."""
-        for k in self.ca.connections:
-            if k != 0:
-                self.players[k] = PokerPlayer(False, k, self)
+        with self.lock:
+            for k in self.ca.connections:
+                if k != 0:
+                    self.players[k] = PokerPlayer(False, k, self)
+            self.record_deal()
 
-        for pid in self.players:
-            self.ca.send({'hand': self.players[pid].hand,
-                          'init': [(k, v.score)
-                                   for k, v in self.players.items()]
-                          }, pid)
+            for pid in self.players:
+                self.ca.send({'hand': self.players[pid].hand,
+                              'init': [(k, v.score)
+                                       for k, v in self.players.items()]
+                              }, pid)
+            self.start_swapping()
 
     def received(self, msg):
         # type: (dict)
@@ -39,27 +110,149 @@ class Poker(Game):
                     His hand is passed along in msg['hand'].
                 - 'deal' - a player is requesting a new hand to be dealt.
         """
-        if msg['action'] == 'swap':
-            p = self.players[msg['senderId']]
-            hand = map(Card.from_dict, msg['hand'])
-            p.swap(filter(lambda obj: obj.selected, hand))
+        with self.lock:
+            if self.phase == self.STOPPED:
+                return
+            if msg['action'] == 'swap':
+                p = self.players[msg['senderId']]
+                if self.phase != self.SWAPPING or p.swapped:
+                    self.resume(p.id)
+                    return
+                hand = map(Card.from_dict, msg['hand'])
+                self.swap(p, filter(lambda obj: obj.selected, hand))
+
+            if msg['action'] == 'deal' and self.phase == self.SHOWDOWN:
+                self.deal()
+
+    def swap(self, p, selected):
+        # type: (PokerPlayer, list)
+        """Swap the cards of a player and end the phase after the last one.
+
+        Args:
+            p: Player who has not swapped yet
+            selected: Cards the player gives away
+        """
+        before = list(p.hand)
+        p.swap(selected)
+        if self.history is not None:
+            self.history.swap(p.id, [c.d_card for c in selected],
+                              [c.d_card for c in p.hand if c not in before])
+
+        self.pending -= 1
+        if self.pending == 0:
+            self.showdown()
+        else:
+            self.ca.send({'hand': p.hand, 'swapped': True}, p.id)
+
+    def deal(self):
+        """Shuffle a new deck and deal a new hand to everyone."""
+        self.cancel_timer()
+        self.phase = self.DEALING
+        self.deck = Deck(jokers=self.JOKERS)
+        self.result = None
+        for v in self.players.values():
+            v.hand = []
+            v.swapped = False
+            v.draw(5)
+        self.record_deal()
+
+        for k, v in self.players.items():
+            self.ca.send({'hand': v.hand}, k)
+        self.start_swapping()
+
+    def start_swapping(self):
+        """Wait for every player to swap, for SWAP_TIME at most."""
+        self.hand_number += 1
+        self.phase = self.SWAPPING
+        self.pending = len(self.players)
+        self.start_timer(self.SWAP_TIME, self.swap_timeout)
+
+    def showdown(self):
+        """Score the hand and show everyone's cards."""
+        self.cancel_timer()
+        self.phase = self.SHOWDOWN
+        self.result = {'won': self.calculate_score(),
+                       'hs': [(k, v.score, v.hand)
+                              for k, v in self.players.items()]}
+        self.ca.send_all(self.result)
+        self.start_timer(self.DEAL_TIME, self.deal_timeout)
 
-            if len(filter(lambda (key, obj): not obj.swapped,
-                          self.players.items())) == 0:
+    def start_timer(self, delay, callback):
+        # type: (float, function)
+        """Run a callback after a delay unless the hand moves on first.
 
-                self.ca.send_all({'won': self.calculate_score(),
-                                  'hs': [(k, v.score, v.hand)
-                                         for k, v in self.players.items()]})
+        Args:
+            delay: Seconds to wait - None for no timer
+            callback: Called with the number of the current hand
+        """
+        if delay is not None and self.scheduler is not None:
+            self.timer = self.scheduler(delay, callback, self.hand_number)
+
+    def stop(self):
+        """End the game for good, e.g. before the history log is closed."""
+        with self.lock:
+            self.cancel_timer()
+            self.phase = self.STOPPED
+
+    def cancel_timer(self):
+        """Stop the timer of the current phase."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def swap_timeout(self, hand_number):
+        # type: (int)
+        """Make everyone who has not swapped yet stand pat.
+
+        Args:
+            hand_number: Hand the timer was started in
+        """
+        with self.lock:
+            if hand_number != self.hand_number or \
+                    self.phase != self.SWAPPING:
+                return
+            self.timer = None
+            for p in self.players.values():
+                if not p.swapped:
+                    self.swap(p, [])
+
+    def deal_timeout(self, hand_number):
+        # type: (int)
+        """Deal the next hand if nobody has done so yet.
+
+        Args:
+            hand_number: Hand the timer was started in
+        """
+        with self.lock:
+            if hand_number == self.hand_number and \
+                    self.phase == self.SHOWDOWN:
+                self.timer = None
+                self.deal()
+
+    def resume(self, pid):
+        # type: (int)
+        """Replay the state of the current hand to a player who reconnected.
+
+        Args:
+            pid: Id of the player
+        """
+        with self.lock:
+            if self.phase == self.STOPPED:
+                return
+            p = self.players[pid]
+            if self.phase == self.SHOWDOWN:
+                self.ca.send(self.result, pid)
+            elif p.swapped:
+                self.ca.send({'hand': p.hand, 'swapped': True}, pid)
             else:
-                self.ca.send({'hand': p.hand, 'swapped': True}, p.id)
+                self.ca.send({'hand': p.hand}, pid)
 
-        if msg['action'] == 'deal':
-            self.deck = Deck()
+    def record_deal(self):
+        """Start a new hand in the history log with everyone's cards."""
+        if self.history is not None:
+            self.history.start_hand(self.deck.seed)
             for k, v in self.players.items():
-                v.hand = []
-                v.swapped = False
-                v.draw(5)
-                self.ca.send({'hand': v.hand}, k)
+                self.history.deal(k, [card.d_card for card in v.hand])
 
     def calculate_score(self):
         # type: () -> list
@@ -68,20 +261,30 @@ class Poker(Game):
         Returns:
             Ids of players who won this hand
         """
-        scores = {}
-        for k, v in self.players.items():
-            scores[k] = Evaluator().evaluate([card.d_card for card in v.hand],
-                                             [])
-
-        m = min(scores.values())
-        l = [k for k, v in scores.items() if v == m]
+        order = tie_groups(evaluate_all(
+            {k: [card.d_card for card in v.hand]
+             for k, v in self.players.items()}, e=evaluator(self.EVALUATOR)))
+        l = order[0][1]
 
         for i in l:
             self.players[i].win()
 
+        if self.history is not None:
+            for k, v in self.players.items():
+                self.history.showdown(k, [card.d_card for card in v.hand],
+                                      k in l)
+            self.history.end_hand()
+
         return l
 
 
+class JokerPoker(Poker):
+    """Five-card Draw Poker with both jokers in the deck as wild cards."""
+
+    JOKERS = 2
+    EVALUATOR = WildEvaluator
+
+
 class PokerPlayer(Player):
     """Represent a poker player in the game."""
 
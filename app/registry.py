@@ -0,0 +1,258 @@
+"""Thread-safe routing table of connected clients."""
+
+import heapq
+import threading
+import time
+
+
+def _drop(msg, conn):
+    # type: (str, object)
+    """Send function of detached connections - discards the message.
+
+    Args:
+        msg: The message
+        conn: Always None
+    """
+    pass
+
+
+class ConnectionStats(object):
+    """Traffic counters of a single connection."""
+
+    def __init__(self):
+        """Start counting from now."""
+        self.connected_at = time.time()
+        self.sent = 0
+        self.sent_bytes = 0
+        self.received = 0
+        self.received_bytes = 0
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of these ConnectionStats.
+
+        Returns:
+            Text representation of these ConnectionStats
+        """
+        return "ConnectionStats(sent={}/{}B, received={}/{}B, up={:.0f}s)"\
+            .format(self.sent, self.sent_bytes, self.received,
+                    self.received_bytes, time.time() - self.connected_at)
+
+
+class ConnectionRegistry(object):
+    """Assign ids to connections and look them up in constant time.
+
+    Each entry is a dictionary holding the 'function' used to send to the
+    connection, the 'connection' itself and its 'stats'. The smallest free id
+    is always assigned first, so the server gets 0.
+    """
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._ids = {}  # id() of a connection -> client id
+        self._free = []  # heap of released client ids
+        self._next = 0
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of this ConnectionRegistry.
+
+        Returns:
+            Text representation of this ConnectionRegistry
+        """
+        return "ConnectionRegistry({})".format(sorted(self))
+
+    def __len__(self):
+        # type: () -> int
+        """Return the number of connections.
+
+        Returns:
+            Number of registered connections
+        """
+        return len(self._entries)
+
+    def __contains__(self, client_id):
+        # type: (int) -> bool
+        """Check if a client id is in use.
+
+        Args:
+            client_id: The id to check
+
+        Returns:
+            True if the id is registered
+        """
+        return client_id in self._entries
+
+    def __iter__(self):
+        # type: () -> iter
+        """Iterate over a snapshot of the registered ids.
+
+        Returns:
+            Iterator of client ids
+        """
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __getitem__(self, client_id):
+        # type: (int) -> dict
+        """Get the entry of a client.
+
+        Args:
+            client_id: Id of the client
+
+        Returns:
+            Dictionary with the 'function', 'connection' and 'stats'
+        """
+        return self._entries[client_id]
+
+    def add(self, fun, conn=None):
+        # type: (function, object) -> int
+        """Register a connection under the smallest free id.
+
+        Args:
+            fun: Function to be called to send to this connection
+            conn: The connection
+
+        Returns:
+            The assigned client id
+        """
+        with self._lock:
+            if self._free:
+                client_id = heapq.heappop(self._free)
+            else:
+                client_id = self._next
+                self._next += 1
+
+            self._entries[client_id] = {
+                'function': fun,
+                'connection': conn,
+                'stats': ConnectionStats()
+            }
+            self._ids[id(conn)] = client_id
+            return client_id
+
+    def remove(self, conn):
+        # type: (object) -> int
+        """Unregister a connection and release its id.
+
+        Args:
+            conn: The connection
+
+        Returns:
+            The id the connection had or None if it was not registered
+        """
+        with self._lock:
+            client_id = self._ids.pop(id(conn), None)
+            if client_id is None:
+                return None
+            del self._entries[client_id]
+            heapq.heappush(self._free, client_id)
+            return client_id
+
+    def detach(self, conn):
+        # type: (object) -> int
+        """Forget a connection but keep its id reserved.
+
+        Messages sent to a detached id are dropped until a connection is
+        attached to it again with move() or the id is released.
+
+        Args:
+            conn: The connection
+
+        Returns:
+            The id the connection had or None if it was not registered
+        """
+        with self._lock:
+            client_id = self._ids.pop(id(conn), None)
+            if client_id is not None:
+                entry = self._entries[client_id]
+                entry['function'] = _drop
+                entry['connection'] = None
+            return client_id
+
+    def move(self, conn, client_id):
+        # type: (object, int)
+        """Attach a registered connection to a detached id.
+
+        The id the connection had until now is released.
+
+        Args:
+            conn: The connection
+            client_id: A detached id
+        """
+        with self._lock:
+            old = self._ids[id(conn)]
+            entry = self._entries.pop(old)
+            heapq.heappush(self._free, old)
+
+            target = self._entries[client_id]
+            target['function'] = entry['function']
+            target['connection'] = conn
+            self._ids[id(conn)] = client_id
+
+    def release(self, client_id):
+        # type: (int)
+        """Release the id of a detached connection.
+
+        Args:
+            client_id: A detached id
+        """
+        with self._lock:
+            if self.detached(client_id):
+                del self._entries[client_id]
+                heapq.heappush(self._free, client_id)
+
+    def detached(self, client_id):
+        # type: (int) -> bool
+        """Check if an id is reserved for a connection which was lost.
+
+        Args:
+            client_id: Id of the client
+
+        Returns:
+            True if the id is detached
+        """
+        entry = self._entries.get(client_id)
+        return entry is not None and entry['function'] is _drop
+
+    def id_of(self, conn):
+        # type: (object) -> int
+        """Find the id of a connection.
+
+        Args:
+            conn: The connection
+
+        Returns:
+            Its client id or None if it is not registered
+        """
+        return self._ids.get(id(conn))
+
+    def sent(self, client_id, size):
+        # type: (int, int)
+        """Count a message sent to a client.
+
+        Args:
+            client_id: Id of the client
+            size: Length of the message
+        """
+        entry = self._entries.get(client_id)
+        if entry is not None:
+            with self._lock:
+                entry['stats'].sent += 1
+                entry['stats'].sent_bytes += size
+
+    def received(self, client_id, size):
+        # type: (int, int)
+        """Count a message received from a client.
+
+        Args:
+            client_id: Id of the client
+            size: Length of the message
+        """
+        entry = self._entries.get(client_id)
+        if entry is not None:
+            with self._lock:
+                entry['stats'].received += 1
+                entry['stats'].received_bytes += size
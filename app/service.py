@@ -0,0 +1,508 @@
+"""Local HTTP service ranking hands and estimating equities in micro-batches.
+
+POST newline delimited JSON to /evaluate, one request per line:
+
+    {"id": 1, "op": "rank", "cards": ["As", "Kd", "2c", "7d", "9h"]}
+    {"id": 2, "op": "equity", "hands": [["As", "Kd"], ["Qc", "Qh"]]}
+
+and read one line of JSON per request back, in the same order. Every op has
+a queue shared by all connections and a worker thread taking requests off
+it in batches of at most --max-batch, a batch waiting at most --linger
+milliseconds to fill up. The hands of a batch of rank requests are ranked
+in a single call of Evaluator.evaluate_many(). An equity request may take
+up to --budget milliseconds, so equity requests have a queue of their own
+and never hold up rank requests; equal ones in a batch are only computed
+once. The spots of an equity batch are estimated one after the other, so
+they share --batch-budget milliseconds: each of n spots gets at most
+batch-budget / n of them, making a batch, and so the wait of the requests
+queued behind it, no longer than --batch-budget however full it is. GET
+/stats reports the throughput and the time requests spent queued for every
+op.
+"""
+
+import argparse
+import collections
+import json
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from Queue import Queue, Empty
+from SocketServer import ThreadingMixIn
+
+from deuces import Card as DCard
+from equity import anytime_equity
+from showdown import evaluator
+
+
+def error(e):
+    # type: (Exception) -> dict
+    """Describe an exception in a reply.
+
+    Args:
+        e: The exception
+
+    Returns:
+        Reply to a request which could not be answered
+    """
+    return {'error': "{}: {}".format(type(e).__name__, e)}
+
+
+class BatchStats(object):
+    """Throughput and queue latency of a Batcher."""
+
+    def __init__(self, window=10000):
+        # type: (int)
+        """Start with no measurements.
+
+        Args:
+            window: Number of most recent latencies kept for percentiles
+        """
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.latencies = collections.deque(maxlen=window)
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of these BatchStats.
+
+        Returns:
+            Text representation of these BatchStats
+        """
+        return "BatchStats(requests={}, batches={}, errors={})".format(
+            self.requests, self.batches, self.errors)
+
+    def add_batch(self, latencies, busy, errors):
+        # type: (list, float, int)
+        """Record a handled batch.
+
+        Args:
+            latencies: Seconds every request of the batch spent queued
+            busy: Seconds spent handling the batch
+            errors: Number of requests which could not be answered
+        """
+        with self.lock:
+            self.requests += len(latencies)
+            self.batches += 1
+            self.errors += errors
+            self.busy += busy
+            self.latencies.extend(latencies)
+
+    def report(self, points=(50, 90, 99, 100)):
+        # type: (tuple) -> dict
+        """Summarise the measurements.
+
+        Args:
+            points: Percentiles of the queue latency to report
+
+        Returns:
+            Counters, rates and queue latency percentiles in milliseconds
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            elapsed = time.time() - self.start
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'errors': self.errors,
+                'uptime': round(elapsed, 3),
+                'requests_per_second': round(self.requests / elapsed, 1),
+                'mean_batch': round(
+                    float(self.requests) / (self.batches or 1), 2),
+                'utilisation': round(self.busy / elapsed, 3),
+                'queue_ms': {
+                    'p{}'.format(p): round(latencies[min(
+                        len(latencies) - 1, len(latencies) * p // 100)]
+                        * 1000, 3) if latencies else None
+                    for p in points},
+            }
+
+
+class Job(object):
+    """A request waiting in the queue of a Batcher."""
+
+    __slots__ = ('request', 'queued', 'reply', 'done')
+
+    def __init__(self, request):
+        # type: (dict)
+        """Initiate a Job.
+
+        Args:
+            request: Decoded request
+        """
+        self.request = request
+        self.queued = time.time()
+        self.reply = None
+        self.done = threading.Event()
+
+
+class Batcher(threading.Thread):
+    """Worker thread handing queued requests to an engine in batches.
+
+    The first request of a batch is waited for indefinitely, the rest for
+    at most linger seconds after it, so a lone request is delayed by the
+    linger time at worst and a busy queue fills batches immediately.
+    """
+
+    def __init__(self, engine, max_batch=64, linger=0.002):
+        # type: (function, int, float)
+        """Initiate a Batcher.
+
+        Args:
+            engine: Returns a reply for every request of a list
+            max_batch: Largest number of requests handled together
+            linger: Seconds to wait for a batch to fill up
+        """
+        super(Batcher, self).__init__()
+        self.daemon = True
+        self.engine = engine
+        self.max_batch = max_batch
+        self.linger = linger
+        self.queue = Queue()
+        self.stats = BatchStats()
+
+    def put(self, request):
+        # type: (dict) -> Job
+        """Queue a request.
+
+        Args:
+            request: Decoded request
+
+        Returns:
+            The queued Job - its reply is set once done is
+        """
+        job = Job(request)
+        self.queue.put(job)
+        return job
+
+    def next_batch(self):
+        # type: () -> list
+        """Take the next batch of jobs off the queue.
+
+        Returns:
+            Between 1 and max_batch jobs
+        """
+        batch = [self.queue.get()]
+        deadline = time.time() + self.linger
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def run(self):
+        """Handle batches forever."""
+        while True:
+            batch = self.next_batch()
+            start = time.time()
+            try:
+                replies = self.engine([job.request for job in batch])
+            except Exception as e:
+                replies = [error(e) for _ in batch]
+            for job, reply in zip(batch, replies):
+                if isinstance(job.request, dict) and 'id' in job.request:
+                    reply['id'] = job.request['id']
+                job.reply = reply
+            # record the batch first so /stats includes it once answered
+            self.stats.add_batch([start - job.queued for job in batch],
+                                 time.time() - start,
+                                 sum('error' in r for r in replies))
+            for job in batch:
+                job.done.set()
+
+
+class Engine(object):
+    """Answers batches of 'rank' requests and batches of 'equity' requests."""
+
+    def __init__(self, budget=0.05, target=0.005, batch_budget=0.2):
+        # type: (float, float, float)
+        """Initiate an Engine.
+
+        Args:
+            budget: Seconds an equity request may take at most
+            target: Standard error at which an equity estimate is final
+            batch_budget: Seconds a batch of equity requests may take
+        """
+        self.evaluator = evaluator()
+        self.budget = budget
+        self.target = target
+        self.batch_budget = batch_budget
+        self.cards = {}
+
+    def __repr__(self):
+        # type: () -> str
+        """Return a text representation of this Engine.
+
+        Returns:
+            Text representation of this Engine
+        """
+        return "Engine(budget={}, target={}, batch_budget={})".format(
+            self.budget, self.target, self.batch_budget)
+
+    def rank(self, requests):
+        # type: (list) -> list
+        """Answer a batch of rank requests.
+
+        Args:
+            requests: Decoded requests
+
+        Returns:
+            A reply for every request, in the same order
+        """
+        replies = [None] * len(requests)
+        ranked = []
+        for i, request in enumerate(requests):
+            try:
+                cards = self.parse(request['cards'] +
+                                   request.get('board', []))
+                if not 5 <= len(cards) <= 7:
+                    raise ValueError("Ranks hands of 5 to 7 cards")
+                ranked.append((i, cards))
+            except (KeyError, TypeError, ValueError) as e:
+                replies[i] = error(e)
+
+        ranks = self.evaluator.evaluate_many([c for _, c in ranked])
+        for (i, _), rank in zip(ranked, ranks):
+            rank_class = self.evaluator.get_rank_class(rank)
+            replies[i] = {'rank': rank, 'class':
+                          self.evaluator.class_to_string(rank_class)}
+        return replies
+
+    def equity(self, requests):
+        # type: (list) -> list
+        """Answer a batch of equity requests, equal ones only once.
+
+        The distinct spots share batch_budget, each taking at most budget.
+
+        Args:
+            requests: Decoded requests
+
+        Returns:
+            A reply for every request, in the same order
+        """
+        replies = [None] * len(requests)
+        equities = {}
+        for i, request in enumerate(requests):
+            try:
+                hands = tuple(tuple(self.parse(h)) for h in request['hands'])
+                board = tuple(self.parse(request.get('board', [])))
+                dead = tuple(self.parse(request.get('dead', [])))
+                if len(hands) < 2 or any(len(h) != 2 for h in hands) \
+                        or len(board) > 5:
+                    raise ValueError("Needs two or more hands of two cards "
+                                     "and at most five on the board")
+                self.check(sum(hands, board + dead))
+                equities.setdefault((hands, board, dead), []).append(i)
+            except (KeyError, TypeError, ValueError) as e:
+                replies[i] = error(e)
+
+        budget = min(self.budget, self.batch_budget / (len(equities) or 1))
+        for (hands, board, dead), indices in equities.iteritems():
+            estimate = anytime_equity(hands, board, dead, budget=budget,
+                                      target=self.target)
+            for i in indices:
+                replies[i] = {'equities': estimate.equities,
+                              'errors': estimate.errors,
+                              'samples': estimate.samples,
+                              'exact': estimate.exact}
+        return replies
+
+    def parse(self, strings):
+        # type: (list) -> list
+        """Convert card strings like 'As' to deuces integers.
+
+        Args:
+            strings: Card strings
+
+        Returns:
+            The cards in deuces integer form
+        """
+        cards = []
+        for s in strings:
+            card = self.cards.get(s)
+            if card is None:
+                if len(s) != 2 or s[0] == 'X':
+                    raise ValueError("Invalid card {!r}".format(s))
+                card = self.cards[s] = DCard.new(str(s))
+            cards.append(card)
+        return self.check(cards)
+
+    @staticmethod
+    def check(cards):
+        # type: (iter) -> iter
+        """Make sure no card is used twice.
+
+        Args:
+            cards: Cards in deuces integer form
+
+        Returns:
+            The same cards
+        """
+        if len(set(cards)) != len(cards):
+            raise ValueError("Duplicate cards")
+        return cards
+
+
+class Handler(BaseHTTPRequestHandler):
+    """HTTP front-end of the Batchers of its server."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        """Answer the NDJSON requests in the body."""
+        if self.path != '/evaluate':
+            return self.send_error(404)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        requests = []
+        for line in body.splitlines():
+            if line.strip():
+                try:
+                    requests.append(json.loads(line))
+                except ValueError:
+                    requests.append({'op': None})
+        replies = self.server.answer(requests)
+        self.reply("".join(json.dumps(r) + "\n" for r in replies),
+                   'application/x-ndjson')
+
+    def do_GET(self):
+        """Report the BatchStats of every op."""
+        if self.path != '/stats':
+            return self.send_error(404)
+        self.reply(json.dumps(self.server.report()) + "\n",
+                   'application/json')
+
+    def reply(self, body, content_type):
+        # type: (str, str)
+        """Send a successful response.
+
+        Args:
+            body: Content of the response
+            content_type: Its MIME type
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Keep the console quiet, GET /stats tells more."""
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    """HTTP server with a thread per connection and a Batcher per op."""
+
+    daemon_threads = True
+
+    def __init__(self, address, batchers):
+        # type: (tuple, dict)
+        """Initiate a Server.
+
+        Args:
+            address: Host and port to listen on
+            batchers: Batcher answering the requests of every op by op
+        """
+        HTTPServer.__init__(self, address, Handler)
+        self.batchers = batchers
+
+    def answer(self, requests):
+        # type: (list) -> list
+        """Queue every request with the Batcher of its op and wait.
+
+        Args:
+            requests: Decoded requests
+
+        Returns:
+            A reply for every request, in the same order
+        """
+        jobs = []
+        for request in requests:
+            op = request.get('op') if isinstance(request, dict) else None
+            if isinstance(op, basestring) and op in self.batchers:
+                jobs.append(self.batchers[op].put(request))
+                continue
+            job = Job(request)
+            job.reply = error(ValueError("Unknown op {!r}".format(op)))
+            if isinstance(request, dict) and 'id' in request:
+                job.reply['id'] = request['id']
+            job.done.set()
+            jobs.append(job)
+        for job in jobs:
+            job.done.wait()
+        return [job.reply for job in jobs]
+
+    def report(self):
+        # type: () -> dict
+        """Summarise the BatchStats of every op.
+
+        Returns:
+            BatchStats.report() of every op by op
+        """
+        return {op: batcher.stats.report()
+                for op, batcher in self.batchers.iteritems()}
+
+
+def serve(host='127.0.0.1', port=8010, max_batch=64, linger=0.002,
+          budget=0.05, target=0.005, batch_budget=0.2):
+    # type: (str, int, int, float, float, float, float) -> Server
+    """Start the service in background threads.
+
+    Args:
+        host: Interface to listen on - the local one by default
+        port: Port to listen on, 0 to pick a free one
+        max_batch: Largest number of requests handled together
+        linger: Seconds to wait for a batch to fill up
+        budget: Seconds an equity request may take at most
+        target: Standard error at which an equity estimate is final
+        batch_budget: Seconds a batch of equity requests may take
+
+    Returns:
+        The running Server - call shutdown() to stop it
+    """
+    engine = Engine(budget, target, batch_budget)
+    batchers = {'rank': Batcher(engine.rank, max_batch, linger),
+                'equity': Batcher(engine.equity, max_batch, linger)}
+    for batcher in batchers.itervalues():
+        batcher.start()
+    server = Server((host, port), batchers)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('-p', '--port', type=int, default=8010)
+    parser.add_argument('-b', '--max-batch', type=int, default=64)
+    parser.add_argument('-l', '--linger', type=float, default=2.0,
+                        help="milliseconds to wait for a batch to fill up")
+    parser.add_argument('--budget', type=float, default=50.0,
+                        help="milliseconds an equity request may take")
+    parser.add_argument('--target', type=float, default=0.005,
+                        help="standard error of a final equity estimate")
+    parser.add_argument('--batch-budget', type=float, default=200.0,
+                        help="milliseconds a batch of equity requests may "
+                             "take")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.max_batch, args.linger / 1000,
+                   args.budget / 1000, args.target, args.batch_budget / 1000)
+    print "Listening on http://{}:{}".format(*server.server_address)
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        server.shutdown()
+    print json.dumps(server.report(), indent=2)
@@ -0,0 +1,191 @@
+"""Showdown engine - ordering of all hands, split pots and run-outs."""
+
+import random
+
+from deuces import Deck, Evaluator
+
+_shared = {}
+
+
+def shared(kind):
+    # type: (type) -> object
+    """Return the instance of a class shared by the whole application.
+
+    It is created on first use, e.g. the lookup tables of an Evaluator are
+    built only once, as building them is far more expensive than using
+    them. Every process has its own instances.
+
+    Args:
+        kind: Class to be instantiated without arguments
+
+    Returns:
+        The shared instance of kind
+    """
+    if kind not in _shared:
+        _shared[kind] = kind()
+    return _shared[kind]
+
+
+def evaluator(kind=Evaluator):
+    # type: (type) -> Evaluator
+    """Return the Evaluator shared by all games.
+
+    Args:
+        kind: Evaluator class, e.g. WildEvaluator for games with jokers
+
+    Returns:
+        The shared Evaluator of that kind
+    """
+    return shared(kind)
+
+
+def evaluate_all(hands, board=(), e=None):
+    # type: (dict, list, Evaluator) -> dict
+    """Evaluate the hands of all players in one call.
+
+    Args:
+        hands: Cards of every player in deuces integer form by player id
+        board: Community cards in deuces integer form
+        e: Evaluator to be used - the shared one by default
+
+    Returns:
+        Rank of the best hand of every player by player id, lower is better
+    """
+    pids = list(hands)
+    ranks = (e or evaluator()).evaluate_many(
+        [list(hands[pid]) for pid in pids], list(board))
+    return dict(zip(pids, ranks))
+
+
+def tie_groups(ranks):
+    # type: (dict) -> list
+    """Order players from the best hand to the worst.
+
+    Args:
+        ranks: Rank of every player by player id
+
+    Returns:
+        A (rank, player ids) tuple for every distinct rank, best first
+    """
+    groups = {}
+    for pid, rank in ranks.iteritems():
+        groups.setdefault(rank, []).append(pid)
+    return [(rank, sorted(groups[rank])) for rank in sorted(groups)]
+
+
+def side_pots(contributions, folded=()):
+    # type: (dict, iter) -> list
+    """Split the chips put in by the players into a main pot and side pots.
+
+    A player can win a pot if they did not fold and put in at least as much
+    as each player eligible for it. Chips nobody can win are added to the
+    previous pot.
+
+    Args:
+        contributions: Chips put in by every player by player id
+        folded: Ids of players who folded
+
+    Returns:
+        An (amount, eligible player ids) tuple for every pot, main pot first
+    """
+    folded = set(folded)
+    pots = []
+    previous = 0
+    for level in sorted(set(contributions.itervalues())):
+        amount = sum(min(c, level) - previous
+                     for c in contributions.itervalues() if c > previous)
+        eligible = sorted(pid for pid, c in contributions.iteritems()
+                          if c >= level and pid not in folded)
+        if eligible:
+            pots.append((amount, eligible))
+        elif pots:
+            pots[-1] = (pots[-1][0] + amount, pots[-1][1])
+        previous = level
+    return pots
+
+
+def award(pots, order, winnings=None):
+    # type: (list, list, dict) -> dict
+    """Give every pot to the best eligible players, splitting it on a tie.
+
+    Odd chips of a split pot go to the winners with the lowest ids.
+
+    Args:
+        pots: An (amount, eligible player ids) tuple for every pot
+        order: Tie groups of the players, best first
+        winnings: Chips won so far to add to - optional
+
+    Returns:
+        Chips won by player id
+    """
+    winnings = {} if winnings is None else winnings
+    for amount, eligible in pots:
+        eligible = set(eligible)
+        for rank, pids in order:
+            winners = [pid for pid in pids if pid in eligible]
+            if winners:
+                break
+        else:
+            continue
+
+        share, odd = divmod(amount, len(winners))
+        for i, pid in enumerate(winners):
+            winnings[pid] = winnings.get(pid, 0) + share + (i < odd)
+    return winnings
+
+
+def run_outs(hands, board=(), times=2, dead=(), board_size=5, rng=random,
+             e=None):
+    # type: (dict, list, int, list, int, random.Random, Evaluator) -> list
+    """Deal the rest of the board several times, e.g. to run it twice.
+
+    Every run-out uses different cards from the same stub.
+
+    Args:
+        hands: Cards of every player in deuces integer form by player id
+        board: Community cards dealt so far
+        times: Number of run-outs
+        dead: Other cards which can not be dealt
+        board_size: Number of community cards in the game
+        rng: Source of randomness
+        e: Evaluator to be used - the shared one by default
+
+    Returns:
+        A (board, tie groups) tuple for every run-out
+    """
+    missing = board_size - len(board)
+    known = set(board) | set(dead)
+    for cards in hands.itervalues():
+        known.update(cards)
+    stub = [c for c in Deck.GetFullDeck() if c not in known]
+    if missing * times > len(stub):
+        raise ValueError("Not enough cards for {} run-outs".format(times))
+
+    drawn = rng.sample(stub, missing * times)
+    runs = []
+    for i in xrange(times):
+        run_board = list(board) + drawn[i * missing:(i + 1) * missing]
+        runs.append((run_board,
+                     tie_groups(evaluate_all(hands, run_board, e))))
+    return runs
+
+
+def award_runs(pots, runs):
+    # type: (list, list) -> dict
+    """Split every pot evenly between run-outs and award each part.
+
+    Odd chips of a pot go to the earlier run-outs.
+
+    Args:
+        pots: An (amount, eligible player ids) tuple for every pot
+        runs: A (board, tie groups) tuple for every run-out
+
+    Returns:
+        Chips won by player id
+    """
+    winnings = {}
+    for i, (board, order) in enumerate(runs):
+        part = [(amount // len(runs) + (i < amount % len(runs)), eligible)
+                for amount, eligible in pots]
+        award(part, order, winnings)
+    return winnings
@@ -0,0 +1,56 @@
+"""Tests of the Five-card Draw discard advice."""
+
+import unittest
+
+from advisor import SwapAdvisor, canonical
+from deuces import Card
+
+
+def cards(text):
+    # type: (str) -> list
+    """Decode space separated card strings."""
+    return [Card.new(s) for s in text.split()]
+
+
+class SwapAdvisorTest(unittest.TestCase):
+    """Made hands are kept and draws go for the best expected rank."""
+
+    def setUp(self):
+        self.advisor = SwapAdvisor()
+
+    def test_flush_is_kept(self):
+        discard, score = self.advisor.advise(cards('As Ks 7s 4s 2s'))
+        self.assertEqual(discard, [])
+        self.assertEqual(score, 475)
+
+    def test_four_to_a_flush(self):
+        for text, card in [('As Ks 7s 4s 9d', '9d'),
+                           ('Ah Jh 8h 3h 2c', '2c')]:
+            discard, _ = self.advisor.advise(cards(text))
+            self.assertEqual(discard, cards(card))
+
+    def test_options(self):
+        options = self.advisor.options(cards('As Ks 7s 4s 9d'))
+        self.assertEqual(len(options), 32)
+        scores = [score for _, score in options]
+        self.assertEqual(scores, sorted(scores))
+
+    def test_suit_permutations(self):
+        hand = cards('Ah Jh 8h 3h 2c')
+        permuted = cards('Ad Jd 8d 3d 2s')
+        self.assertEqual(canonical(hand)[0], canonical(permuted)[0])
+
+        self.assertEqual(self.advisor.advise(hand)[0], cards('2c'))
+        self.assertEqual(len(self.advisor.cache), 1)
+        discard, score = self.advisor.advise(permuted)
+        self.assertEqual(len(self.advisor.cache), 1)
+        self.assertEqual(discard, cards('2s'))
+        self.assertEqual(score, self.advisor.advise(hand)[1])
+
+        # every option maps back onto the cards of the permuted hand
+        for discard, _ in self.advisor.options(permuted):
+            self.assertTrue(set(discard) <= set(permuted))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Tests of the card string codec of deuces.Card."""
+
+import unittest
+
+from deuces import Card, Deck
+
+
+class CodecTest(unittest.TestCase):
+    """Strings, integers and pretty strings convert into each other."""
+
+    def setUp(self):
+        self.cards = Deck.GetFullDeck() + Card.JOKERS
+        self.strings = [r + s for r in Card.STR_RANKS for s in 'shdc']
+        self.strings += ['Xb', 'Xc']
+
+    def test_tables(self):
+        self.assertEqual(len(Card.STR_TO_INT), 54)
+        self.assertEqual(sorted(Card.INT_TO_STR), sorted(self.cards))
+        for s in self.strings:
+            card = Card.new(s)
+            self.assertEqual(Card.STR_TO_INT[s], card)
+            self.assertEqual(Card.INT_TO_STR[card], s)
+            self.assertEqual(Card.int_to_str(card), s)
+            self.assertEqual(Card.INT_TO_PRETTY[card], Card._pretty(card))
+            self.assertEqual(Card.int_to_pretty_str(card),
+                             Card._pretty(card))
+
+    def test_round_trip(self):
+        compact = Card.encode(self.cards)
+        self.assertEqual(len(compact), 2 * 54)
+        self.assertEqual(Card.decode(compact), self.cards)
+        self.assertEqual(Card.hand_to_binary(self.strings),
+                         [Card.new(s) for s in self.strings])
+        self.assertEqual(Card.decode(" ".join(self.strings)),
+                         [Card.new(s) for s in self.strings])
+
+    def test_decode_array(self):
+        hands = ['AhKd7c', 'Xb2s 3s', '']
+        self.assertEqual(list(Card.decode_array(hands)),
+                         Card.decode('AhKd7cXb2s3s'))
+
+    def test_unknown_strings(self):
+        for compact in ['Zs', 'Ax', '1h', 'Xd', 'ah', 'AhK', 'As10']:
+            self.assertRaises(KeyError, Card.decode, compact)
+        self.assertRaises(KeyError, Card.decode_array, ['AhKd', 'Kz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
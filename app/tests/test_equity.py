@@ -0,0 +1,125 @@
+"""Tests of range and hand equities."""
+
+import random
+import time
+import unittest
+
+from deuces import Card, Deck
+from equity import SAMPLERS, RangeEquity, anytime_equity, runouts
+from showdown import evaluator
+
+
+def cards(text):
+    # type: (str) -> list
+    """Decode space separated card strings."""
+    return [Card.new(s) for s in text.split()]
+
+
+def combos(*texts):
+    # type: (str) -> dict
+    """Range of weight 1 for every two-card combination given."""
+    return {tuple(cards(text)): 1 for text in texts}
+
+
+class RangeEquityTest(unittest.TestCase):
+    """Sorted river ranks agree with comparing every pair of hands."""
+
+    def setUp(self):
+        self.board = cards('Ah Kd 7c 7s 2h')
+        self.hero = combos('As Ad', 'Qh Jh', '7h 6h', 'Kc Ks', 'Ah 3c')
+        self.villain = combos('As Kh', 'Kc Qc', '7d 8d', 'Qs Js', '3s 3d',
+                              'Ad Ac', 'Kh Ks', 'Jc Tc', '7h 5c', 'Qh Jh')
+        self.villain[tuple(cards('Kc Qc'))] = 3
+
+    def brute_force(self, combo, board):
+        # type: (tuple, list) -> tuple
+        """Weight won and faced by combo, evaluating every matchup."""
+        e = evaluator()
+        rank = e.evaluate(list(combo), board)
+        won = total = 0.0
+        for other, weight in self.villain.iteritems():
+            if set(other) & (set(combo) | set(board)):
+                continue
+            other_rank = e.evaluate(list(other), board)
+            won += weight * (1.0 if rank < other_rank else
+                             0.5 if rank == other_rank else 0.0)
+            total += weight
+        return won, total
+
+    def test_river(self):
+        results = RangeEquity().river(self.hero, self.villain, self.board)
+        self.assertEqual(sorted(results),
+                         sorted(c for c in self.hero
+                                if not set(c) & set(self.board)))
+        for combo, result in results.iteritems():
+            self.assertEqual(result, self.brute_force(combo, self.board))
+
+    def test_turn(self):
+        turn = self.board[:4]
+        results = RangeEquity().combos(self.hero, self.villain, turn)
+        for combo, result in results.iteritems():
+            won = total = 0.0
+            for river in Deck.GetFullDeck():
+                if river not in turn and river not in combo:
+                    w, t = self.brute_force(combo, turn + [river])
+                    won, total = won + w, total + t
+            self.assertEqual(result, (won, total))
+
+
+class AnytimeEquityTest(unittest.TestCase):
+    """Estimates get more precise until the target or the budget is met."""
+
+    hands = [cards('As Kd'), cards('Qc Qh')]
+
+    def test_budget(self):
+        partial = []
+        start = time.time()
+        estimate = anytime_equity(self.hands, budget=0.2, target=0.0,
+                                  callback=partial.append,
+                                  rng=random.Random(1))
+        self.assertLess(time.time() - start, 0.3)
+        self.assertFalse(estimate.exact)
+        self.assertIs(partial[-1], estimate)
+        self.assertGreater(len(partial), 2)
+        samples = [e.samples for e in partial]
+        self.assertEqual(samples, sorted(set(samples)))
+        self.assertLess(max(estimate.errors), max(partial[0].errors))
+
+    def test_target(self):
+        estimate = anytime_equity(self.hands, budget=10.0, target=0.01,
+                                  rng=random.Random(2))
+        self.assertLessEqual(max(estimate.errors), 0.01)
+        self.assertAlmostEqual(sum(estimate.equities), 1.0)
+
+    def test_exact(self):
+        board = cards('2c 7d 9h Ts')
+        estimate = anytime_equity(self.hands, board, budget=0.0)
+        self.assertTrue(estimate.exact)
+        self.assertEqual(estimate.samples, 44)
+        self.assertEqual(estimate.errors, [0.0, 0.0])
+
+
+class SamplerTest(unittest.TestCase):
+    """Every sampler lands within its reported error of the exact equity."""
+
+    hands = [cards('Ah Kc'), cards('Qs Qd'), cards('9h 8h')]
+    board = cards('Jh Th 4c 2s')
+
+    def test_within_error(self):
+        exact = next(runouts(self.hands, self.board))
+        self.assertTrue(exact.exact)
+        for mode in sorted(SAMPLERS):
+            estimates = runouts(self.hands, self.board, exact_limit=0,
+                                batch=512, mode=mode, rng=random.Random(3))
+            for _ in range(4):
+                estimate = next(estimates)
+            self.assertFalse(estimate.exact)
+            for equity, error, expected in zip(estimate.equities,
+                                               estimate.errors,
+                                               exact.equities):
+                self.assertGreater(error, 0.0, mode)
+                self.assertLessEqual(abs(equity - expected), 4 * error, mode)
+
+
+if __name__ == '__main__':
+    unittest.main()
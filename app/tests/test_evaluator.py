@@ -0,0 +1,113 @@
+"""Tests of the hand evaluator and its compiled core."""
+
+import random
+import unittest
+
+from deuces import Card, Deck, Evaluator
+from deuces.lookup import LookupTable
+from deuces.speedups import _cdeuces
+
+
+def cards(text):
+    # type: (str) -> list
+    """Parse space separated card strings, e.g. 'As Kd'."""
+    return [Card.new(s) for s in text.split()]
+
+
+class InvalidHandsTest(unittest.TestCase):
+    """Hands no deck can deal must raise instead of getting a rank."""
+
+    HANDS = [
+        # a joker has no rank of its own
+        cards('Xb As Kd Qh 2c'),
+        # five aces, unsuited
+        cards('As As Ad Ah Ac'),
+        # a flush of four ranks
+        cards('As As Ks Qs Js'),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.evaluator = Evaluator()
+
+    def test_pure(self):
+        e = self.evaluator
+        for hand in self.HANDS:
+            self.assertRaises(KeyError, e._five, hand)
+            self.assertRaises(KeyError, e._six, hand + cards('3c'))
+            self.assertRaises(KeyError, e._seven, hand + cards('3c 4c'))
+
+    @unittest.skipIf(_cdeuces is None, "compiled core not available")
+    def test_compiled(self):
+        table = self.evaluator.table
+        core = _cdeuces.CEvaluator(table.flush_lookup, table.unsuited_lookup)
+        for hand in self.HANDS:
+            self.assertRaises(KeyError, core.five, hand)
+            self.assertRaises(KeyError, core.six, hand + cards('3c'))
+            self.assertRaises(KeyError, core.seven, hand + cards('3c 4c'))
+
+    def test_evaluate(self):
+        e = self.evaluator
+        for hand in self.HANDS:
+            self.assertRaises(KeyError, e.evaluate, hand[:2], hand[2:])
+
+
+class EvaluateManyTest(unittest.TestCase):
+    """evaluate_many() ranks like evaluate() hand by hand."""
+
+    def test_same_ranks(self):
+        e = Evaluator()
+        rng = random.Random(1)
+        deck = Deck.GetFullDeck()
+        board = rng.sample(deck, 3)
+        rest = [c for c in deck if c not in board]
+        for n in (2, 3, 4):
+            hands = [rng.sample(rest, n) for _ in range(200)]
+            expected = [e.evaluate(hand, board) for hand in hands]
+            self.assertEqual(e.evaluate_many(hands, board), expected)
+            self.assertEqual(e.evaluate_many([h + board for h in hands]),
+                             expected)
+        self.assertEqual(e.evaluate_many([]), [])
+
+
+class RankClassTest(unittest.TestCase):
+    """Every rank belongs to the class whose bounds include it."""
+
+    def test_bounds(self):
+        e = Evaluator()
+        previous = 0
+        for max_rank, rank_class in sorted(
+                LookupTable.MAX_TO_RANK_CLASS.items()):
+            self.assertEqual(e.get_rank_class(previous + 1), rank_class)
+            self.assertEqual(e.get_rank_class(max_rank), rank_class)
+            previous = max_rank
+        self.assertRaises(Exception, e.get_rank_class,
+                          LookupTable.MAX_HIGH_CARD + 1)
+
+    def test_five_high_straight_flush(self):
+        e = Evaluator()
+        rank = e.evaluate(cards('5h 4h'), cards('3h 2h Ah'))
+        self.assertEqual(rank, 10)
+        self.assertEqual(e.class_to_string(e.get_rank_class(rank)),
+                         "Straight Flush")
+
+    def test_distribution(self):
+        e = Evaluator()
+        distribution = e.hand_distribution(cards('Ah Kh'),
+                                           cards('Qh Jh 2c 3d'))
+        self.assertEqual(distribution['total'], 46)
+        # the Th makes a royal flush, another 8 hearts a flush and 3 tens
+        # a straight
+        self.assertAlmostEqual(distribution['classes']['Straight Flush'],
+                               1.0 / 46)
+        self.assertAlmostEqual(distribution['classes']['Flush'], 8.0 / 46)
+        self.assertAlmostEqual(distribution['classes']['Straight'],
+                               3.0 / 46)
+        # 10% of 46 is the 5th best: AKQJ6 of hearts, 4 flushes below the
+        # best one
+        self.assertEqual(distribution['percentiles'][10],
+                         LookupTable.MAX_FULL_HOUSE + 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
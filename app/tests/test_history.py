@@ -0,0 +1,87 @@
+"""Tests of the hand history log."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from deuces import Card
+from history import HandHistory, HistoryReader
+
+
+class HistoryTest(unittest.TestCase):
+    """Hands read back as they were written."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'hands.log')
+        self.cards = [Card.new(s) for s in
+                      'As Kd Qh Jc Ts 9s 8d 7h Xb'.split()]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self):
+        # type: () -> None
+        """Log two finished hands with an interrupted one between them."""
+        c = self.cards
+        history = HandHistory(self.path)
+        history.start_hand(11)
+        history.deal(1, c[:5])
+        history.swap(1, c[:3], c[5:7])
+        history.showdown(1, c[3:7], True)
+        history.end_hand()
+        history.start_hand(12)
+        history.deal(1, c[:5])
+        history.start_hand(13)
+        history.deal(2, c[4:9])
+        history.swap(2, c[4:5], [])
+        history.end_hand()
+        history.close()
+
+    def test_round_trip(self):
+        self.write()
+        reader = HistoryReader(self.path)
+        hands = list(reader)
+        self.assertEqual([h.number for h in hands], [0, 1])
+        self.assertEqual([h.seed for h in hands], [11, 13])
+        c = self.cards
+        self.assertEqual(hands[0].swaps, {1: (c[:3], c[5:7])})
+        self.assertEqual(hands[0].showdown, {1: (c[3:7], True)})
+        self.assertEqual(hands[1].deals, {2: c[4:9]})
+        self.assertEqual(hands[1].swaps, {2: (c[4:5], [])})
+        reader.close()
+
+    def test_only_finished_hands_are_indexed(self):
+        self.write()
+        reader = HistoryReader(self.path)
+        self.assertEqual(len(reader), 2)
+        self.assertEqual(reader[-1].seed, 13)
+        self.assertRaises(IndexError, reader.__getitem__, 2)
+        reader.close()
+
+        os.remove(self.path + '.idx')
+        reader = HistoryReader(self.path)
+        self.assertEqual([h.seed for h in reader], [11, 13])
+        reader.close()
+
+    def test_append(self):
+        self.write()
+        history = HandHistory(self.path)
+        self.assertEqual(history.hands, 2)
+        history.start_hand(14)
+        history.end_hand()
+        history.close()
+        reader = HistoryReader(self.path)
+        self.assertEqual((reader[2].number, reader[2].seed), (2, 14))
+        reader.close()
+
+    def test_unreadable_log_raises(self):
+        with open(self.path, 'wb') as log:
+            log.write(b'CHH\x01\x00\x00')
+        self.assertRaises(ValueError, HandHistory, self.path)
+        self.assertRaises(ValueError, HistoryReader, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Tests of the colex and suit isomorphic indices of sets of cards."""
+
+import itertools
+import random
+import unittest
+
+from deuces import Card, Deck
+from deuces import indexing
+
+
+class ColexIndexTest(unittest.TestCase):
+    """Every set of k cards has its own index in [0, C(52, k))."""
+
+    def test_two_cards(self):
+        indices = set(indexing.colex_index(hand) for hand in
+                      itertools.combinations(Deck.GetFullDeck(), 2))
+        self.assertEqual(indices, set(range(indexing.colex_size(2))))
+
+    def test_round_trip(self):
+        rng = random.Random(1)
+        for k in range(1, indexing.MAX_CARDS + 1):
+            for _ in range(200):
+                index = rng.randrange(indexing.colex_size(k))
+                cards = indexing.colex_cards(index, k)
+                self.assertEqual(len(set(cards)), k)
+                self.assertEqual(indexing.colex_index(cards), index)
+
+    @unittest.skipIf(indexing.np is None, "NumPy not installed")
+    def test_numpy_matches_pure(self):
+        rng = random.Random(2)
+        deck = Deck.GetFullDeck()
+        for k in (2, 5, 7):
+            hands = [rng.sample(deck, k) for _ in range(500)]
+            indices = indexing.colex_index_many(hands)
+            self.assertEqual(list(indices),
+                             [indexing.colex_index(h) for h in hands])
+            self.assertEqual(indexing.colex_cards_many(indices, k).tolist(),
+                             [indexing.colex_cards(i, k) for i in indices])
+
+    def test_jokers_are_rejected(self):
+        hand = [Card.new('As'), Card.JOKERS[0]]
+        self.assertRaises(ValueError, indexing.card_number, Card.JOKERS[1])
+        self.assertRaises(ValueError, indexing.colex_index, hand)
+        self.assertRaises(ValueError, indexing.colex_index_many, [hand])
+        self.assertRaises(ValueError, indexing.iso_index, hand)
+
+
+class IsoIndexTest(unittest.TestCase):
+    """Sets of cards equal up to a permutation of suits share an index."""
+
+    def test_sizes(self):
+        sizes = [indexing.iso_size(k) for k in range(1, 8)]
+        self.assertEqual(sizes, [13, 169, 1755, 16432, 134459, 962988,
+                                 6009159])
+
+    def test_classes(self):
+        deck = Deck.GetFullDeck()
+        for k in (2, 3):
+            indices = set(indexing.iso_index(hand) for hand in
+                          itertools.combinations(deck, k))
+            self.assertEqual(indices, set(range(indexing.iso_size(k))))
+
+    def test_round_trip(self):
+        rng = random.Random(3)
+        for k in range(1, indexing.MAX_CARDS + 1):
+            size = indexing.iso_size(k)
+            for index in [0, size - 1] + rng.sample(range(size),
+                                                     min(size, 200)):
+                cards = indexing.iso_cards(index, k)
+                self.assertEqual(len(set(cards)), k)
+                self.assertEqual(indexing.iso_index(cards), index)
+
+    def test_suit_permutations(self):
+        rng = random.Random(4)
+        deck = Deck.GetFullDeck()
+        for k in (2, 5, 7):
+            for _ in range(50):
+                hand = rng.sample(deck, k)
+                index = indexing.iso_index(hand)
+                for suits in itertools.permutations('shdc'):
+                    relabel = dict(zip('shdc', suits))
+                    permuted = [Card.new(s[0] + relabel[s[1]]) for s in
+                                (Card.int_to_str(c) for c in hand)]
+                    self.assertEqual(indexing.iso_index(permuted), index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+"""Tests of the load generator, driven by a scripted fake socket."""
+
+import json
+import socket
+import sys
+import threading
+import types
+import unittest
+
+try:
+    import websocket
+except ImportError:
+    # only the names loadtest uses, create_connection is replaced per test
+    websocket = types.ModuleType('websocket')
+    websocket.WebSocketException = type('WebSocketException', (Exception,),
+                                        {})
+    websocket.WebSocketTimeoutException = type(
+        'WebSocketTimeoutException', (websocket.WebSocketException,), {})
+    websocket.socket = socket
+    websocket.create_connection = None
+    sys.modules['websocket'] = websocket
+
+import loadtest
+from loadtest import LoadClient, Stats
+
+HAND = [{'suit': 'spades', 'face': 'A'}, {'suit': 'hearts', 'face': '7'}]
+
+
+class FakeSocket(object):
+    """Plays a server: sends scripted messages and answers actions.
+
+    Once the script runs out the client is asked to stop.
+    """
+
+    def __init__(self, stop, script, answers):
+        # type: (threading.Event, list, dict)
+        """Initiate a FakeSocket.
+
+        Args:
+            stop: Stop event of the client
+            script: Messages received first
+            answers: Lists of messages to answer every action with, used
+                one list per action sent
+        """
+        self.stop = stop
+        self.incoming = list(script)
+        self.answers = answers
+        self.sent = []
+        self.closed = False
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self):
+        if self.incoming:
+            return json.dumps(self.incoming.pop(0))
+        self.stop.set()
+        raise websocket.WebSocketTimeoutException()
+
+    def send(self, data):
+        msg = json.loads(data)
+        self.sent.append(msg)
+        answers = self.answers.get(msg['action'])
+        if answers:
+            self.incoming.extend(answers.pop(0))
+
+    def close(self):
+        self.closed = True
+
+
+class LoadClientTest(unittest.TestCase):
+    """Actions are answered and timed as the front-end Game would be."""
+
+    def setUp(self):
+        self.stats = Stats()
+        self.stop = threading.Event()
+        self.create_connection = loadtest.create_connection
+
+    def tearDown(self):
+        loadtest.create_connection = self.create_connection
+
+    def play(self, script, answers, deals=True):
+        # type: (list, dict, bool) -> FakeSocket
+        """Run a client against a FakeSocket until the script runs out."""
+        ws = FakeSocket(self.stop, script, answers)
+        loadtest.create_connection = lambda url: ws
+        client = LoadClient('localhost:0', self.stats, self.stop, deals)
+        client.run()
+        return ws
+
+    def test_replies(self):
+        swap, deal = LoadClient.REPLIES['swap'], LoadClient.REPLIES['deal']
+        self.assertTrue(swap({'hand': HAND, 'swapped': True}))
+        self.assertTrue(swap({'hs': {}}))
+        self.assertFalse(swap({'hand': HAND}))
+        self.assertFalse(swap({'turn': 2}))
+        self.assertTrue(deal({'hand': HAND}))
+        self.assertFalse(deal({'hand': HAND, 'swapped': True}))
+        self.assertFalse(deal({'hs': {}}))
+
+    def test_hand(self):
+        ws = self.play(
+            [{'_new_id_': 3}, {'hand': HAND}],
+            {'swap': [[{'turn': 1}, {'hand': HAND, 'swapped': True},
+                       {'hs': {}}]],
+             'deal': [[{'hand': HAND, 'swapped': True}, {'hand': HAND}]]})
+        self.assertEqual([m['action'] for m in ws.sent],
+                         ['swap', 'deal', 'swap'])
+        self.assertEqual(set(m['senderId'] for m in ws.sent), set([3]))
+        self.assertTrue(ws.closed)
+        # the swap and the deal were answered, the last swap was not; the
+        # swapped hand of another player did not answer the deal
+        self.assertEqual(len(self.stats.latencies), 2)
+        self.assertTrue(all(t >= 0 for t in self.stats.latencies))
+        self.assertEqual((self.stats.sent, self.stats.received), (3, 7))
+        self.assertEqual((self.stats.hands, self.stats.errors), (1, 0))
+
+    def test_no_deals(self):
+        ws = self.play([{'_new_id_': 2}, {'hs': {}}], {}, deals=False)
+        self.assertEqual(ws.sent, [])
+        self.assertEqual(self.stats.hands, 0)
+
+    def test_connection_error(self):
+        def refuse(url):
+            raise socket.error("refused")
+        loadtest.create_connection = refuse
+        LoadClient('localhost:0', self.stats, self.stop).run()
+        self.assertEqual(self.stats.errors, 1)
+        self.assertEqual(self.stats.connect_times, [])
+
+
+class StatsTest(unittest.TestCase):
+    """Measurements are summarised into percentiles."""
+
+    def test_percentiles(self):
+        values = range(1, 101)
+        self.assertEqual(Stats.percentiles(values),
+                         [(50, 51), (90, 91), (99, 100), (100, 100)])
+        self.assertTrue(all(v != v for _, v in Stats.percentiles([])))
+
+    def test_report(self):
+        stats = Stats()
+        stats.add('connect_times', 0.002)
+        stats.add('latencies', 0.004)
+        stats.add('received', 3)
+        stats.end = stats.start + 2
+        report = stats.report()
+        self.assertIn("1 clients connected, 0 errors", report)
+        self.assertIn("1.5 messages/s received", report)
+        self.assertIn("round trip ms: p50=4.00", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
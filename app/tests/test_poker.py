@@ -0,0 +1,142 @@
+"""Tests of the phases and turn timers of Poker."""
+
+import unittest
+
+from bots import VirtualTimers
+from poker import Poker
+
+
+class FakeApp(object):
+    """Stands in for CardsApp, recording the messages sent to players."""
+
+    def __init__(self, players=3):
+        # type: (int)
+        """Seat players with ids 1 to players."""
+        self.connections = dict.fromkeys(range(players + 1))
+        self.sent = []
+
+    def send(self, msg, destination_id=0):
+        # type: (dict, int)
+        """Record a message to a player."""
+        self.sent.append((destination_id, msg))
+
+    def send_all(self, msg):
+        # type: (dict)
+        """Record a message to everyone."""
+        self.sent.append((None, msg))
+
+
+class FakeHistory(object):
+    """Counts the records written to a hand history log."""
+
+    def __init__(self):
+        self.records = 0
+        self.closed = False
+
+    def __getattr__(self, name):
+        if name not in ('start_hand', 'deal', 'swap', 'showdown',
+                        'end_hand'):
+            raise AttributeError(name)
+
+        def record(*args):
+            if self.closed:
+                raise ValueError("I/O operation on closed file")
+            self.records += 1
+        return record
+
+
+def swap(pid, poker, n=0):
+    # type: (int, Poker, int) -> dict
+    """Message of a player swapping their first n cards."""
+    return {'action': 'swap', 'senderId': pid,
+            'hand': [{'suit': c.suit, 'face': c.face, 'selected': i < n}
+                     for i, c in enumerate(poker.players[pid].hand)]}
+
+
+class PokerTest(unittest.TestCase):
+    """A hand moves from dealing to swapping to showdown and no further."""
+
+    def setUp(self):
+        self.app = FakeApp()
+        self.timers = VirtualTimers()
+        self.history = FakeHistory()
+        self.poker = Poker(self.app, self.history, self.timers)
+        self.poker.run()
+
+    def showdowns(self):
+        # type: () -> list
+        """Results sent to everyone so far."""
+        return [msg for pid, msg in self.app.sent if 'hs' in msg]
+
+    def test_swaps_end_the_phase(self):
+        poker = self.poker
+        self.assertEqual(poker.phase, Poker.SWAPPING)
+        for pid in (1, 2, 3):
+            poker.received(swap(pid, poker, 2))
+        self.assertEqual(poker.phase, Poker.SHOWDOWN)
+        self.assertEqual(len(self.showdowns()), 1)
+
+    def test_swap_timeout(self):
+        poker = self.poker
+        hands = dict((pid, list(p.hand)) for pid, p in poker.players.items())
+        poker.received(swap(1, poker, 3))
+        self.assertTrue(self.timers.advance())
+        self.assertEqual(self.timers.now, Poker.SWAP_TIME)
+        self.assertEqual(poker.phase, Poker.SHOWDOWN)
+        self.assertEqual(len(self.showdowns()), 1)
+        # the idle players stood pat
+        for pid in (2, 3):
+            self.assertEqual(poker.players[pid].hand, hands[pid])
+        self.assertNotEqual(poker.players[1].hand, hands[1])
+        self.assertFalse(self.timers.advance())
+
+    def test_repeated_and_late_messages(self):
+        poker = self.poker
+        poker.received(swap(1, poker, 1))
+        poker.received(swap(1, poker, 1))
+        self.assertEqual(poker.pending, 2)
+        # a deal before the showdown is ignored
+        poker.received({'action': 'deal', 'senderId': 1})
+        self.assertEqual(poker.phase, Poker.SWAPPING)
+        poker.received(swap(2, poker))
+        poker.received(swap(3, poker))
+        self.assertEqual(len(self.showdowns()), 1)
+
+        # a timeout of the hand before does nothing
+        hand_number = poker.hand_number
+        poker.received({'action': 'deal', 'senderId': 1})
+        poker.received({'action': 'deal', 'senderId': 2})
+        self.assertEqual(poker.hand_number, hand_number + 1)
+        poker.swap_timeout(hand_number)
+        self.assertEqual(poker.phase, Poker.SWAPPING)
+        self.assertEqual(poker.pending, 3)
+
+    def test_deal_timeout(self):
+        self.poker.DEAL_TIME = 5.0
+        poker = self.poker
+        for pid in (1, 2, 3):
+            poker.received(swap(pid, poker))
+        hand_number = poker.hand_number
+        self.assertTrue(self.timers.advance())
+        self.assertEqual(self.timers.now, 5.0)
+        self.assertEqual(poker.phase, Poker.SWAPPING)
+        self.assertEqual(poker.hand_number, hand_number + 1)
+
+    def test_stop(self):
+        poker = self.poker
+        hand_number = poker.hand_number
+        poker.stop()
+        self.history.closed = True
+        sent = len(self.app.sent)
+        self.assertFalse(self.timers.advance())
+        # callbacks of timers which had already fired do nothing either
+        poker.swap_timeout(hand_number)
+        poker.deal_timeout(hand_number)
+        poker.received(swap(1, poker, 2))
+        poker.received({'action': 'deal', 'senderId': 1})
+        self.assertEqual(poker.phase, Poker.STOPPED)
+        self.assertEqual(len(self.app.sent), sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
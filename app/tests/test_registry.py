@@ -0,0 +1,81 @@
+"""Tests of the routing table of connected clients."""
+
+import unittest
+
+from registry import ConnectionRegistry
+
+
+def send(msg, conn):
+    # type: (str, object)
+    """Send function of the connections of these tests."""
+    pass
+
+
+class ConnectionRegistryTest(unittest.TestCase):
+    """Ids are assigned, looked up and released in constant time."""
+
+    def setUp(self):
+        self.registry = ConnectionRegistry()
+        self.server = self.registry.add(send)
+        self.conns = [object() for _ in range(4)]
+        self.ids = [self.registry.add(send, conn) for conn in self.conns]
+
+    def test_ids(self):
+        self.assertEqual(self.server, 0)
+        self.assertEqual(self.ids, [1, 2, 3, 4])
+        self.assertEqual(len(self.registry), 5)
+        self.assertEqual(sorted(self.registry), [0, 1, 2, 3, 4])
+        for conn, client_id in zip(self.conns, self.ids):
+            self.assertEqual(self.registry.id_of(conn), client_id)
+            self.assertIs(self.registry[client_id]['connection'], conn)
+
+    def test_lowest_free_id_first(self):
+        self.assertEqual(self.registry.remove(self.conns[2]), 3)
+        self.assertEqual(self.registry.remove(self.conns[0]), 1)
+        self.assertNotIn(1, self.registry)
+        self.assertIsNone(self.registry.id_of(self.conns[0]))
+        self.assertEqual(self.registry.add(send, object()), 1)
+        self.assertEqual(self.registry.add(send, object()), 3)
+        self.assertEqual(self.registry.add(send, object()), 5)
+
+    def test_remove_unknown(self):
+        self.assertIsNone(self.registry.remove(object()))
+        self.registry.remove(self.conns[1])
+        self.assertIsNone(self.registry.remove(self.conns[1]))
+        self.assertEqual(len(self.registry), 4)
+        self.assertEqual(self.registry.add(send, object()), 2)
+
+    def test_detach_and_move(self):
+        lost, new = self.conns[0], self.conns[3]
+        self.assertEqual(self.registry.detach(lost), 1)
+        self.assertTrue(self.registry.detached(1))
+        self.assertIsNone(self.registry.id_of(lost))
+        self.assertEqual(self.registry.add(send, object()), 5)
+
+        self.registry.move(new, 1)
+        self.assertFalse(self.registry.detached(1))
+        self.assertEqual(self.registry.id_of(new), 1)
+        self.assertNotIn(4, self.registry)
+        self.assertEqual(self.registry.add(send, object()), 4)
+
+        self.registry.detach(new)
+        self.registry.release(1)
+        self.assertNotIn(1, self.registry)
+        self.registry.release(2)  # not detached, kept
+        self.assertIn(2, self.registry)
+
+    def test_stats(self):
+        client_id = self.ids[0]
+        self.registry.sent(client_id, 10)
+        self.registry.sent(client_id, 5)
+        self.registry.received(client_id, 7)
+        self.registry.sent(99, 1)  # unknown ids are ignored
+        stats = self.registry[client_id]['stats']
+        self.assertEqual((stats.sent, stats.sent_bytes), (2, 15))
+        self.assertEqual((stats.received, stats.received_bytes), (1, 7))
+        other = self.registry[self.ids[1]]['stats']
+        self.assertEqual((other.sent, other.received), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
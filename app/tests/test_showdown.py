@@ -0,0 +1,78 @@
+"""Tests of the showdown engine: ordering, side pots and run-outs."""
+
+import random
+import unittest
+
+from deuces import Card
+from showdown import (award, award_runs, evaluate_all, run_outs, side_pots,
+                      tie_groups)
+
+
+def cards(text):
+    # type: (str) -> list
+    """Decode space separated card strings."""
+    return [Card.new(s) for s in text.split()]
+
+
+class SidePotTest(unittest.TestCase):
+    """Chips are split into pots each player can win."""
+
+    def test_all_ins(self):
+        # 1 is all in for 50, 2 for 120, 3 and 4 call 200 and 4 folds
+        pots = side_pots({1: 50, 2: 120, 3: 200, 4: 200}, folded=[4])
+        self.assertEqual(pots, [(200, [1, 2, 3]), (210, [2, 3]), (160, [3])])
+        self.assertEqual(sum(amount for amount, _ in pots), 570)
+
+    def test_dead_chips(self):
+        # only the folded player put in the most, their excess stays
+        pots = side_pots({1: 10, 2: 30}, folded=[2])
+        self.assertEqual(pots, [(40, [1])])
+
+    def test_award_side_pots(self):
+        pots = side_pots({1: 50, 2: 120, 3: 200})
+        # the short stack has the best hand, then player 3
+        order = tie_groups({1: 10, 2: 300, 3: 200})
+        self.assertEqual(award(pots, order), {1: 150, 3: 220})
+
+    def test_odd_chip(self):
+        pots = [(101, [1, 2, 3]), (11, [2, 3])]
+        order = tie_groups({1: 5, 2: 5, 3: 5})
+        self.assertEqual(award(pots, order), {1: 34, 2: 40, 3: 38})
+        order = tie_groups({1: 9, 2: 5, 3: 5})
+        self.assertEqual(award(pots, order), {2: 57, 3: 55})
+
+
+class ShowdownTest(unittest.TestCase):
+    """Hands are ordered best first, equal hands together."""
+
+    def test_tie_groups(self):
+        board = cards('As Ks Qd 7c 2h')
+        hands = {1: cards('Ah Kh'), 2: cards('Ad Kd'), 3: cards('7s 7d'),
+                 4: cards('3c 4c')}
+        order = tie_groups(evaluate_all(hands, board))
+        self.assertEqual([pids for _, pids in order], [[3], [1, 2], [4]])
+
+    def test_run_outs(self):
+        hands = {1: cards('As Ah'), 2: cards('Kc Kd')}
+        board = cards('2c 7d 9h')
+        runs = run_outs(hands, board, times=3, rng=random.Random(1))
+        self.assertEqual(len(runs), 3)
+        dealt = [c for run_board, _ in runs for c in run_board[3:]]
+        self.assertEqual(len(set(dealt)), 6)
+        for run_board, order in runs:
+            self.assertEqual(run_board[:3], board)
+            self.assertEqual(order, tie_groups(evaluate_all(hands,
+                                                            run_board)))
+        self.assertRaises(ValueError, run_outs, hands, board, times=30)
+
+    def test_award_runs(self):
+        pots = [(101, [1, 2]), (7, [2])]
+        runs = [(None, [(1, [1]), (2, [2])]),
+                (None, [(1, [2]), (2, [1])]),
+                (None, [(1, [1, 2])])]
+        # 101 splits 34/34/33 between the runs, 7 as 3/2/2
+        self.assertEqual(award_runs(pots, runs), {1: 34 + 17, 2: 34 + 16 + 7})
+
+
+if __name__ == '__main__':
+    unittest.main()
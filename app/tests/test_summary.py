@@ -0,0 +1,80 @@
+"""Tests of the street by street summary of a hand."""
+
+import random
+import sys
+import unittest
+from StringIO import StringIO
+
+from deuces import Card, Deck, Evaluator, WildEvaluator
+from deuces.variants import OmahaEvaluator
+
+
+def cards(text):
+    # type: (str) -> list
+    """Parse space separated card strings, e.g. 'As Kd'."""
+    return [Card.new(s) for s in text.split()]
+
+
+class SummarizeTest(unittest.TestCase):
+    """summarize() ranks every street like evaluate()."""
+
+    def check(self, e, hand_size, hands=4, deals=50, extra=()):
+        # type: (Evaluator, int, int, int, list)
+        """Compare summarize() to evaluate() on random deals."""
+        rng = random.Random(7)
+        for _ in range(deals):
+            deck = Deck.GetFullDeck() + list(extra)
+            dealt = rng.sample(deck, hands * hand_size + 5)
+            board = dealt[:5]
+            players = [dealt[5 + i * hand_size:5 + (i + 1) * hand_size]
+                       for i in range(hands)]
+            streets = list(e.summarize(board, players))
+            self.assertEqual([s['street'] for s in streets],
+                             ["FLOP", "TURN", "RIVER"])
+            for n, street in zip((3, 4, 5), streets):
+                ranks = [e.evaluate(list(p), board[:n]) for p in players]
+                self.assertEqual([p['rank'] for p in street['players']],
+                                 ranks)
+                self.assertEqual(street['leaders'],
+                                 [i for i, r in enumerate(ranks)
+                                  if r == min(ranks)])
+                self.assertEqual(street['final'], n == 5)
+
+    def test_standard(self):
+        self.check(Evaluator(), 2)
+
+    def test_jokers(self):
+        self.check(WildEvaluator(), 2, extra=Card.JOKERS)
+
+    def test_omaha(self):
+        self.check(OmahaEvaluator(), 4)
+
+    def test_invalid_board(self):
+        e = Evaluator()
+        # raised by the call itself, before iterating
+        self.assertRaises(ValueError, e.summarize, cards('As Kd'), [])
+        self.assertRaises(ValueError, e.summarize,
+                          cards('As Kd Qh Jc Ts 9s'), [])
+
+
+class HandSummaryTest(unittest.TestCase):
+    """hand_summary() numbers players from 1, tied ones too."""
+
+    def test_tie(self):
+        output = StringIO()
+        stdout, sys.stdout = sys.stdout, output
+        try:
+            Evaluator().hand_summary(cards('2c 7d 9h Jc Qs'),
+                                     [cards('As Kd'), cards('Ac Kh'),
+                                      cards('3s 4s')])
+        finally:
+            sys.stdout = stdout
+        text = output.getvalue()
+        self.assertIn("Players [1, 2] are tied for the lead.", text)
+        self.assertIn("Players [1, 2] tied for the win with a High Card",
+                      text)
+        self.assertIn("Player 3 hand = High Card", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests of the board texture analyzer against brute force."""
+
+import itertools
+import random
+import unittest
+
+from deuces import Card, Deck
+from deuces.lookup import LookupTable
+from deuces.texture import STRAIGHT_FLUSH_DRAW, TextureAnalyzer
+
+STRAIGHTS = [set(range(high - 4, high + 1)) for high in range(4, 13)]
+STRAIGHTS.append({12, 0, 1, 2, 3})
+
+
+def cards(text):
+    # type: (str) -> list
+    """Parse space separated card strings, e.g. 'As Kd'."""
+    return [Card.new(s) for s in text.split()]
+
+
+def has_flush(hand):
+    # type: (list) -> bool
+    """Are five of the cards of one suit."""
+    suits = [Card.get_suit_int(c) for c in hand]
+    return any(suits.count(s) >= 5 for s in set(suits))
+
+
+def has_straight(hand):
+    # type: (list) -> bool
+    """Do the cards hold five consecutive ranks."""
+    ranks = set(Card.get_rank_int(c) for c in hand)
+    return any(straight <= ranks for straight in STRAIGHTS)
+
+
+class TextureTest(unittest.TestCase):
+    """Nuts and outs are those found by trying every card."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = TextureAnalyzer()
+        cls.evaluator = cls.analyzer.evaluator
+
+    def brute_outs(self, hole, board):
+        # type: (list, list) -> list
+        """Cards making a better straight flush, or a flush or straight
+        which the hand is worse than."""
+        e = self.evaluator
+        rank = e.evaluate(hole, board)
+        outs = []
+        for card in Deck.GetFullDeck():
+            if card in hole or card in board:
+                continue
+            hand = hole + board + [card]
+            new = e.evaluate(hole, board + [card])
+            if new <= LookupTable.MAX_STRAIGHT_FLUSH and new < rank or \
+                    rank > LookupTable.MAX_FLUSH and has_flush(hand) or \
+                    rank > LookupTable.MAX_STRAIGHT and has_straight(hand):
+                outs.append(card)
+        return sorted(outs, reverse=True)
+
+    def test_outs(self):
+        rng = random.Random(3)
+        deck = Deck.GetFullDeck()
+        for _ in range(300):
+            dealt = rng.sample(deck, rng.choice((5, 6)))
+            hole, board = dealt[:2], dealt[2:]
+            self.assertEqual(self.analyzer.analyze(hole, board)['outs'],
+                             self.brute_outs(hole, board))
+
+    def test_straight_flush_outs_of_a_flush(self):
+        hole, board = cards('Js 9s'), cards('Ks 7s Qs 4d')
+        analysis = self.analyzer.analyze(hole, board)
+        self.assertEqual(analysis['class'], "Flush")
+        self.assertIn(STRAIGHT_FLUSH_DRAW, analysis['draws'])
+        self.assertEqual(analysis['outs'], cards('Ts'))
+        self.assertEqual(analysis['outs'], self.brute_outs(hole, board))
+
+    def test_nuts(self):
+        rng = random.Random(5)
+        deck = Deck.GetFullDeck()
+        e = self.evaluator
+        for _ in range(20):
+            board = rng.sample(deck, rng.choice((3, 4, 5)))
+            rest = [c for c in deck if c not in board]
+            best = min(e.evaluate(list(hole), board)
+                       for hole in itertools.combinations(rest, 2))
+            rank, hole = self.analyzer.nuts(board)
+            self.assertEqual(rank, best)
+            self.assertEqual(e.evaluate(hole, board), best)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests of the evaluators of poker variants."""
+
+import itertools
+import random
+import unittest
+
+from deuces import (Card, Deck, AceToFiveEvaluator, DeuceToSevenEvaluator,
+                    OmahaEvaluator, ShortDeckEvaluator)
+
+
+class VariantEvaluatorTest(unittest.TestCase):
+    """The tables of 6 and 7 cards hold the best five card hand."""
+
+    @staticmethod
+    def brute_force(evaluator, cards):
+        # type: (VariantEvaluator, list) -> int
+        """Best rank over every 5 card subset of cards."""
+        table = evaluator.table
+        ranks = []
+        for combo in itertools.combinations(cards, 5):
+            prime = Card.prime_product_from_hand(combo)
+            suited = combo[0] & combo[1] & combo[2] & combo[3] & combo[4]
+            if table.flush_lookup is not None and suited & 0xF000:
+                ranks.append(table.flush_lookup[prime])
+            else:
+                ranks.append(table.unsuited_lookup[prime])
+        return min(ranks)
+
+    def check(self, evaluator, deck):
+        # type: (VariantEvaluator, list) -> None
+        """Compare evaluate() with brute_force() on random hands."""
+        rng = random.Random(1)
+        for n in (5, 6, 7):
+            for _ in range(300):
+                cards = rng.sample(deck, n)
+                self.assertEqual(evaluator.evaluate(cards[:2], cards[2:]),
+                                 self.brute_force(evaluator, cards))
+
+    def test_short_deck(self):
+        self.check(ShortDeckEvaluator(), ShortDeckEvaluator.deck())
+
+    def test_deuce_to_seven(self):
+        self.check(DeuceToSevenEvaluator(), Deck.GetFullDeck())
+
+    def test_ace_to_five(self):
+        self.check(AceToFiveEvaluator(), Deck.GetFullDeck())
+
+    def test_number_of_cards(self):
+        evaluator = ShortDeckEvaluator()
+        deck = ShortDeckEvaluator.deck()
+        self.assertRaises(ValueError, evaluator.evaluate, deck[:2], deck[2:4])
+        self.assertRaises(ValueError, evaluator.evaluate, deck[:2], deck[2:8])
+
+
+class OmahaEvaluatorTest(unittest.TestCase):
+    """Hands use exactly two hole cards and three board cards."""
+
+    def test_two_hole_cards(self):
+        # four spades in hand but one on the board: no flush
+        hole = [Card.new(s) for s in 'As Ks Qs Js'.split()]
+        board = [Card.new(s) for s in 'Ts 2d 3c 7h 8d'.split()]
+        evaluator = OmahaEvaluator()
+        self.assertEqual(evaluator.class_to_string(evaluator.get_rank_class(
+            evaluator.evaluate(hole, board))), "High Card")
+
+    def test_invalid_sizes(self):
+        cards = Deck.GetFullDeck()
+        evaluator = OmahaEvaluator()
+        for holes, boards in [(4, 0), (4, 2), (4, 6), (2, 5), (3, 3)]:
+            self.assertRaises(ValueError, evaluator.evaluate, cards[:holes],
+                              cards[10:10 + boards])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Tests of wild jokers and of analysing hands played with them."""
+
+import itertools
+import random
+import unittest
+
+import analysis
+from deuces import Card, Deck, WildEvaluator
+from showdown import evaluator
+
+
+class WildEvaluatorTest(unittest.TestCase):
+    """A joker ranks like the best card it could stand for."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.wild = evaluator(WildEvaluator)
+        cls.natural = evaluator()
+
+    def brute_force(self, hand):
+        # type: (list) -> int
+        """Best rank over every substitution of the jokers in hand."""
+        naturals = [c for c in hand if not Card.is_joker(c)]
+        jokers = len(hand) - len(naturals)
+        deck = [c for c in Deck.GetFullDeck() if c not in naturals]
+        return min(self.natural.evaluate(naturals + list(cards), [])
+                   for cards in itertools.combinations(deck, jokers))
+
+    def test_five_cards(self):
+        rng = random.Random(1)
+        deck = Deck.GetFullDeck()
+        for jokers in (1, 2):
+            for _ in range(100):
+                hand = rng.sample(deck, 5 - jokers) + Card.JOKERS[:jokers]
+                self.assertEqual(self.wild.evaluate(hand, []),
+                                 self.brute_force(hand))
+
+    def test_known_hands(self):
+        for text, rank in [('Xb As Ks Qs Js', 1),  # royal flush
+                           ('Xb Xc Ah Ad 2c', 22),  # four aces, deuce
+                           ('Xb 2c 3d 4h 5s', 1608)]:  # six high straight
+            hand = [Card.new(s) for s in text.split()]
+            self.assertEqual(self.wild.evaluate(hand, []), rank)
+
+    def test_analysis(self):
+        hands = [[Card.new(s) for s in text.split()]
+                 for text in ('Xb As Ks Qs Js', 'Ah Ad Kc Kd 2s',
+                              'Xb Xc 7h 7d 2c')]
+        ranks = [rank for rank, _ in analysis.evaluate_batch(hands)]
+        self.assertEqual(ranks, [self.wild.evaluate(hand, [])
+                                 for hand in hands])
+        self.assertEqual(ranks[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -92,12 +92,17 @@ class WebSockets(object):
         Logger.info("server started on port " + str(port))
         self.ca.update_ip(port)
 
-    def client(self, host="localhost:8000"):
-        # type: (str)
+    def client(self, host="localhost:8000", resume=False):
+        # type: (str, bool) -> bool
         """Connect as a client to a Web Socket server.
 
         Args:
             host: Host and optional colon and port to connect to
+            resume: If True this is an attempt to reconnect - failing to
+                connect is reported to the caller instead of the user
+
+        Returns:
+            False if the connection could not be made
         """
         host_address = 'ws://' + host
         Logger.info("Client started - connecting to %s", host_address)
@@ -105,19 +110,21 @@ class WebSockets(object):
         try:
             ws = create_connection(host_address)
         except (socket.gaierror, socket.error):
-            popup("Cannot connect to host.", callback=self.ca.go_home)
-            return
+            if not resume:
+                popup("Cannot connect to host.", callback=self.ca.go_home)
+            return False
 
         self.ca.add_conn(self.send, ws)
         try:
             while True:
                 self.ca.receive(ws.recv())
-        except WebSocketConnectionClosedException:
+        except (WebSocketConnectionClosedException, socket.error):
             pass
         finally:
             Logger.info("client stopped")
             self.ca.remove_conn(ws)
             ws.close()
+        return True
 
     def add(self, conn):
         # type: (object)
@@ -140,7 +147,8 @@ class WebSockets(object):
         if isinstance(conn, WebSocket):
             thread(conn.send, [msg])
         else:
-            thread(conn.transport.write, [msg])
+            # Transports may only be written to from the reactor thread
+            reactor.callFromThread(conn.transport.write, msg)
 
     @property
     def ip(self):
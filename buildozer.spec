@@ -21,7 +21,7 @@ version.filename = %(source.dir)s/main.py
 
 # (list) Application requirements
 # comma seperated e.g. requirements = sqlite3,kivy
-requirements = sqlite3,pil,plyer,openssl,ws4py,twisted,txws,setuptools,websocket-client,qrcode,jsonpickle,kivy
+requirements = sqlite3,pil,plyer,openssl,ws4py,twisted,txws,setuptools,websocket-client,qrcode,jsonpickle,kivy,cdeuces
 
 # (list) Garden requirements
 garden_requirements = qrcode
@@ -72,6 +72,9 @@ android.ant_path = /tmp/cs310-piotr/and_res/ant
 # (str) python-for-android git clone directory (if empty, it will be automatically cloned from github)
 android.p4a_dir = /tmp/cs310-piotr/and_res/p4a
 
+# (str) Directory of the local recipes (cdeuces builds the compiled core)
+p4a.local_recipes = ./recipes
+
 [buildozer]
 
 # (int) Log level (0 = error only, 1 = info, 2 = debug (with command output))
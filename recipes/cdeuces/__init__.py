@@ -0,0 +1,28 @@
+"""python-for-android recipe for the compiled core of the hand evaluator."""
+import os
+import shutil
+from os.path import abspath, dirname, join
+
+from pythonforandroid.recipe import CythonRecipe
+
+ROOT = dirname(dirname(dirname(abspath(__file__))))
+
+
+class CDeucesRecipe(CythonRecipe):
+    """Compiles app/deuces/_cdeuces.pyx with setup.py for the target."""
+    version = None
+    url = None
+    name = 'cdeuces'
+    depends = ['python2', 'setuptools']
+
+    def prepare_build_dir(self, arch):
+        build_dir = self.get_build_dir(arch)
+        if os.path.exists(build_dir):
+            shutil.rmtree(build_dir)
+        os.makedirs(join(build_dir, 'app', 'deuces'))
+        shutil.copy(join(ROOT, 'setup.py'), build_dir)
+        shutil.copy(join(ROOT, 'app', 'deuces', '_cdeuces.pyx'),
+                    join(build_dir, 'app', 'deuces'))
+
+
+recipe = CDeucesRecipe()
@@ -0,0 +1,28 @@
+"""Builds the optional compiled core of the hand evaluator.
+
+Run "python setup.py build_ext --inplace" to put _cdeuces next to main.py
+on the desktop. On Android the cdeuces recipe in recipes/ runs this script
+when buildozer builds the APK. Without the extension everything still works
+using the pure Python evaluator.
+"""
+from setuptools import setup, Extension
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    # python-for-android cythonizes the sources itself and then runs this
+    # script again, so the generated C file is picked up on the second pass
+    cythonize = None
+
+SOURCE = 'app/deuces/_cdeuces'
+
+if cythonize is not None:
+    ext_modules = cythonize([Extension('_cdeuces', [SOURCE + '.pyx'])])
+else:
+    ext_modules = [Extension('_cdeuces', [SOURCE + '.c'])]
+
+setup(
+    name='cdeuces',
+    package_dir={'': 'app'},
+    ext_modules=ext_modules,
+)